@@ -1,36 +1,36 @@
 import logging
 from datetime import datetime
+from column_profile import column_roles
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def evaluate_accountability(df):
+def evaluate_accountability(df, profile=None):
     """
     Dynamically evaluate accountability by scanning the DataFrame's column names.
     It checks for keywords indicating:
       - Auditability (e.g., "audit", "log", "audit_flag")
       - Explainability (e.g., "explain", "reason", "justification", "explanation")
       - Traceability (e.g., "time", "timestamp", "history", "trace")
-    
+    The keyword roles of each column come from profile when given (see column_profile).
+
     Returns:
       A dictionary with boolean values for each aspect.
     """
     logging.info("Starting dynamic accountability evaluation.")
 
-    # Convert column names to lowercase for case-insensitive matching.
-    cols_lower = [col.lower() for col in df.columns]
-
-    # Define keyword lists 
-    audit_keywords = ["audit", "log", "audit_flag"]
-    explain_keywords = ["explain", "reason", "justification", "explanation"]
-    trace_keywords = ["time", "timestamp", "history", "trace"]
+    # Keyword roles of every column name (case-insensitive matching).
+    if profile is None:
+        roles = [column_roles(col) for col in df.columns]
+    else:
+        roles = [info["roles"] for info in profile.values()]
 
     # Check if any column name contains any of the keywords for each aspect.
-    auditability = any(any(keyword in col for keyword in audit_keywords) for col in cols_lower)
-    explainability = any(any(keyword in col for keyword in explain_keywords) for col in cols_lower)
-    traceability = any(any(keyword in col for keyword in trace_keywords) for col in cols_lower)
+    auditability = any("audit" in column for column in roles)
+    explainability = any("explain" in column for column in roles)
+    traceability = any("trace" in column for column in roles)
 
     logging.info(f"Auditability detected: {auditability}")
     logging.info(f"Explainability detected: {explainability}")
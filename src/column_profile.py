@@ -0,0 +1,129 @@
+import logging
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Candidate names for protected attributes (case-insensitive match)
+PROTECTED_CANDIDATES = {"sex", "gender", "race", "ethnicity"}
+
+# Non-numeric columns that are label-encoded instead of dropped.
+EXPLICIT_PRESERVE = {"sex", "gender", "race", "ethnicity", "approved", "income", "credit_score",
+                     "transaction_count", "debt_ratio", "account_balance", "loan_amount"}
+ACCOUNTABILITY_KEYWORDS = {"audit", "log", "explain", "reason", "justification", "time", "trace"}
+
+# Column-name keywords of the three accountability aspects.
+AUDIT_KEYWORDS = ("audit", "log", "audit_flag")
+EXPLAIN_KEYWORDS = ("explain", "reason", "justification", "explanation")
+TRACE_KEYWORDS = ("time", "timestamp", "history", "trace")
+
+# Columns longer than this get a HyperLogLog cardinality estimate instead of an exact count.
+EXACT_CARDINALITY_ROWS = 1_000_000
+# Prefix checked first, so that long columns with many values are rejected as binary without a full scan.
+BINARY_PROBE_SIZE = 1024
+HLL_PRECISION = 12
+
+def column_roles(col):
+    """
+    Role tags of a column, from its name (case-insensitive):
+      - "protected": a protected attribute for the fairness indicator,
+      - "preserve": label-encoded by preprocessing instead of dropped when non-numeric,
+      - "audit", "explain", "trace": evidence for the accountability aspects.
+    """
+    col_lower = str(col).lower()
+    roles = set()
+    if col_lower in PROTECTED_CANDIDATES:
+        roles.add("protected")
+    if col_lower in EXPLICIT_PRESERVE or any(keyword in col_lower for keyword in ACCOUNTABILITY_KEYWORDS):
+        roles.add("preserve")
+    for role, keywords in (("audit", AUDIT_KEYWORDS), ("explain", EXPLAIN_KEYWORDS), ("trace", TRACE_KEYWORDS)):
+        if any(keyword in col_lower for keyword in keywords):
+            roles.add(role)
+    return roles
+
+def column_kind(values):
+    """
+    "bool", "int", "float" (any other numeric type) or "object".
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return "bool"
+    if pd.api.types.is_integer_dtype(values):
+        return "int"
+    if pd.api.types.is_numeric_dtype(values):
+        return "float"
+    return "object"
+
+def estimate_cardinality(values, precision=HLL_PRECISION):
+    """
+    HyperLogLog estimate of the number of distinct values (relative error about
+    1.04 / sqrt(2 ** precision), 1.6% by default), from one vectorized hashing pass.
+    """
+    hashes = pd.util.hash_array(np.asarray(values))
+    n_registers = 1 << precision
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    # Position of the first set bit after the index bits; a guard bit bounds it.
+    rest = (hashes << np.uint64(precision)) | np.uint64(1 << (precision - 1))
+    rank = 64 - np.floor(np.log2(rest.astype(np.float64))).astype(np.int64)
+    registers = np.zeros(n_registers, dtype=np.int64)
+    np.maximum.at(registers, index, rank)
+
+    alpha = 0.7213 / (1 + 1.079 / n_registers)
+    estimate = alpha * n_registers ** 2 / np.sum(2.0 ** -registers)
+    empty = int((registers == 0).sum())
+    if estimate <= 2.5 * n_registers and empty:
+        # Small-range correction (linear counting).
+        estimate = n_registers * np.log(n_registers / empty)
+    return int(round(estimate))
+
+def _distinct_count(values):
+    uniques = pd.unique(values)
+    return int(len(uniques) - pd.isna(uniques).sum())
+
+def profile_columns(df, cardinality=True, exact_rows=EXACT_CARDINALITY_ROWS, probe_size=BINARY_PROBE_SIZE):
+    """
+    Profile every column of df in one pass, for preprocessing and the calculators to share.
+    Per column:
+      - kind: see column_kind,
+      - nulls: number of missing values,
+      - roles: see column_roles,
+      - with cardinality: distinct (non-null distinct values), distinct_exact (False for a
+        HyperLogLog estimate on columns over exact_rows rows) and binary (exactly two
+        distinct non-null values). Long columns with more than two values in their first
+        probe_size rows are not counted exactly.
+
+    Returns:
+      A dictionary mapping each column to its profile, in column order.
+    """
+    profile = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        info = {"kind": column_kind(df[col]), "nulls": int(pd.isna(values).sum()) if len(values) else 0,
+                "roles": column_roles(col)}
+        if cardinality:
+            if len(values) <= exact_rows or _distinct_count(values[:probe_size]) <= 2:
+                info["distinct"] = _distinct_count(values)
+                info["distinct_exact"] = True
+            else:
+                info["distinct"] = estimate_cardinality(values[~pd.isna(values)])
+                info["distinct_exact"] = False
+            info["binary"] = info["distinct_exact"] and info["distinct"] == 2
+        profile[col] = info
+    return profile
+
+def columns_with_role(profile, role):
+    """
+    Columns of a profile tagged with role, in column order.
+    """
+    return [col for col, info in profile.items() if role in info["roles"]]
+
+def first_binary_column(profile, exclude=()):
+    """
+    First column of a profile, outside exclude, with exactly two distinct non-null values.
+    """
+    for col, info in profile.items():
+        if col not in exclude and info["binary"]:
+            return col
+    return None
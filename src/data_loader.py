@@ -1,8 +1,10 @@
 
 import os
+import csv
 import pandas as pd
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Setup logging
 logging.basicConfig(
@@ -10,6 +12,22 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Dataset formats by file extension.
+TABLE_FORMATS = {".csv": "csv", ".xlsx": "excel", ".parquet": "parquet"}
+
+# Tables read ahead by prefetch_table, by absolute path; at most two are held at a time.
+_prefetched = {}
+_prefetch_executor = None
+
+def table_format(file_path):
+    """
+    "csv", "excel" or "parquet" from the file extension, or None for other files.
+    """
+    return TABLE_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+def is_data_file(file_path):
+    return table_format(file_path) is not None
+
 def load_csv(file_path):
     """
     Loads a CSV file without relying on any external configuration.
@@ -26,3 +44,178 @@ def load_csv(file_path):
     except Exception as e:
         logging.error(f"Failed to load CSV file: {e}")
         raise
+
+def iter_csv_chunks(file_path, chunksize=100000, **read_kwargs):
+    """
+    Streams a CSV file as DataFrames of at most chunksize rows, so that the
+    whole file never has to be held in memory at once.
+    """
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        with pd.read_csv(file_path, chunksize=chunksize, **read_kwargs) as reader:
+            for chunk in reader:
+                yield chunk
+
+    except Exception as e:
+        logging.error(f"Failed to stream CSV file: {e}")
+        raise
+
+def _unique_names(names):
+    """
+    Column names as pandas reports them: a repeated name gets a ".1", ".2", ... suffix.
+    """
+    counts = {}
+    unique = []
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+        unique.append(name if counts[name] == 1 else f"{name}.{counts[name] - 1}")
+    if len(set(unique)) != len(unique):
+        raise ValueError("Ambiguous duplicate column names.")
+    return unique
+
+def _arrow_csv_options(file_path, usecols=None, text_columns=()):
+    from pyarrow import csv as pa_csv
+    import pyarrow as pa
+    from pandas._libs.parsers import STR_NA_VALUES
+
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    names = _unique_names(header)
+    read_options = pa_csv.ReadOptions(column_names=names, skip_rows=1) if names != header else pa_csv.ReadOptions()
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=usecols, column_types={col: pa.string() for col in text_columns},
+        null_values=sorted(STR_NA_VALUES), strings_can_be_null=True,
+        true_values=["True", "TRUE", "true"], false_values=["False", "FALSE", "false"],
+    )
+    return {"read_options": read_options, "convert_options": convert_options}
+
+def _read_csv_arrow(file_path, usecols=None, text_columns=()):
+    """
+    Parse a CSV with pyarrow's multithreaded reader into the frame pandas' own parser gives:
+    same column names, missing-value markers and booleans, dates kept as text and
+    all-empty columns as float. Floats are correctly rounded, so they can differ from
+    pandas' parser in the last bit. text_columns are read as text without type inference.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    table = pa_csv.read_csv(file_path, **_arrow_csv_options(file_path, usecols, text_columns))
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        table = pa_csv.read_csv(file_path, **_arrow_csv_options(file_path, usecols, [*text_columns, *temporal]))
+    df = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_null(field.type):
+            df[field.name] = df[field.name].astype("float64")
+    return df
+
+def _arrow_kind(data_type):
+    """
+    column_kind of the pandas column an Arrow type becomes, or None for an all-null column.
+    """
+    import pyarrow as pa
+    if pa.types.is_null(data_type):
+        return None
+    if pa.types.is_boolean(data_type):
+        return "bool"
+    if pa.types.is_integer(data_type):
+        return "int"
+    if pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+        return "float"
+    return "object"
+
+def peek_column_kinds(file_path):
+    """
+    Kind ("bool", "int", "float", "object", or None when still unknown) of every column, without
+    reading the whole file: the Parquet schema, or the types pyarrow infers from the first
+    block of a CSV. A column that is "object" there is non-numeric in the full file too.
+    Returns None when the kinds cannot be known up front (XLSX, CSV layouts pyarrow rejects).
+    """
+    try:
+        file_format = table_format(file_path)
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(file_path)
+            return {field.name: _arrow_kind(field.type) for field in schema
+                    if not field.name.startswith("__index_level_")}
+        if file_format == "csv":
+            from pyarrow import csv as pa_csv
+            with pa_csv.open_csv(file_path, **_arrow_csv_options(file_path)) as reader:
+                return {field.name: _arrow_kind(field.type) for field in reader.schema}
+    except Exception as e:
+        logging.info(f"Column types of '{file_path}' not known before reading it: {e}")
+    return None
+
+def _read_table(file_path, usecols=None, text_columns=()):
+    file_format = table_format(file_path)
+    if file_format == "csv":
+        try:
+            return _read_csv_arrow(file_path, usecols, text_columns)
+        except ImportError:
+            pass
+        except Exception as e:
+            # Layouts pyarrow rejects (e.g. a title line before the header) get pandas' more lenient parser.
+            logging.info(f"pyarrow could not parse '{file_path}' ({e}); using the pandas parser.")
+        return pd.read_csv(file_path, usecols=usecols, dtype={col: str for col in text_columns} or None)
+    if file_format == "excel":
+        df = pd.read_excel(file_path, usecols=usecols)
+        if df.shape[1] == 0:
+            raise pd.errors.EmptyDataError(f"No columns to parse from '{file_path}'.")
+        return df
+    if file_format == "parquet":
+        return pd.read_parquet(file_path, columns=usecols)
+    raise ValueError(f"Unsupported file type: {file_path} (supported: {', '.join(TABLE_FORMATS)}).")
+
+def load_table(file_path, usecols=None, text_columns=()):
+    """
+    Loads a CSV, XLSX or Parquet dataset, chosen by its extension:
+      - CSV is parsed by pyarrow's multithreaded reader, or by pandas for files it rejects,
+      - usecols (column names, in file order) limits parsing to those columns,
+      - text_columns (CSV) are read as text, skipping type inference,
+      - a table read ahead by prefetch_table with the same columns is returned without
+        reading the file again.
+    """
+    try:
+        future = _prefetched.pop(os.path.abspath(file_path), None)
+        if future is not None:
+            try:
+                prefetched = future.result()
+            except Exception:
+                prefetched = None  # Read again below, so the error is raised and logged here.
+            if prefetched is not None and prefetched[:2] == (usecols, list(text_columns)):
+                logging.info(f"Dataset '{file_path}' loaded successfully (prefetched).")
+                return prefetched[2]
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        df = _read_table(file_path, usecols, text_columns)
+        logging.info(f"Dataset '{file_path}' loaded successfully.")
+        return df
+
+    except Exception as e:
+        logging.error(f"Failed to load dataset: {e}")
+        raise
+
+def _read_unless(file_path, skip, plan):
+    if skip is not None and skip():
+        return None
+    usecols, text_columns = plan(file_path) if plan is not None else (None, [])
+    return usecols, list(text_columns), _read_table(file_path, usecols, text_columns)
+
+def prefetch_table(file_path, skip=None, plan=None):
+    """
+    Start reading a dataset in a background thread, so that its parsing overlaps with the
+    evaluation of the current one; the next load_table of that file returns the result.
+    skip is called in the thread first: when it returns True, nothing is read (e.g. the
+    preprocessed columns are cached). plan(file_path) gives the (usecols, text_columns)
+    to read. At most two tables (the current and the next one) are held at a time.
+    """
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        _prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    _prefetched[os.path.abspath(file_path)] = _prefetch_executor.submit(_read_unless, file_path, skip, plan)
+    while len(_prefetched) > 2:
+        _prefetched.pop(next(iter(_prefetched))).cancel()
@@ -1,70 +1,245 @@
 ﻿import os
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
 import logging
-from datetime import datetime
+from data_loader import iter_csv_chunks, peek_column_kinds
+from column_profile import EXPLICIT_PRESERVE, ACCOUNTABILITY_KEYWORDS, column_kind, column_roles, profile_columns
+import processed_cache
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def preprocess_data(df):
+def is_preserved_column(col):
+    """
+    True if a non-numeric column is explicitly listed or contains an accountability keyword.
+    """
+    return "preserve" in column_roles(col)
+
+def plan_columns(file_path):
+    """
+    Apply the keep/drop rules of preprocess_data before a dataset is read, from the column
+    kinds known up front (see data_loader.peek_column_kinds):
+      - numeric columns and columns of still unknown kind are read,
+      - non-numeric columns that are explicitly listed or contain accountability keywords
+        are read as text,
+      - other non-numeric columns, which preprocess_data would drop, are never parsed.
+
+    Returns:
+      (usecols, text_columns) for data_loader.load_table; usecols is None when every
+      column is read.
+    """
+    kinds = peek_column_kinds(file_path)
+    if kinds is None:
+        return None, []
+
+    usecols = []
+    text_columns = []
+    for col, kind in kinds.items():
+        if kind != "object":
+            usecols.append(col)
+        elif is_preserved_column(col):
+            usecols.append(col)
+            text_columns.append(col)
+        else:
+            logging.info(f"Dropping column before parsing: {col}")
+    if len(usecols) in (0, len(kinds)):
+        usecols = None
+    return usecols, text_columns
+
+def preprocess_data(df, category_maps=None, profile=None):
     """
     Process the DataFrame:
       - Keep numeric columns.
       - Encode categorical columns if they are explicitly listed or contain accountability keywords.
       - Drop irrelevant categorical columns.
+      - Fill missing values with 0, only in the columns that have any.
+      - Store every column in its smallest lossless dtype (see compact_column); encoded
+        columns get the smallest integer type that holds their codes.
+      - If a category_maps dictionary is given, the sorted category list of every encoded
+        column is stored in it (code i stands for category_maps[col][i]).
+    Column kinds, roles and null counts come from profile (see column_profile.profile_columns),
+    computed here when not given.
     """
     logging.info("Starting data preprocessing.")
+    if profile is None:
+        profile = profile_columns(df, cardinality=False)
+    memory_before = df.memory_usage(index=False, deep=True).sum()
 
-    explicit_preserve = {"sex", "gender", "race", "ethnicity", "approved", "income", "credit_score",
-                         "transaction_count", "debt_ratio", "account_balance", "loan_amount"}
-
-    accountability_keywords = {"audit", "log", "explain", "reason", "justification", "time", "trace"}
-
-    columns_to_keep = []
+    columns = {}
 
     for col in df.columns:
-        if pd.api.types.is_numeric_dtype(df[col]):
-            columns_to_keep.append(col)
+        if profile[col]["kind"] != "object":
+            columns[col] = df[col]
         else:
-            col_lower = col.lower()
-            if (col_lower in explicit_preserve) or any(keyword in col_lower for keyword in accountability_keywords):
+            if "preserve" in profile[col]["roles"]:
                 logging.info(f"Label-encoding column: {col}")
-                df[col] = df[col].fillna("Missing")
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col].astype(str))
-                columns_to_keep.append(col)
+                # Same codes as sklearn's LabelEncoder (sorted categories), without importing scikit-learn.
+                codes, categories = pd.factorize(df[col].fillna("Missing").astype(str), sort=True)
+                columns[col] = pd.Series(codes.astype(smallest_int_dtype(0, max(len(categories) - 1, 0))),
+                                         index=df.index)
+                if category_maps is not None:
+                    category_maps[col] = list(categories)
             else:
                 logging.info(f"Dropping column: {col}")
 
-    df = df[columns_to_keep].copy()
-    df.fillna(0, inplace=True)
+    for col, values in columns.items():
+        if profile[col]["nulls"] and profile[col]["kind"] != "object":
+            values = values.fillna(0)
+        columns[col] = compact_column(values)
+    df = pd.DataFrame(columns, index=df.index)
 
     # Debugging: Show which columns are kept
     print("🟢 Remaining columns after preprocessing:", df.columns.tolist())
 
-    logging.info("Data preprocessing completed successfully.")
+    memory_after = df.memory_usage(index=False).sum()
+    logging.info(f"Data preprocessing completed successfully: {memory_before / 1e6:.2f} MB -> "
+                 f"{memory_after / 1e6:.2f} MB in memory "
+                 f"({1 - memory_after / memory_before if memory_before else 0:.0%} saved).")
     return df
 
-def save_processed_data(df, file_path):
+def smallest_int_dtype(min_value, max_value):
     """
-    Saves the processed DataFrame to a timestamped CSV file in an 'Output_report' folder.
+    Smallest signed integer dtype that holds every value in [min_value, max_value].
     """
-    try:
-        timestamp = datetime.now().strftime("%d%m%y%H%M")
-        output_dir = "Output_report"
-        os.makedirs(output_dir, exist_ok=True)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def compact_column(values):
+    """
+    The same values in their smallest lossless dtype: integers in the smallest integer type
+    that holds their range, floats as float32 when every value round-trips exactly.
+    Booleans and anything else are returned unchanged.
+    """
+    if len(values) == 0 or pd.api.types.is_bool_dtype(values):
+        return values
+    if pd.api.types.is_integer_dtype(values):
+        low, high = values.min(), values.max()
+        if high > np.iinfo(np.int64).max:
+            return values
+        dtype = smallest_int_dtype(low, high)
+        return values.astype(dtype) if dtype.itemsize < values.dtype.itemsize else values
+    if pd.api.types.is_float_dtype(values) and values.dtype.itemsize > 4:
+        array = values.to_numpy()
+        if np.array_equal(array.astype(np.float32).astype(array.dtype), array):
+            return values.astype(np.float32)
+    return values
+
+def _merge_kinds(previous, current):
+    """
+    Kind of a column whose chunks were parsed as previous and current. A mix pandas
+    could not have parsed as one numeric column is treated as non-numeric.
+    """
+    if previous == current:
+        return previous
+    if {previous, current} == {"int", "float"}:
+        return "float"
+    return "object"
 
-        base_name = os.path.splitext(os.path.basename(file_path))[0]
-        processed_file_name = f"processed_data_{base_name}_{timestamp}.csv"
-        processed_file_path = os.path.join(output_dir, processed_file_name)
+def preprocess_csv_chunked(file_path, chunksize=100000, category_maps=None):
+    """
+    Streaming counterpart of load_csv + preprocess_data for files larger than memory.
+    Applies the same keep/encode/drop rules but reads the file in chunks (two passes)
+    and returns a compact column store:
+      - Numeric columns are downcast to the smallest integer type, or float32 when that is lossless.
+      - Label-encoded columns hold the same codes LabelEncoder would give (sorted categories),
+        as the smallest integer type; their category lists are stored in category_maps, if given.
+    """
+    logging.info(f"Starting chunked data preprocessing of '{file_path}'.")
+
+    # 1. First pass: column kinds, numeric ranges and row count.
+    columns = None
+    kinds = {}
+    mins, maxs, float32_exact = {}, {}, {}
+    n_rows = 0
+    for chunk in iter_csv_chunks(file_path, chunksize=chunksize):
+        if columns is None:
+            columns = list(chunk.columns)
+        n_rows += len(chunk)
+        for col in columns:
+            kind = column_kind(chunk[col])
+            kinds[col] = _merge_kinds(kinds.get(col, kind), kind)
+            if kind in ("int", "float"):
+                values = np.nan_to_num(chunk[col].to_numpy(dtype=np.float64), nan=0.0)
+                if len(values):
+                    mins[col] = min(mins.get(col, values.min()), values.min())
+                    maxs[col] = max(maxs.get(col, values.max()), values.max())
+                exact = np.array_equal(values.astype(np.float32).astype(np.float64), values)
+                float32_exact[col] = float32_exact.get(col, True) and exact
+
+    if columns is None:
+        raise ValueError(f"No data in '{file_path}'.")
+
+    # 2. Decide which columns survive and allocate their compact arrays.
+    store = {}
+    category_ids = {}
+    for col in columns:
+        kind = kinds[col]
+        if kind == "bool":
+            store[col] = np.zeros(n_rows, dtype=bool)
+        elif kind == "int":
+            store[col] = np.zeros(n_rows, dtype=smallest_int_dtype(mins.get(col, 0), maxs.get(col, 0)))
+        elif kind == "float":
+            store[col] = np.zeros(n_rows, dtype=np.float32 if float32_exact[col] else np.float64)
+        elif is_preserved_column(col):
+            logging.info(f"Label-encoding column: {col}")
+            store[col] = np.zeros(n_rows, dtype=np.int32)
+            category_ids[col] = {}
+        else:
+            logging.info(f"Dropping column: {col}")
+
+    # 3. Second pass: read only the surviving columns and fill the arrays. Categories get
+    #    provisional ids in order of appearance, remapped to sorted order at the end.
+    start = 0
+    text_columns = {col: str for col in category_ids}
+    for chunk in iter_csv_chunks(file_path, chunksize=chunksize, usecols=list(store), dtype=text_columns):
+        stop = start + len(chunk)
+        for col, values in store.items():
+            if col in category_ids:
+                codes, uniques = pd.factorize(chunk[col].fillna("Missing").astype(str))
+                ids = np.array([category_ids[col].setdefault(value, len(category_ids[col])) for value in uniques],
+                               dtype=np.int32)
+                values[start:stop] = ids[codes]
+            else:
+                values[start:stop] = chunk[col].fillna(0).to_numpy(dtype=values.dtype)
+        start = stop
+
+    if category_maps is None:
+        category_maps = {}
+    for col, ids in category_ids.items():
+        categories = sorted(ids)
+        rank = np.empty(len(categories), dtype=np.int64)
+        rank[[ids[category] for category in categories]] = np.arange(len(categories))
+        store[col] = rank[store[col]].astype(smallest_int_dtype(0, max(len(categories) - 1, 0)))
+        category_maps[col] = categories
 
-        df.to_csv(processed_file_path, index=False)
-        logging.info(f"Processed data saved to '{processed_file_path}'.")
-        return processed_file_path
+    df = pd.DataFrame(store, copy=False)
+
+    # Debugging: Show which columns are kept
+    print("🟢 Remaining columns after preprocessing:", df.columns.tolist())
+
+    logging.info(f"Chunked data preprocessing completed: {n_rows} rows, "
+                 f"{df.memory_usage(index=False).sum() / 1e6:.1f} MB in memory.")
+    return df
+
+def save_processed_data(df, file_path, category_maps=None, chunked=False, content_digest=None):
+    """
+    Stores the processed DataFrame once in the columnar cache (see processed_cache), keyed by
+    the content hash of its source file (content_digest, when already known), with the
+    category maps of its encoded columns. Returns the cache entry directory.
+    """
+    try:
+        entry_dir = processed_cache.store_processed(
+            processed_cache.processed_key(file_path, chunked=chunked, content_digest=content_digest), df, category_maps,
+            source=os.path.basename(file_path)
+        )
+        if entry_dir is None:
+            raise OSError(f"Processed data of '{file_path}' could not be stored.")
+        return entry_dir
 
     except Exception as e:
         logging.error(f"Error saving processed data: {e}")
@@ -0,0 +1,67 @@
+import logging
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+class EvaluationContext:
+    """
+    Per-dataset state shared by the model-based calculators.
+
+      - The last column is the target, every other column is a feature.
+      - The 80/20 train/test split (random_state=42) is done once and kept as NumPy arrays.
+      - The baseline LogisticRegression is fitted on first use and reused afterwards. With
+        model (a fitted estimator or model_backend.CallableModel), that model is audited
+        instead and nothing is fitted.
+    """
+
+    def __init__(self, df, test_size=0.2, random_state=42, model=None):
+        if df.shape[1] < 2:
+            raise ValueError("Not enough columns to separate features and target.")
+
+        self.target_column = df.columns[-1]
+        self.feature_columns = list(df.columns[:-1])
+        self.random_state = random_state
+
+        X = df[self.feature_columns].to_numpy(dtype=np.float64)
+        y = df[self.target_column].to_numpy()
+        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
+            X, y, test_size=test_size, random_state=random_state
+        )
+        self._baseline_model = model
+        self._data_norm = None
+
+    @property
+    def baseline_model(self):
+        """
+        LogisticRegression(max_iter=1000) fitted on the training split, fitted only once,
+        or the model given to the context.
+        """
+        if self._baseline_model is None:
+            logging.info("Fitting baseline logistic regression model.")
+            model = LogisticRegression(max_iter=1000, random_state=self.random_state)
+            model.fit(self.X_train, self.y_train)
+            self._baseline_model = model
+        return self._baseline_model
+
+    @property
+    def data_norm(self):
+        """
+        Largest L2 norm of a training row, the bound diffprivlib would otherwise recompute
+        (with a privacy-leakage warning) on every differentially private fit.
+        """
+        if self._data_norm is None:
+            self._data_norm = float(np.linalg.norm(self.X_train, axis=1).max())
+        return self._data_norm
+
+def build_context(df, context=None):
+    """
+    Return the given context, or build a new one from df when none is supplied.
+    """
+    if context is not None:
+        return context
+    return EvaluationContext(df)
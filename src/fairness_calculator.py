@@ -1,29 +1,137 @@
 import logging
+from itertools import combinations
+from statistics import NormalDist
 import numpy as np
-from fairlearn.metrics import demographic_parity_difference
+import pandas as pd
+from column_profile import PROTECTED_CANDIDATES, profile_columns, columns_with_role, first_binary_column
 
 # Fix: Ensure reproducibility for NumPy operations
 np.random.seed(42)
 
-def evaluate_fairness(df):
+def find_binary_target(df, exclude=(), profile=None):
+    """
+    First column, outside exclude, with exactly two distinct non-null values.
+    """
+    return first_binary_column(profile_columns(df) if profile is None else profile, exclude)
+
+def _group_tables(group_codes, n_groups, outcome_cells, weights=None):
+    """
+    One bincount per grouping: for every group, the 2x2 table of
+    (actual positive, predicted positive) counts, as an array of shape (n_groups, 4).
+    With weights, the tables hold the summed row weights instead.
+    """
+    return np.bincount(group_codes * 4 + outcome_cells, weights=weights, minlength=n_groups * 4).reshape(n_groups, 4)
+
+def metrics_from_tables(tables, labels, population_counts=None, z=None, weighted_tables=None):
+    """
+    Demographic parity, equalized odds and disparate impact from per-group 2x2 tables.
+    Empty groups are ignored, and groups without actual positives (negatives) are left
+    out of the true (false) positive rate comparison. With population_counts and z (sampled data), a normal
+    approximation confidence interval for the demographic parity difference is added.
+    With weighted_tables (sampled data, every row weighted by the inverse of its stratum's
+    sampling fraction), the rates are estimated from those; counts stay the sampled rows.
+    """
+    present = tables.sum(axis=1) > 0
+    rate_tables = (tables if weighted_tables is None else weighted_tables)[present]
+    tables = tables[present]
+    labels = [label for label, keep in zip(labels, present) if keep]
+
+    # Columns: 0 = (neg, pred neg), 1 = (neg, pred pos), 2 = (pos, pred neg), 3 = (pos, pred pos)
+    counts = tables.sum(axis=1)
+    rate_counts = rate_tables.sum(axis=1)
+    predicted_positive = rate_tables[:, 1] + rate_tables[:, 3]
+    actual_positive = rate_tables[:, 2] + rate_tables[:, 3]
+    actual_negative = rate_counts - actual_positive
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        selection_rate = predicted_positive / rate_counts
+        tpr = np.where(actual_positive > 0, rate_tables[:, 3] / actual_positive, np.nan)
+        fpr = np.where(actual_negative > 0, rate_tables[:, 1] / actual_negative, np.nan)
+
+    dp_diff = float(selection_rate.max() - selection_rate.min())
+    max_rate = selection_rate.max()
+    disparate_impact = float(selection_rate.min() / max_rate) if max_rate > 0 else None
+    tpr_diff = np.nanmax(tpr) - np.nanmin(tpr) if np.any(~np.isnan(tpr)) else 0.0
+    fpr_diff = np.nanmax(fpr) - np.nanmin(fpr) if np.any(~np.isnan(fpr)) else 0.0
+
+    metrics = {
+        "demographic_parity_difference": dp_diff,
+        "equalized_odds_difference": float(max(tpr_diff, fpr_diff)),
+        "disparate_impact": disparate_impact,
+        "groups": {
+            str(label): {
+                "count": int(count),
+                "selection_rate": float(rate),
+                "true_positive_rate": None if np.isnan(t) else float(t),
+                "false_positive_rate": None if np.isnan(f) else float(f),
+            }
+            for label, count, rate, t, f in zip(labels, counts, selection_rate, tpr, fpr)
+        },
+    }
+
+    if population_counts is not None:
+        population = population_counts[present]
+        # Standard error of each group's selection rate, with finite population correction.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fpc = np.clip(1 - counts / population, 0.0, 1.0)
+            se = np.sqrt(selection_rate * (1 - selection_rate) / counts * fpc)
+        high, low = int(selection_rate.argmax()), int(selection_rate.argmin())
+        margin = z * float(np.sqrt(se[high] ** 2 + se[low] ** 2))
+        metrics["demographic_parity_ci"] = [max(0.0, dp_diff - margin), min(1.0, dp_diff + margin)]
+
+    return metrics
+
+def stratified_sample(strata, sample_size, random_state):
+    """
+    Row indices of a proportional stratified sample of about sample_size rows;
+    every stratum keeps at least one row, so small strata are oversampled (see sample_weights).
+    """
+    rng = np.random.default_rng(random_state)
+    n_rows = len(strata)
+    order = np.lexsort((rng.random(n_rows), strata))
+    sorted_strata = strata[order]
+    starts = np.flatnonzero(np.r_[True, sorted_strata[1:] != sorted_strata[:-1]])
+    stratum_sizes = np.diff(np.r_[starts, n_rows])
+    quotas = np.maximum(1, np.round(stratum_sizes * sample_size / n_rows)).astype(np.int64)
+    position = np.arange(n_rows) - np.repeat(starts, stratum_sizes)
+    return np.sort(order[position < np.repeat(quotas, stratum_sizes)])
+
+def sample_weights(strata, rows):
+    """
+    Weight of every sampled row: its stratum's size over the stratum's number of sampled rows,
+    so that weighted counts estimate the full data despite unequal sampling fractions.
+    """
+    n_strata = int(strata.max()) + 1 if len(strata) else 0
+    stratum_sizes = np.bincount(strata, minlength=n_strata)
+    sampled_sizes = np.bincount(strata[rows], minlength=n_strata)
+    return stratum_sizes[strata[rows]] / sampled_sizes[strata[rows]]
+
+def evaluate_fairness(df, y_pred=None, sample_size=None, confidence=0.95, random_state=42, profile=None):
+    """
+    Group fairness of a binary target over every protected attribute and their intersections.
+
+      - The target is the first binary column that is not a protected attribute.
+      - y_pred are the model's predictions for each row; without them the observed
+        outcomes are used, so only the selection-rate metrics are informative.
+      - With sample_size, frames larger than that are evaluated on a stratified sample
+        (by protected groups and target) and confidence intervals are reported.
+      - Protected attributes and the target are read from profile (see
+        column_profile.profile_columns), computed here when not given.
+
+    Returns:
+      demographic_parity_difference and mean_difference for the first protected attribute,
+      plus per-attribute and per-intersection metrics.
+    """
     logging.info("Starting fairness evaluation.")
 
-    # Define a set of candidate names for protected attributes
-    protected_candidates = {"sex", "gender", "race", "ethnicity"}
-    
+    if profile is None:
+        profile = profile_columns(df)
+
     # Detect potential protected attribute columns (case-insensitive match)
-    protected_cols = [col for col in df.columns if col.lower() in protected_candidates]
-    
+    protected_cols = columns_with_role(profile, "protected")
+
     # Detect a candidate target column: a binary column not in the protected candidates.
-    candidate_target = None
-    for col in df.columns:
-        # Skip columns that are potential protected attributes
-        if col in protected_cols:
-            continue
-        unique_vals = df[col].dropna().unique()
-        if len(unique_vals) == 2:
-            candidate_target = col
-            break
+    candidate_target = first_binary_column(profile, exclude=protected_cols)
 
     if candidate_target is None:
         logging.warning("No binary target column found. Skipping fairness evaluation.")
@@ -34,19 +142,67 @@ def evaluate_fairness(df):
         return {"demographic_parity_difference": None, "mean_difference": None}
 
     logging.info(f"Using target column: {candidate_target}")
-    logging.info(f"Using protected attribute: {protected_cols[0]}")
-    
-    y_true = df[candidate_target]
-    y_pred = df[candidate_target]  # Dummy predictions
+    logging.info(f"Using protected attributes: {protected_cols}")
+
+    y_true = df[candidate_target].to_numpy()
+    if y_pred is None:
+        y_pred = y_true  # Dummy predictions
+    y_pred = np.asarray(y_pred)
 
-    try:
-        dp = demographic_parity_difference(y_true, y_pred, sensitive_features=df[protected_cols[0]])
-    except Exception as e:
-        logging.error(f"Error computing demographic parity difference: {e}")
-        dp = None
+    # Integer-code every protected attribute once.
+    codes, labels = {}, {}
+    for col in protected_cols:
+        codes[col], labels[col] = pd.factorize(df[col], use_na_sentinel=False)
+    outcome_cells = (y_true == 1).astype(np.int64) * 2 + (y_pred == 1).astype(np.int64)
 
+    groupings = {col: (codes[col], list(labels[col])) for col in protected_cols}
+    for size in range(2, len(protected_cols) + 1):
+        for combo in combinations(protected_cols, size):
+            combined, uniques = pd.factorize(
+                pd.MultiIndex.from_arrays([codes[col] for col in combo])
+            )
+            combo_labels = [" & ".join(str(labels[col][code]) for col, code in zip(combo, key)) for key in uniques]
+            groupings[" & ".join(combo)] = (combined, combo_labels)
+
+    # Optional stratified sampling for very large frames.
+    rows = None
+    z = None
+    if sample_size and len(df) > sample_size:
+        all_cols = list(protected_cols)
+        strata, _ = pd.factorize(pd.MultiIndex.from_arrays([codes[col] for col in all_cols] + [outcome_cells]))
+        rows = stratified_sample(strata, sample_size, random_state)
+        weights = sample_weights(strata, rows)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        logging.info(f"Evaluating fairness on a stratified sample of {len(rows)} of {len(df)} rows.")
+
+    results_by_grouping = {}
+    for name, (group_codes, group_labels) in groupings.items():
+        n_groups = len(group_labels)
+        population_counts = None
+        if rows is not None:
+            population_counts = np.bincount(group_codes, minlength=n_groups)
+            tables = _group_tables(group_codes[rows], n_groups, outcome_cells[rows])
+            weighted_tables = _group_tables(group_codes[rows], n_groups, outcome_cells[rows], weights)
+        else:
+            tables = _group_tables(group_codes, n_groups, outcome_cells)
+            weighted_tables = None
+        results_by_grouping[name] = metrics_from_tables(tables, group_labels, population_counts, z, weighted_tables)
+
+    attributes = {col: results_by_grouping[col] for col in protected_cols}
+    intersections = {name: metrics for name, metrics in results_by_grouping.items() if name not in attributes}
+
+    dp = attributes[protected_cols[0]]["demographic_parity_difference"]
     mean_diff = np.abs(np.mean(y_true) - np.mean(y_pred))
-    
-    fairness_results = {"demographic_parity_difference": dp, "mean_difference": mean_diff}
+
+    fairness_results = {
+        "demographic_parity_difference": dp,
+        "mean_difference": mean_diff,
+        "target_column": candidate_target,
+        "protected_attribute": protected_cols[0],
+        "max_demographic_parity_difference": max(m["demographic_parity_difference"] for m in results_by_grouping.values()),
+        "attributes": attributes,
+        "intersections": intersections,
+        "sampled_rows": None if rows is None else int(len(rows)),
+    }
     logging.info("Fairness evaluation completed.")
     return fairness_results
@@ -0,0 +1,369 @@
+import io
+import os
+import pickle
+import hashlib
+import logging
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+from data_preprocessor import preprocess_data
+from column_profile import column_roles
+from fairness_calculator import metrics_from_tables
+from online_model import OnlineLogisticModel, Reservoir, hash_split
+from result_cache import evaluator_code_digest
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+STATE_VERSION = 1
+DEFAULT_STATE_DIR = os.path.join("Output_report", ".incremental")
+
+# Rows kept per split for the accuracy, attack, explanation and privacy estimates.
+RESERVOIR_SIZE = 10000
+TEST_FRACTION = 0.2
+# SGD passes over the rows already in the file when its state is first built.
+FIRST_BATCH_EPOCHS = 5
+
+_FINGERPRINT_BYTES = 64 * 1024
+
+class IncrementalContext:
+    """
+    Evaluation context of an append-only file, updated with each batch of new rows. It has
+    the attributes of EvaluationContext, so the model-based calculators use it unchanged.
+
+      - The last column is the target. Rows go to the test split by a hash of their position
+        in the file (about TEST_FRACTION of them), the others are used for training.
+      - baseline_model is an OnlineLogisticModel, updated with every new training row.
+      - X_train/X_test are uniform reservoir samples of at most RESERVOIR_SIZE rows of each
+        split; data_norm is the largest training-row norm over the whole file.
+    """
+
+    def __init__(self, feature_columns, target_column, classes, random_state=42):
+        self.feature_columns = list(feature_columns)
+        self.target_column = target_column
+        self.random_state = random_state
+        self.baseline_model = OnlineLogisticModel(classes, random_state=random_state)
+        self.data_norm = 0.0
+        self.rows = 0
+        self._train = Reservoir(RESERVOIR_SIZE, len(self.feature_columns), random_state)
+        self._test = Reservoir(RESERVOIR_SIZE, len(self.feature_columns), random_state + 1)
+
+    def update(self, df, epochs=1):
+        X = df[self.feature_columns].to_numpy(dtype=np.float64)
+        y = df[self.target_column].to_numpy()
+        is_test = hash_split(self.rows + np.arange(len(df)), TEST_FRACTION)
+        self.rows += len(df)
+
+        X_train, y_train = X[~is_test], y[~is_test]
+        self.baseline_model.partial_fit(X_train, y_train, epochs=epochs, random_state=self.random_state)
+        self._train.add(X_train, y_train)
+        self._test.add(X[is_test], y[is_test])
+        if len(X_train):
+            self.data_norm = max(self.data_norm, float(np.linalg.norm(X_train, axis=1).max()))
+
+    @property
+    def X_train(self):
+        return self._train.X
+
+    @property
+    def y_train(self):
+        return self._train.y
+
+    @property
+    def X_test(self):
+        return self._test.X
+
+    @property
+    def y_test(self):
+        return self._test.y
+
+def _state_path(file_path, state_dir):
+    path_digest = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:16]
+    return os.path.join(state_dir, f"{os.path.basename(file_path)}-{path_digest}.pkl")
+
+def _load_state(state_path):
+    try:
+        with open(state_path, "rb") as state_file:
+            return pickle.load(state_file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable incremental state '{state_path}': {e}")
+        return None
+
+def _save_state(state, state_path):
+    try:
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        tmp_path = f"{state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as state_file:
+            pickle.dump(state, state_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, state_path)
+    except OSError as e:
+        logging.warning(f"Could not save incremental state: {e}")
+
+def _fingerprint(read_range, offset):
+    """
+    SHA-256 of the first and last _FINGERPRINT_BYTES already consumed, to detect a file
+    that was rewritten rather than appended to.
+    """
+    digest = hashlib.sha256()
+    digest.update(read_range(0, min(_FINGERPRINT_BYTES, offset)))
+    start = max(0, offset - _FINGERPRINT_BYTES)
+    digest.update(read_range(start, offset - start))
+    return digest.hexdigest()
+
+def _file_fingerprint(file_path, offset):
+    with open(file_path, "rb") as f:
+        def read_range(start, size):
+            f.seek(start)
+            return f.read(size)
+        return _fingerprint(read_range, offset)
+
+def _complete_records(data):
+    """
+    data up to the end of its last complete CSV record. A newline inside a quoted field (an odd
+    number of quotes before it) does not end a record, and a last record without its newline
+    may still be being written; either is left for the next run.
+    """
+    end = data.rfind(b"\n")
+    quotes = data.count(b'"', 0, max(end, 0))
+    while end >= 0 and quotes % 2:
+        previous = data.rfind(b"\n", 0, end)
+        quotes -= data.count(b'"', max(previous, 0), end)
+        end = previous
+    return data[:end + 1]
+
+def append_digest(file_path):
+    """
+    Cheap content key of an append-only file for the result cache and the results store:
+    its size and the fingerprint of its first and last bytes, the same check that tells an
+    appended file from a rewritten one here, so an unchanged log is not hashed in full.
+    """
+    size = os.path.getsize(file_path)
+    return hashlib.sha256(f"{size}:{_file_fingerprint(file_path, size)}".encode()).hexdigest()
+
+def _new_fairness_state(df):
+    """
+    Fairness sufficient statistics: the protected attributes, the target column and, per
+    grouping (each protected attribute and every intersection), the 2x2 outcome counts of each group.
+    Non-protected columns up to the target keep their distinct values while they have at most
+    two, because the target is the first binary column and an appended row can change which one it is.
+    """
+    protected = [col for col in df.columns if "protected" in column_roles(col)]
+    if not protected:
+        return None
+    fairness = {"protected": protected, "distinct": {}, "target": None, "tables": {}}
+    for col in df.columns:
+        if col in protected:
+            continue
+        uniques = pd.unique(df[col].to_numpy())
+        fairness["distinct"][col] = set(uniques.tolist()) if len(uniques) <= 2 else None
+        if len(uniques) == 2:
+            fairness["target"] = col
+            break
+    return fairness
+
+def _target_changed(fairness, df):
+    """
+    Add the distinct values of df to the tracked columns; True if the first binary column is now a different one.
+    """
+    target = None
+    for col, values in fairness["distinct"].items():
+        if values is not None:
+            values.update(pd.unique(df[col].to_numpy()).tolist())
+            if len(values) > 2:
+                fairness["distinct"][col] = values = None
+        if target is None and values is not None and len(values) == 2:
+            target = col
+    return target != fairness["target"]
+
+def _update_group_tables(fairness, df):
+    y_true = df[fairness["target"]].to_numpy()
+    y_pred = y_true  # Dummy predictions, as in evaluate_fairness
+    outcome_cells = (y_true == 1).astype(np.int64) * 2 + (y_pred == 1).astype(np.int64)
+    protected = fairness["protected"]
+    for size in range(1, len(protected) + 1):
+        for combo in combinations(protected, size):
+            codes, keys = pd.factorize(pd.MultiIndex.from_arrays([df[col].to_numpy() for col in combo]))
+            counts = np.bincount(codes * 4 + outcome_cells, minlength=len(keys) * 4).reshape(len(keys), 4)
+            table = fairness["tables"].setdefault(" & ".join(combo), {})
+            for key, key_counts in zip(keys, counts):
+                table[key] = table.get(key, 0) + key_counts
+
+def fairness_results(state):
+    """
+    evaluate_fairness results recomputed from the stored group counts, without reading any row.
+    """
+    fairness = state["fairness"]
+    if fairness is None or fairness["target"] is None:
+        logging.warning("No protected attribute or binary target column found. Skipping fairness evaluation.")
+        return {"demographic_parity_difference": None, "mean_difference": None}
+
+    results_by_grouping = {}
+    for name, table in fairness["tables"].items():
+        keys = list(table)
+        labels = [" & ".join(str(value) for value in key) for key in keys]
+        results_by_grouping[name] = metrics_from_tables(np.array([table[key] for key in keys]), labels)
+
+    protected = fairness["protected"]
+    attributes = {col: results_by_grouping[col] for col in protected}
+    return {
+        "demographic_parity_difference": attributes[protected[0]]["demographic_parity_difference"],
+        "mean_difference": 0.0,
+        "target_column": fairness["target"],
+        "protected_attribute": protected[0],
+        "max_demographic_parity_difference": max(m["demographic_parity_difference"] for m in results_by_grouping.values()),
+        "attributes": attributes,
+        "intersections": {name: m for name, m in results_by_grouping.items() if name not in attributes},
+        "sampled_rows": None,
+    }
+
+def _new_context(df):
+    if df.shape[1] < 2:
+        logging.warning("Not enough columns to separate features and target.")
+        return None
+    classes = np.unique(df[df.columns[-1]].to_numpy())
+    if len(classes) < 2:
+        logging.warning("The target column has a single class; no model can be trained yet.")
+        return None
+    context = IncrementalContext(df.columns[:-1], df.columns[-1], classes)
+    context.update(df, epochs=FIRST_BATCH_EPOCHS)
+    return context
+
+def _preprocess_new_rows(raw, state):
+    """
+    Apply the keep/encode decisions of the first batch to new rows. Categories not seen before
+    get the next free code. Returns None if a numeric column received non-numeric values.
+    """
+    columns = {}
+    for col in state["columns"]:
+        if col in state["category_maps"]:
+            categories = state["category_maps"][col]
+            codes_by_value = {value: code for code, value in enumerate(categories)}
+            codes, uniques = pd.factorize(raw[col].fillna("Missing").astype(str))
+            for value in uniques:
+                if value not in codes_by_value:
+                    codes_by_value[value] = len(categories)
+                    categories.append(value)
+            columns[col] = np.array([codes_by_value[value] for value in uniques], dtype=np.int64)[codes]
+        elif pd.api.types.is_numeric_dtype(raw[col]):
+            columns[col] = raw[col].fillna(0).to_numpy()
+        else:
+            return None
+    return pd.DataFrame(columns, index=raw.index)
+
+def _build_state(file_path):
+    """
+    Read the whole file once and build its incremental state.
+    """
+    with open(file_path, "rb") as f:
+        data = _complete_records(f.read())
+    category_maps = {}
+    df = preprocess_data(pd.read_csv(io.BytesIO(data)), category_maps=category_maps)
+    header = list(pd.read_csv(io.BytesIO(data), nrows=0).columns)
+
+    state = {
+        "version": STATE_VERSION,
+        "code": evaluator_code_digest(),
+        "header": header,
+        "columns": list(df.columns),
+        "category_maps": category_maps,
+        "offset": len(data),
+        "fingerprint": _fingerprint(lambda start, size: data[start:start + size], len(data)),
+        "rows": len(df),
+        "classes": np.unique(df[df.columns[-1]].to_numpy()) if len(df.columns) else None,
+        "fairness": _new_fairness_state(df),
+        "context": _new_context(df),
+    }
+    if state["fairness"] is not None and state["fairness"]["target"] is not None:
+        _update_group_tables(state["fairness"], df)
+    return state
+
+def _apply_new_rows(state, file_path):
+    """
+    Update state with the rows appended since its offset.
+
+    Returns:
+      None when the state is up to date, or the reason it has to be rebuilt from the whole file.
+    """
+    offset = state["offset"]
+    if os.path.getsize(file_path) < offset:
+        return "the file shrank"
+    if _file_fingerprint(file_path, offset) != state["fingerprint"]:
+        return "rows already read have changed"
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        data = _complete_records(f.read())
+    if not data.strip():
+        logging.info(f"No new rows in {os.path.basename(file_path)}.")
+        return None
+
+    raw = pd.read_csv(io.BytesIO(data), header=None, names=state["header"],
+                      dtype={col: str for col in state["category_maps"]})
+    df = _preprocess_new_rows(raw, state)
+    if df is None:
+        return "a numeric column received non-numeric values"
+    if state["classes"] is not None and not np.isin(df[df.columns[-1]].to_numpy(), state["classes"]).all():
+        return "a new target class appeared"
+    fairness = state["fairness"]
+    if fairness is not None and _target_changed(fairness, df):
+        return "the fairness target column changed"
+
+    if fairness is not None and fairness["target"] is not None:
+        _update_group_tables(fairness, df)
+    if state["context"] is not None:
+        state["context"].update(df)
+    state["offset"] = offset + len(data)
+    state["fingerprint"] = _file_fingerprint(file_path, state["offset"])
+    state["rows"] += len(df)
+    logging.info(f"Incremental update of {os.path.basename(file_path)}: {len(df)} new rows ({state['rows']} in total).")
+    return None
+
+def update_file_state(file_path, state_dir=DEFAULT_STATE_DIR):
+    """
+    Bring the saved state of an append-only file up to date and save it: only rows after the
+    stored byte offset are read, and the fairness group counts and the online model are
+    updated with them. The state is rebuilt from the whole file when the file was rewritten,
+    the evaluator code changed, or the new rows change the target or column types.
+
+    Returns:
+      The state; see fairness_results, state_frame and state["context"].
+    """
+    try:
+        state_path = _state_path(file_path, state_dir)
+        state = _load_state(state_path)
+        if state is None:
+            reason = "no saved state"
+        elif state.get("version") != STATE_VERSION or state.get("code") != evaluator_code_digest():
+            reason = "the evaluator code changed"
+        else:
+            reason = _apply_new_rows(state, file_path)
+        if reason:
+            logging.info(f"Building the incremental state of {os.path.basename(file_path)} from scratch ({reason}).")
+            state = _build_state(file_path)
+        _save_state(state, state_path)
+        return state
+
+    except Exception as e:
+        logging.error(f"Incremental update failed for {file_path}: {e}")
+        raise
+
+def state_frame(state):
+    """
+    Empty frame with the preprocessed columns, for calculators that only look at column names.
+    """
+    return pd.DataFrame(columns=state["columns"])
+
+def clear_state(state_dir=DEFAULT_STATE_DIR):
+    """
+    Remove every saved incremental state.
+    """
+    removed = 0
+    for file_name in os.listdir(state_dir) if os.path.isdir(state_dir) else []:
+        if file_name.endswith(".pkl"):
+            os.remove(os.path.join(state_dir, file_name))
+            removed += 1
+    logging.info(f"Incremental state invalidated ({removed} files removed).")
@@ -0,0 +1,131 @@
+import importlib
+
+def _fairness_score(results):
+    dp_diff = results.get("demographic_parity_difference")
+    if dp_diff is None:
+        return None
+    return max(0.0, min(1.0, 1 - abs(dp_diff)))
+
+# Features of the global importance table written to results.csv.
+TOP_FEATURE_COLUMNS = 5
+
+def _transparency_columns(results):
+    # Global feature-importance ranking, when several rows were explained (--explain-rows).
+    if (results.get("explained_rows") or 0) < 2:
+        return {}
+    columns = {}
+    for rank, (feature, weight) in enumerate(results.get("global_importance", [])[:TOP_FEATURE_COLUMNS], start=1):
+        columns[f"Top Feature {rank}"] = feature
+        columns[f"Top Feature {rank} Importance"] = weight
+    return columns
+
+def _robustness_columns(results):
+    # Accuracy-vs-eps curve, when more eps values than the scored one were requested.
+    curve = results.get("accuracy_curve") or []
+    if len(curve) < 2:
+        return {}
+    return {f"Robustness Accuracy eps={eps:g}": accuracy for eps, accuracy in curve}
+
+def _fairness_columns(results):
+    # Confidence interval of the demographic parity difference when fairness was sampled.
+    metrics = results.get("attributes", {}).get(results.get("protected_attribute"), {})
+    interval = metrics.get("demographic_parity_ci")
+    if not interval:
+        return {}
+    return {"Demographic Parity Difference CI Low": interval[0], "Demographic Parity Difference CI High": interval[1]}
+
+def _accountability_score(results):
+    if not results:
+        return None
+    # Sum the boolean flags (True->1, False->0)
+    a_sum = (float(results.get("auditability", False)) +
+             float(results.get("explainability", False)) +
+             float(results.get("traceability", False)))
+    # If all flags are false, accountability = None.
+    if a_sum == 0:
+        return None
+    return a_sum / 3
+
+def _privacy_columns(results):
+    columns = {}
+    for point in results.get("privacy_sweep", []):
+        label = f"Privacy Accuracy eps={point['epsilon']:g}"
+        columns[label] = point["mean_accuracy"]
+        columns[f"{label} CI Low"] = point["ci_low"]
+        columns[f"{label} CI High"] = point["ci_high"]
+    return columns
+
+# Registry of the ethical indicators, in evaluation order. Calculator modules are only
+# imported when their indicator is requested, so heavy libraries (LIME, ART, diffprivlib,
+# scikit-learn) are not loaded by runs that do not need them.
+#   module/function: where the evaluator lives
+#   column:          results.csv column holding the indicator score
+#   uses_context:    whether the evaluator takes the shared EvaluationContext
+#   uses_profile:    whether the evaluator takes the shared column profile (column_profile.profile_columns)
+#   score:           0-1 score from the evaluator results, None when not applicable
+#   extra_columns:   additional results.csv columns from the evaluator results
+#   cost:            "cheap" (column scans and group counts) or "expensive" (model training,
+#                    explanations, attacks); triage mode runs expensive indicators on a sample first
+INDICATORS = {
+    "fairness": {
+        "module": "fairness_calculator", "function": "evaluate_fairness", "column": "Fairness Score",
+        "uses_context": False, "uses_profile": True, "score": _fairness_score, "cost": "cheap",
+        "extra_columns": _fairness_columns,
+    },
+    "transparency": {
+        "module": "transparency_calculator", "function": "evaluate_transparency", "column": "Transparency Score",
+        "uses_context": True, "score": lambda results: results.get("model_accuracy", None), "cost": "expensive",
+        "extra_columns": _transparency_columns,
+    },
+    "robustness": {
+        "module": "robustness_calculator", "function": "evaluate_robustness", "column": "Robustness Score",
+        "uses_context": True, "score": lambda results: results.get("adversarial_accuracy", None), "cost": "expensive",
+        "extra_columns": _robustness_columns,
+    },
+    "privacy": {
+        "module": "privacy_calculator", "function": "evaluate_privacy", "column": "Privacy Score",
+        "uses_context": True, "score": lambda results: results.get("privacy_accuracy", None),
+        "extra_columns": _privacy_columns, "cost": "expensive",
+    },
+    "accountability": {
+        "module": "accountability_calculator", "function": "evaluate_accountability", "column": "Accountability Score",
+        "uses_context": False, "uses_profile": True, "score": _accountability_score, "cost": "cheap",
+    },
+}
+
+INDICATOR_NAMES = list(INDICATORS)
+
+# Scores at or above this are reported as "present".
+PRESENT_THRESHOLD = 0.7
+
+def resolve_indicators(names=None):
+    """
+    Validate a selection of indicator names and return it in evaluation order (all when None).
+    """
+    if not names:
+        return list(INDICATOR_NAMES)
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicator(s): {', '.join(unknown)}. Choose from: {', '.join(INDICATOR_NAMES)}.")
+    return [name for name in INDICATOR_NAMES if name in names]
+
+def load_evaluator(name):
+    """
+    Import the calculator module of an indicator on first use and return its evaluate function.
+    """
+    spec = INDICATORS[name]
+    module = importlib.import_module(spec["module"])
+    return getattr(module, spec["function"])
+
+def indicator_score(name, results):
+    """
+    0-1 score of an indicator from its evaluator results, or None when not applicable.
+    """
+    return INDICATORS[name]["score"](results)
+
+def indicator_columns(name, results):
+    """
+    Additional results.csv columns an indicator contributes (e.g. the privacy sweep).
+    """
+    extra_columns = INDICATORS[name].get("extra_columns")
+    return extra_columns(results) if extra_columns else {}
@@ -0,0 +1,147 @@
+import io
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+import resource
+from contextlib import contextmanager
+from datetime import datetime
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_TRACE_PATH = os.path.join("Output_report", "trace.jsonl")
+DEFAULT_PROFILE_DIR = os.path.join("Output_report", "profiles")
+
+def reset_peak_rss():
+    """
+    Reset the kernel's peak-RSS counter (Linux only), so the next reading covers one stage.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+def rss_bytes(field):
+    """
+    Current (VmRSS) or peak (VmHWM) resident memory of this process, in bytes.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Fallback: lifetime peak of the process (kilobytes on Linux).
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _cpu_seconds():
+    # This process plus the worker processes it has already reaped (LIME, privacy sweep pools).
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+@contextmanager
+def stage(records, name, df=None, file_name=None):
+    """
+    Measure the enclosed block and append its record to records:
+      - wall and CPU time (CPU includes finished child processes),
+      - peak resident memory during the block and its growth over the starting RSS,
+      - rows and columns of df, when given; callers can also set them on the yielded record,
+      - status "ok", or "error" if the block raised (the exception is re-raised).
+    """
+    record = {"file": file_name, "stage": name, "started_at": datetime.now().isoformat(timespec="seconds"),
+              "rows": None, "columns": None}
+    if df is not None:
+        record["rows"], record["columns"] = df.shape
+    reset_peak_rss()
+    start_rss = rss_bytes("VmRSS")
+    start_wall = time.perf_counter()
+    start_cpu = _cpu_seconds()
+    record["status"] = "error"
+    try:
+        yield record
+        record["status"] = "ok"
+    finally:
+        record["wall_seconds"] = time.perf_counter() - start_wall
+        record["cpu_seconds"] = _cpu_seconds() - start_cpu
+        peak_rss = max(rss_bytes("VmHWM"), start_rss)
+        record["peak_rss_mb"] = peak_rss / 1e6
+        record["rss_growth_mb"] = (peak_rss - start_rss) / 1e6
+        records.append(record)
+
+def set_shape(record, df):
+    """
+    Record the rows, columns and in-memory size (MB, including strings) of a stage's output frame.
+    """
+    record["rows"], record["columns"] = df.shape
+    record["frame_mb"] = df.memory_usage(index=False, deep=True).sum() / 1e6
+
+def timing_columns(records):
+    """
+    Extra results.csv columns for one file: seconds per stage, total seconds and peak memory.
+    A stage that ran more than once (e.g. context and the indicators on the triage sample,
+    then on the full data) gets the sum of its runs.
+    """
+    columns = {}
+    for record in records:
+        column = f"{record['stage']} Seconds"
+        columns[column] = columns.get(column, 0.0) + record["wall_seconds"]
+    if records:
+        columns["Total Seconds"] = sum(record["wall_seconds"] for record in records)
+        columns["Peak Memory MB"] = max(record["peak_rss_mb"] for record in records)
+    return columns
+
+def reset_trace(trace_path=DEFAULT_TRACE_PATH):
+    """
+    Start a new JSON-lines trace, so the file only holds the current run.
+    """
+    os.makedirs(os.path.dirname(trace_path) or ".", exist_ok=True)
+    open(trace_path, "w").close()
+
+def append_trace(records, trace_path=DEFAULT_TRACE_PATH):
+    """
+    Append stage records to the JSON-lines trace. All lines go out in one write on a file
+    opened for appending, so records of files evaluated in parallel do not interleave.
+    """
+    if not records:
+        return
+    try:
+        os.makedirs(os.path.dirname(trace_path) or ".", exist_ok=True)
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in records)
+        with open(trace_path, "a") as trace_file:
+            trace_file.write(lines)
+    except OSError as e:
+        logging.warning(f"Could not write the instrumentation trace: {e}")
+
+def profile_path(file_path, profile_dir=DEFAULT_PROFILE_DIR):
+    """
+    Where the cProfile output of one dataset is written.
+    """
+    return os.path.join(profile_dir, f"{os.path.splitext(os.path.basename(file_path))[0]}.prof")
+
+def profile_call(output_path, func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) under cProfile. The raw stats are dumped to output_path
+    (open with pstats or snakeviz) and the 30 most expensive calls by cumulative time
+    are written next to it as text.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        profiler.dump_stats(output_path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(30)
+        summary_path = os.path.splitext(output_path)[0] + ".txt"
+        with open(summary_path, "w") as summary_file:
+            summary_file.write(summary.getvalue())
+        logging.info(f"Profile written to '{output_path}' (summary in '{summary_path}')")
@@ -1,128 +1,455 @@
 ﻿import os
+import inspect
+import argparse
 import logging
+from functools import partial
 import pandas as pd
 from datetime import datetime
 
 # Import updated modules
-from data_loader import load_csv
-from data_preprocessor import preprocess_data, save_processed_data
-from fairness_calculator import evaluate_fairness
-from transparency_calculator import evaluate_transparency
-from robustness_calculator import evaluate_robustness
-from privacy_calculator import evaluate_privacy
-from accountability_calculator import evaluate_accountability
+from data_loader import load_table, table_format, is_data_file, prefetch_table
+from data_preprocessor import preprocess_data, preprocess_csv_chunked, save_processed_data, plan_columns
+from column_profile import profile_columns, columns_with_role, first_binary_column
+from indicators import INDICATORS, INDICATOR_NAMES, PRESENT_THRESHOLD, resolve_indicators, load_evaluator, indicator_score, indicator_columns
+from scheduler import run_in_process_pool, default_worker_count
+import result_cache
+import results_store
+import processed_cache
+import instrumentation
+import uncertainty
+import triage
+from streaming_context import DEFAULT_BLOCK_ROWS
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def process_all_files(data_folder):
+def load_processed_frame(file_path, chunksize=None, use_processed_cache=False, records=None, content_digest=None):
+    """
+    Load and preprocess one dataset (CSV, XLSX or Parquet), or memory-map it if this content
+    was preprocessed before (use_processed_cache). chunksize applies to CSV files only.
+    content_digest is the file's content hash when the caller already computed it.
+    Stages are measured into records when given.
+    """
+    file_name = os.path.basename(file_path)
+    records = [] if records is None else records
+    chunksize = chunksize if table_format(file_path) == "csv" else None
+    cached = None
+    if use_processed_cache:
+        with instrumentation.stage(records, "load_processed_cache", file_name=file_name) as record:
+            # The file is hashed once, for both the lookup and the store below.
+            content_digest = content_digest or result_cache.file_digest(file_path)
+            cached = processed_cache.load_processed(
+                processed_cache.processed_key(file_path, chunked=bool(chunksize), content_digest=content_digest))
+            if cached is not None:
+                instrumentation.set_shape(record, cached[0])
+    if cached is not None:
+        return cached[0]
+
+    category_maps = {}
+    if chunksize:
+        with instrumentation.stage(records, "preprocess_csv_chunked", file_name=file_name) as record:
+            df = preprocess_csv_chunked(file_path, chunksize=chunksize, category_maps=category_maps)
+            instrumentation.set_shape(record, df)
+    else:
+        with instrumentation.stage(records, "load_table", file_name=file_name) as record:
+            # Columns preprocessing would drop are never parsed.
+            df = load_table(file_path, *plan_columns(file_path))
+            instrumentation.set_shape(record, df)
+        with instrumentation.stage(records, "preprocess_data", df, file_name=file_name) as record:
+            df = preprocess_data(df, category_maps=category_maps)
+            instrumentation.set_shape(record, df)
+    if use_processed_cache:
+        try:
+            save_processed_data(df, file_path, category_maps, chunked=bool(chunksize), content_digest=content_digest)
+        except Exception as e:
+            logging.warning(f"Preprocessed data of {file_name} not cached: {e}")
+    return df
+
+def build_shared_context(df, indicators, records=None, file_name=None, streaming_block_rows=None, model=None):
+    """
+    Shared train/test split and baseline model, when a model-based indicator is requested.
+    The model libraries are imported and the baseline model is fitted as their own measured
+    stages, so their cost is not charged to the context or to whichever indicator happens to
+    use the model first. With streaming_block_rows, the model is
+    trained out of core on blocks of that many rows instead (see streaming_context). With
+    model, that fitted model is audited instead of a baseline model.
+    Returns None if no context is needed or possible.
+    """
+    records = [] if records is None else records
+    if not any(INDICATORS[name]["uses_context"] for name in indicators):
+        return None
+    try:
+        # scikit-learn is imported as its own stage, so that its one-off import time is not
+        # charged to the first file's "context" stage.
+        with instrumentation.stage(records, "model_imports", file_name=file_name):
+            if streaming_block_rows:
+                from streaming_context import StreamingContext
+                import online_model
+            else:
+                from evaluation_context import EvaluationContext
+        with instrumentation.stage(records, "context", df, file_name=file_name):
+            if streaming_block_rows:
+                context = StreamingContext(df, block_rows=streaming_block_rows, model=model)
+            else:
+                context = EvaluationContext(df, model=model)
+    except Exception as e:
+        logging.warning(f"Could not build the evaluation context for {file_name}: {e}")
+        return None
+    if model is None and {"transparency", "robustness"} & set(indicators):
+        try:
+            with instrumentation.stage(records, "baseline_model", df, file_name=file_name):
+                context.baseline_model
+        except Exception as e:
+            logging.warning(f"Could not fit the baseline model for {file_name}: {e}")
+    return context
+
+def model_predictions(df, model, profile, records=None, file_name=None):
+    """
+    Predictions of model for every row, used as fairness y_pred when the fairness target is
+    also the model's target (the last column); None otherwise.
+    """
+    records = [] if records is None else records
+    target = first_binary_column(profile, exclude=columns_with_role(profile, "protected"))
+    if model is None or target is None or target != df.columns[-1]:
+        return None
+    from model_backend import predict_frame
+    with instrumentation.stage(records, "predict", df, file_name=file_name):
+        return predict_frame(model, df, list(df.columns[:-1]))
+
+def evaluate_indicators(names, df, context, profile, indicator_options, precomputed=None, records=None,
+                        file_name=None):
+    """
+    Run the named indicators on df; a failure only voids its own score.
+
+    Returns:
+      (scores, results, extra_columns): the score (None when not applicable or failed) and
+      evaluator results per indicator, and the extra results.csv columns.
+    """
+    precomputed = precomputed or {}
+    records = [] if records is None else records
+    scores = {}
+    all_results = {}
+    extra_columns = {}
+    for name in names:
+        try:
+            evaluate = load_evaluator(name)
+            kwargs = dict(indicator_options.get(name, {}))
+            if INDICATORS[name]["uses_context"]:
+                kwargs["context"] = context
+            if INDICATORS[name].get("uses_profile"):
+                kwargs["profile"] = profile
+            with instrumentation.stage(records, name, df, file_name=file_name):
+                results = precomputed[name] if name in precomputed else evaluate(df, **kwargs)
+            scores[name] = indicator_score(name, results)
+            all_results[name] = results
+            extra_columns.update(indicator_columns(name, results))
+        except Exception as e:
+            logging.warning(f"{name.capitalize()} evaluation failed for {file_name}: {e}")
+            scores[name] = None
+    return scores, all_results, extra_columns
+
+def process_file(file_path, indicators=None, chunksize=None, fairness_sample_size=None, explain_rows=1,
+                 explanation_method="auto", lime_workers=1, eps_values=None, privacy_epsilons=None,
+                 privacy_seeds=10, privacy_workers=1, timing_columns=False, trace_path=None,
+                 use_processed_cache=False, incremental=False, streaming_block_rows=None, bootstrap_resamples=None,
+                 model=None, model_path=None, triage_sample_rows=None, content_digest=None):
+    """
+    Run the requested indicators (all by default) on one dataset and build its results.csv row.
+    With chunksize, the file is streamed into a compact column store instead of
+    being parsed in one go (see preprocess_csv_chunked). With fairness_sample_size,
+    fairness on larger frames is computed on a stratified sample of that many rows.
+    explain_rows, explanation_method and lime_workers are passed to evaluate_transparency,
+    eps_values (extra attack sizes for the accuracy-vs-eps curve) to evaluate_robustness.
+    privacy_epsilons adds a privacy-utility sweep (privacy_seeds runs per epsilon on
+    privacy_workers processes) whose mean accuracy and CI become extra columns.
+    With use_processed_cache, the preprocessed columns are stored once per file content
+    and memory-mapped by later runs instead of parsing and preprocessing the file again;
+    content_digest is the file's content hash when the caller already computed it.
+    With incremental, only rows appended since the previous run are read, and scores come
+    from the file's saved state (see incremental_state.update_file_state).
+    With streaming_block_rows, the baseline model of the model-based indicators is trained
+    with minibatch SGD over blocks of that many rows and scored on a reservoir-sampled
+    holdout (see streaming_context.StreamingContext), so no full float64 copy of the data is made.
+    With bootstrap_resamples, percentile bootstrap confidence intervals of the fairness,
+    transparency, robustness and final scores become extra columns (see uncertainty.score_intervals).
+    With model (a fitted estimator or model_backend.CallableModel) or model_path (a pickled
+    estimator), that model is audited instead of a baseline model: it receives the preprocessed
+    feature columns (all but the last) and its predictions are computed once and shared by
+    transparency, robustness and, when the fairness target is the last column, fairness.
+    With triage_sample_rows, the cheap indicators (see indicators.INDICATORS) run on the full
+    data and the expensive, model-based ones on a stratified sample of that many rows first
+    (see triage.triage_sample); only those whose sample score is too close to the "present"
+    threshold to decide are computed again on the full data (see triage.needs_full_data).
+    Indicators that inspect column names and values share one column profile
+    (see column_profile.profile_columns). Every stage is measured (see instrumentation.stage): with trace_path the records are
+    appended to that JSON-lines trace, with timing_columns their times and peak memory
+    become extra columns.
+
+    Returns:
+      A dictionary with one score per requested indicator ("NA" when not applicable),
+      or None if the file could not be loaded.
+    """
+    file_name = os.path.basename(file_path)
+    logging.info(f"Processing file: {file_name}")
+    indicators = resolve_indicators(indicators)
+    indicator_options = {
+        "fairness": {"sample_size": fairness_sample_size},
+        "transparency": {"explain_rows": explain_rows, "explanation_method": explanation_method,
+                         "n_workers": lime_workers},
+        "robustness": {"eps_values": eps_values},
+        "privacy": {"epsilons": privacy_epsilons, "n_seeds": privacy_seeds, "n_workers": privacy_workers},
+    }
+
+    records = []
+    try:
+        precomputed = {}
+        if model is None and model_path:
+            from model_backend import load_model
+            model = load_model(model_path)
+        if incremental and table_format(file_path) != "csv":
+            logging.info(f"Incremental mode only applies to CSV logs; evaluating {file_name} in full.")
+            incremental = False
+        if incremental and model is not None:
+            logging.info(f"Incremental mode trains its own online model; evaluating {file_name} in full to audit the given model.")
+            incremental = False
+        if incremental:
+            # 1-2. Update the file's saved state with its appended rows only.
+            import incremental_state
+            with instrumentation.stage(records, "incremental_update", file_name=file_name) as record:
+                state = incremental_state.update_file_state(file_path)
+                record["rows"], record["columns"] = state["rows"], len(state["columns"])
+            df = incremental_state.state_frame(state)
+            context = state["context"]
+            precomputed["fairness"] = incremental_state.fairness_results(state)
+        else:
+            # 1. Load and preprocess the data.
+            df = load_processed_frame(file_path, chunksize, use_processed_cache, records, content_digest)
+        # In triage mode, the expensive indicators are first evaluated on a sample (step 3b).
+        triaged = []
+        if triage_sample_rows and not incremental and len(df) > triage_sample_rows:
+            full_indicators, triaged = triage.split_by_cost(indicators)
+        else:
+            full_indicators = indicators
+        if not incremental:
+            # 2. Shared train/test split and baseline model for the model-based indicators.
+            context = build_shared_context(df, full_indicators, records, file_name, streaming_block_rows, model)
+        # Debug: print columns after preprocessing.
+        print("Columns after preprocessing:", df.columns.tolist())
+
+        # One column profile (kinds, roles, cardinalities) shared by the indicators that inspect columns.
+        profile = None
+        if any(INDICATORS[name].get("uses_profile") and name not in precomputed for name in indicators):
+            with instrumentation.stage(records, "profile", df, file_name=file_name):
+                profile = profile_columns(df)
+        if model is not None and "fairness" in indicators and "fairness" not in precomputed:
+            indicator_options["fairness"]["y_pred"] = model_predictions(df, model, profile, records, file_name)
+
+        # 3. Evaluate each requested indicator; a failure only voids its own score.
+        scores, all_results, extra_columns = evaluate_indicators(
+            full_indicators, df, context, profile, indicator_options, precomputed, records, file_name)
+
+        # 3b. Triage: expensive indicators on a stratified sample, escalated to the full
+        # data only when the sample cannot tell "present" from "not present".
+        escalated = []
+        if triaged:
+            with instrumentation.stage(records, "triage_sample", df, file_name=file_name):
+                sample_df = triage.triage_sample(df, triage_sample_rows)
+            logging.info(f"Triage: evaluating {', '.join(triaged)} on {len(sample_df)} of {len(df)} rows of {file_name}.")
+            sample_context = build_shared_context(sample_df, triaged, records, file_name, model=model)
+            sample_scores, sample_results, sample_columns = evaluate_indicators(
+                triaged, sample_df, sample_context, profile, indicator_options, records=records, file_name=file_name)
+            escalated = [name for name in triaged
+                         if triage.needs_full_data(name, sample_scores[name], sample_results.get(name))]
+            if escalated:
+                logging.info(f"Triage: {', '.join(escalated)} too close to the threshold, evaluating on all rows of {file_name}.")
+                context = build_shared_context(df, escalated, records, file_name, streaming_block_rows, model)
+                full_scores, full_results, full_columns = evaluate_indicators(
+                    escalated, df, context, profile, indicator_options, records=records, file_name=file_name)
+                sample_scores.update(full_scores)
+                sample_results = {name: results for name, results in sample_results.items() if name not in escalated}
+                sample_results.update(full_results)
+                sample_columns.update(full_columns)
+            scores.update(sample_scores)
+            all_results.update(sample_results)
+            extra_columns.update(sample_columns)
+
+        # 4. final compliance score (average of valid indicators, skipping any that are None)
+        valid_scores = [score for score in scores.values() if score is not None]
+        if valid_scores:
+            final_score = sum(valid_scores) / len(valid_scores)
+        else:
+            final_score = None
+
+        # 5. convert None values to "NA" for output
+        row = {"File Name": file_name}
+        for name in indicators:
+            row[INDICATORS[name]["column"]] = scores[name] if scores[name] is not None else "NA"
+        row["Final Compliance Score"] = final_score if final_score is not None else "NA"
+        row.update(extra_columns)
+        if triaged:
+            row["Triage"] = (f"{', '.join(name for name in triaged if name not in escalated) or 'none'} on "
+                             f"{len(sample_df)} sampled rows; {', '.join(escalated) or 'none'} escalated")
+        if bootstrap_resamples:
+            with instrumentation.stage(records, "bootstrap", file_name=file_name):
+                row.update(uncertainty.score_intervals(all_results, scores, bootstrap_resamples))
+        if timing_columns:
+            row.update(instrumentation.timing_columns(records))
+        return row
+
+    except Exception as e:
+        logging.error(f"Error processing {file_name}: {e}")
+        return None
+
+    finally:
+        if trace_path:
+            instrumentation.append_trace(records, trace_path)
+
+def content_digest_for(file_path, options):
+    """
+    Content key of a dataset for the result cache, the preprocessed-data cache and the results
+    store. An incremental run of a CSV (see process_file) is keyed on the file's size and
+    append fingerprint (see incremental_state.append_digest), so an unchanged log is not read in full.
+    """
+    if (options.get("incremental") and options.get("model") is None and not options.get("model_path")
+            and table_format(file_path) == "csv"):
+        import incremental_state
+        return incremental_state.append_digest(file_path)
+    return result_cache.file_digest(file_path)
+
+def _evaluate_profiled(file_path, evaluate_file, profile_files, **file_options):
+    """
+    Evaluate one file, under cProfile when it is one of profile_files.
+    """
+    evaluate_file = partial(evaluate_file, **file_options)
+    if os.path.basename(file_path) in profile_files:
+        return instrumentation.profile_call(instrumentation.profile_path(file_path), evaluate_file, file_path)
+    return evaluate_file(file_path)
+
+def _evaluate_digested(task, evaluate_file):
+    """
+    evaluate_file on a (file_path, content_digest) task of the process pool.
+    """
+    file_path, content_digest = task
+    return evaluate_file(file_path, content_digest=content_digest)
+
+def _prefetch(file_path, use_processed_cache, chunksize=None, content_digest=None):
+    """
+    Start reading file_path in the background, unless its preprocessed columns are cached
+    (under the same key as load_processed_frame) or it is a CSV streamed in chunks.
+    """
+    chunked = bool(chunksize) and table_format(file_path) == "csv"
+    if chunked:
+        return
+
+    def is_cached():
+        return use_processed_cache and processed_cache.has_processed(
+            processed_cache.processed_key(file_path, chunked=chunked, content_digest=content_digest))
+    prefetch_table(file_path, skip=is_cached, plan=plan_columns)
+
+def list_data_files(data_folder):
+    """
+    Return the datasets (CSV, XLSX, Parquet) in data_folder, largest first, so that the
+    slowest datasets start early instead of blocking the end of a parallel batch.
+    """
+    file_paths = [os.path.join(data_folder, file_name)
+                  for file_name in sorted(os.listdir(data_folder))
+                  if is_data_file(file_name)]
+    return sorted(file_paths, key=os.path.getsize, reverse=True)
+
+def process_all_files(data_folder, workers=1, timeout=None, use_cache=True, invalidate_cache=False,
+                      cache_max_bytes=result_cache.DEFAULT_MAX_BYTES, chunksize=None, trace_path=None,
+                      profile_files=(), results_db=results_store.DEFAULT_DB_PATH, **evaluation_options):
+    """
+    Evaluate every dataset (CSV, XLSX, Parquet) in data_folder and write Output_report/results.csv.
+    The run is also added to the results store results_db (see results_store), which keeps
+    the history of every run; results_db=None skips it.
+
+      - workers=1 (default) evaluates the files one after another in this process, reading
+        the next file in a background thread meanwhile (not CSVs streamed with chunksize,
+        and not in incremental mode).
+      - workers>1 evaluates up to that many files at once, each in its own process;
+        workers=0 uses one process per CPU core.
+      - timeout (seconds) kills a file's evaluation when it runs too long. A timed-out
+        or crashed file is logged and left out of results.csv; the batch carries on.
+      - use_cache reuses the stored row of any file whose content and evaluator code are
+        unchanged since it was last evaluated, and the stored preprocessed columns of any file
+        whose content and preprocessing code are unchanged; invalidate_cache empties both first
+        (and, in incremental mode, the saved incremental states).
+      - chunksize streams each file in chunks of that many rows to bound peak memory.
+      - trace_path collects a JSON-lines record (wall/CPU time, peak memory, rows and columns)
+        per stage of every evaluated file; cached files are not re-measured.
+      - profile_files are file names evaluated under cProfile (never served from the cache);
+        their profiles go to Output_report/profiles/.
+      - evaluation_options are passed on to process_file and are part of the cache key.
+
+    Rows are written in file-name order whatever order the files finished in.
+    """
+    file_paths = list_data_files(data_folder)
+    evaluate_file = partial(process_file, chunksize=chunksize, trace_path=trace_path,
+                            use_processed_cache=use_cache, **evaluation_options)
+    if profile_files:
+        evaluate_file = partial(_evaluate_profiled, evaluate_file=evaluate_file, profile_files=set(profile_files))
+    if trace_path:
+        instrumentation.reset_trace(trace_path)
+    if workers == 0:
+        workers = default_worker_count()
+
+    # Reuse cached rows for unchanged files.
     results_list = []
+    cache_keys = {}
+    file_hashes = {}
+    cached_files = []
+    if invalidate_cache:
+        result_cache.clear_cache()
+        processed_cache.clear_cache()
+        if evaluation_options.get("incremental"):
+            import incremental_state
+            incremental_state.clear_state()
+    if use_cache:
+        to_evaluate = []
+        for file_path in file_paths:
+            file_hashes[os.path.basename(file_path)] = content_digest_for(file_path, evaluation_options)
+            key = result_cache.cache_key(file_path, params=evaluation_options,
+                                         content_digest=file_hashes[os.path.basename(file_path)])
+            row = None if os.path.basename(file_path) in profile_files else result_cache.get_cached_row(key)
+            if row is None:
+                cache_keys[file_path] = key
+                to_evaluate.append(file_path)
+            else:
+                logging.info(f"Unchanged since last run, reusing cached scores: {os.path.basename(file_path)}")
+                row["File Name"] = os.path.basename(file_path)
+                results_list.append(row)
+                cached_files.append(row["File Name"])
+        file_paths = to_evaluate
+
+    if workers > 1 or timeout:
+        logging.info(f"Evaluating {len(file_paths)} files with {workers} worker process(es).")
+        tasks = [(os.path.basename(file_path), (file_path, file_hashes.get(os.path.basename(file_path))))
+                 for file_path in file_paths]
+        rows = run_in_process_pool(tasks, partial(_evaluate_digested, evaluate_file=evaluate_file),
+                                   max_workers=workers, timeout=timeout)
+        new_rows = [(file_path, rows[os.path.basename(file_path)]) for file_path in file_paths]
+    else:
+        # Read the next file in the background while the current one is evaluated.
+        prefetch = not evaluation_options.get("incremental")
+        new_rows = []
+        for position, file_path in enumerate(file_paths):
+            if prefetch and position + 1 < len(file_paths):
+                next_path = file_paths[position + 1]
+                _prefetch(next_path, use_cache, chunksize, file_hashes.get(os.path.basename(next_path)))
+            content_digest = file_hashes.get(os.path.basename(file_path))
+            new_rows.append((file_path, evaluate_file(file_path, content_digest=content_digest)))
+
+    for file_path, row in new_rows:
+        if row is None:
+            continue
+        results_list.append(row)
+        if use_cache:
+            result_cache.put_cached_row(cache_keys[file_path], row, max_bytes=cache_max_bytes)
 
-    for file_name in os.listdir(data_folder):
-        if file_name.endswith(".csv"):
-            file_path = os.path.join(data_folder, file_name)
-            logging.info(f"Processing file: {file_name}")
-
-            try:
-                # 1. Load and preprocess the data.
-                df = load_csv(file_path)
-                df = preprocess_data(df)
-                # Debug: print columns after preprocessing.
-                print("Columns after preprocessing:", df.columns.tolist())
-
-                # 2. Initialize indicator variables as None.
-                fairness_score = None
-                transparency_score = None
-                robustness_score = None
-                privacy_score = None
-                accountability_score = None
-
-                # 3. Evaluate fairness.
-                try:
-                    fairness_results = evaluate_fairness(df)
-                    dp_diff = fairness_results.get("demographic_parity_difference")
-                    if dp_diff is not None:
-                        fairness_score = max(0.0, min(1.0, 1 - abs(dp_diff)))
-                except Exception as e:
-                    logging.warning(f"Fairness evaluation failed for {file_name}: {e}")
-                    fairness_score = None
-
-                # 4. Evaluate transparency.
-                try:
-                    transparency_results = evaluate_transparency(df)
-                    transparency_score = transparency_results.get("model_accuracy", None)
-                except Exception as e:
-                    logging.warning(f"Transparency evaluation failed for {file_name}: {e}")
-                    transparency_score = None
-
-                # 5. Evaluate robustness.
-                try:
-                    robustness_results = evaluate_robustness(df)
-                    robustness_score = robustness_results.get("adversarial_accuracy", None)
-                except Exception as e:
-                    logging.warning(f"Robustness evaluation failed for {file_name}: {e}")
-                    robustness_score = None
-
-                # 6. Evaluate privacy.
-                try:
-                    privacy_results = evaluate_privacy(df)
-                    privacy_score = privacy_results.get("privacy_accuracy", None)
-                except Exception as e:
-                    logging.warning(f"Privacy evaluation failed for {file_name}: {e}")
-                    privacy_score = None
-
-                # 7. Evaluate accountability.
-                try:
-                    accountability_results = evaluate_accountability(df)
-                    if accountability_results:
-                        # Sum the boolean flags (True->1, False->0)
-                        a_sum = (float(accountability_results.get("auditability", False)) +
-                                 float(accountability_results.get("explainability", False)) +
-                                 float(accountability_results.get("traceability", False)))
-                        # If all flags are false, accountability = None.
-                        if a_sum == 0:
-                            accountability_score = None
-                        else:
-                            accountability_score = a_sum / 3
-                except Exception as e:
-                    logging.warning(f"Accountability evaluation failed for {file_name}: {e}")
-                    accountability_score = None
-
-                # 8. list of valid scores (skip any that are None)
-                valid_scores = []
-                if fairness_score is not None:
-                    valid_scores.append(fairness_score)
-                if transparency_score is not None:
-                    valid_scores.append(transparency_score)
-                if robustness_score is not None:
-                    valid_scores.append(robustness_score)
-                if privacy_score is not None:
-                    valid_scores.append(privacy_score)
-                if accountability_score is not None:
-                    valid_scores.append(accountability_score)
-
-                # 9. final compliance score (average of valid indicators)
-                if valid_scores:
-                    final_score = sum(valid_scores) / len(valid_scores)
-                else:
-                    final_score = None
-
-                # 10. convert None values to "NA" for output
-                results_list.append({
-                    "File Name": file_name,
-                    "Fairness Score": fairness_score if fairness_score is not None else "NA",
-                    "Transparency Score": transparency_score if transparency_score is not None else "NA",
-                    "Robustness Score": robustness_score if robustness_score is not None else "NA",
-                    "Privacy Score": privacy_score if privacy_score is not None else "NA",
-                    "Accountability Score": accountability_score if accountability_score is not None else "NA",
-                    "Final Compliance Score": final_score if final_score is not None else "NA"
-            
-                })
-
-            except Exception as e:
-                logging.error(f"Error processing {file_name}: {e}")
+    results_list.sort(key=lambda row: row["File Name"])
 
     # 11. Save all results to CSV file.
     if results_list:
@@ -133,8 +460,209 @@ def process_all_files(data_folder):
         results_df.to_csv(output_path, index=False)
         logging.info(f"All results have been consolidated in '{output_path}'")
     else:
-        logging.warning("No CSV files found or no results generated.")
+        logging.warning("No datasets found or no results generated.")
+
+    # 12. Add the run to the results store history.
+    if results_db and results_list:
+        try:
+            for row in results_list:
+                if row["File Name"] not in file_hashes:
+                    file_hashes[row["File Name"]] = content_digest_for(os.path.join(data_folder, row["File Name"]),
+                                                                       evaluation_options)
+            results_store.record_run(results_list, source="batch", options=evaluation_options,
+                                     file_hashes=file_hashes, cached_files=cached_files, db_path=results_db)
+        except Exception as e:
+            logging.warning(f"Run not recorded in the results store: {e}")
+
+def evaluate_with_cache(file_path, evaluate_file, cache_params=None, use_cache=True,
+                        cache_max_bytes=result_cache.DEFAULT_MAX_BYTES, results_db=None):
+    """
+    evaluate_file(file_path), reusing and filling the result cache as process_all_files does.
+    With results_db, the row is also recorded in the results store as a one-file run.
+    """
+    content_digest = content_digest_for(file_path, cache_params or {}) if use_cache or results_db else None
+    key = result_cache.cache_key(file_path, params=cache_params, content_digest=content_digest) if use_cache else None
+    row = result_cache.get_cached_row(key) if key else None
+    cached = row is not None
+    if cached:
+        logging.info(f"Unchanged since last run, reusing cached scores: {os.path.basename(file_path)}")
+        row["File Name"] = os.path.basename(file_path)
+    else:
+        row = evaluate_file(file_path, content_digest=content_digest)
+        if row is not None and key:
+            result_cache.put_cached_row(key, row, max_bytes=cache_max_bytes)
+    if row is not None and results_db:
+        try:
+            results_store.record_run([row], source="watch", options=cache_params,
+                                     file_hashes={row["File Name"]: content_digest},
+                                     cached_files=[row["File Name"]] if cached else [], db_path=results_db)
+        except Exception as e:
+            logging.warning(f"Result of {row['File Name']} not recorded in the results store: {e}")
+    return row
+
+def watch_data_folder(data_folder, known=None, workers=1, use_cache=True, cache_max_bytes=result_cache.DEFAULT_MAX_BYTES,
+                      chunksize=None, interval=2.0, settle_seconds=2.0, results_db=results_store.DEFAULT_DB_PATH,
+                      **evaluation_options):
+    """
+    Keep evaluating the datasets of data_folder as they are added or modified, with the same
+    options and caches as process_all_files, and update their rows in Output_report/results.csv
+    (see watcher.watch_folder). Every evaluation is also recorded in results_db, from the
+    worker processes. Runs until interrupted.
+    """
+    import asyncio
+    import watcher
+
+    evaluate_file = partial(
+        evaluate_with_cache,
+        evaluate_file=partial(process_file, chunksize=chunksize, use_processed_cache=use_cache, **evaluation_options),
+        cache_params=evaluation_options, use_cache=use_cache, cache_max_bytes=cache_max_bytes,
+        results_db=results_db,
+    )
+    if workers == 0:
+        workers = default_worker_count()
+    try:
+        asyncio.run(watcher.watch_folder(data_folder, evaluate_file, interval=interval,
+                                         settle_seconds=settle_seconds, workers=max(1, workers), known=known))
+    except KeyboardInterrupt:
+        logging.info("Stopped watching.")
+
+# process_file options that change the scores; they make up the result cache key.
+EVALUATION_OPTIONS = ("indicators", "fairness_sample_size", "explain_rows", "explanation_method", "lime_workers",
+                      "eps_values", "privacy_epsilons", "privacy_seeds", "privacy_workers", "timing_columns",
+                      "incremental", "streaming_block_rows", "bootstrap_resamples", "model_path", "triage_sample_rows")
+
+def normalise_evaluation_options(**options):
+    """
+    Every EVALUATION_OPTIONS entry, with process_file's defaults filled in and the indicators
+    in evaluation order (None for all), so that the CLI and the service build the same
+    cache key for equivalent requests.
+    """
+    unknown = set(options) - set(EVALUATION_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown evaluation option(s): {', '.join(sorted(unknown))}.")
+    parameters = inspect.signature(process_file).parameters
+    normalised = {name: options.get(name, parameters[name].default) for name in EVALUATION_OPTIONS}
+    indicators = resolve_indicators(normalised["indicators"])
+    normalised["indicators"] = None if indicators == INDICATOR_NAMES else indicators
+    return normalised
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate the ethical indicators of every dataset in a folder.")
+    parser.add_argument("--data-folder", default="data",
+                        help="Folder containing the CSV, XLSX and Parquet datasets (default: data).")
+    parser.add_argument("--indicators", type=lambda value: value.split(","), default=None,
+                        help=f"Comma-separated indicators to evaluate (default: all of {','.join(INDICATOR_NAMES)}).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of files evaluated in parallel; 0 uses every CPU core (default: 1).")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Maximum seconds spent on one file before it is abandoned.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-evaluate every file instead of reusing cached scores of unchanged files.")
+    parser.add_argument("--invalidate-cache", action="store_true",
+                        help="Empty the result cache before evaluating.")
+    parser.add_argument("--cache-max-mb", type=float, default=result_cache.DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Size limit of the result cache; least recently used entries are evicted (default: 64).")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream each CSV in chunks of this many rows to bound memory on very large files.")
+    parser.add_argument("--fairness-sample", type=int, default=None,
+                        help="Compute fairness on a stratified sample of this many rows (with confidence intervals) "
+                             "for larger datasets.")
+    parser.add_argument("--explain-rows", type=int, default=1,
+                        help="Number of test rows explained for the global feature-importance table (default: 1).")
+    parser.add_argument("--explanation-method", choices=["auto", "linear", "lime"], default="auto",
+                        help="Exact linear attribution, LIME, or linear whenever the model is linear (default: auto).")
+    parser.add_argument("--lime-workers", type=int, default=1,
+                        help="Processes used to compute LIME explanations (default: 1).")
+    parser.add_argument("--eps-curve", type=lambda value: [float(eps) for eps in value.split(",")], default=None,
+                        help="Comma-separated FGSM sizes for the robustness accuracy-vs-eps curve, e.g. 0.05,0.1,0.5.")
+    parser.add_argument("--privacy-epsilons", type=lambda value: [float(eps) for eps in value.split(",")], default=None,
+                        help="Comma-separated epsilons for a privacy-utility sweep, e.g. 0.1,0.5,1,5.")
+    parser.add_argument("--privacy-seeds", type=_positive_int, default=10,
+                        help="Differentially private fits per epsilon in the sweep (default: 10).")
+    parser.add_argument("--privacy-workers", type=int, default=1,
+                        help="Processes used to run the privacy sweep (default: 1).")
+    parser.add_argument("--timing-columns", action="store_true",
+                        help="Add per-stage seconds, total seconds and peak memory columns to results.csv.")
+    parser.add_argument("--trace", nargs="?", const=instrumentation.DEFAULT_TRACE_PATH, default=None,
+                        help="Write a JSON-lines record per stage and file (default path: "
+                             f"{instrumentation.DEFAULT_TRACE_PATH}).")
+    parser.add_argument("--profile", type=lambda value: value.split(","), default=(),
+                        help="Comma-separated file names to run under cProfile; profiles go to "
+                             f"{instrumentation.DEFAULT_PROFILE_DIR}.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Treat datasets as append-only logs: only rows added since the previous run are "
+                             "read, and scores are updated from saved per-file state.")
+    parser.add_argument("--streaming-training", nargs="?", type=int, const=DEFAULT_BLOCK_ROWS, default=None,
+                        metavar="ROWS",
+                        help="Train the transparency/robustness baseline model out of core with minibatch "
+                             f"SGD over blocks of ROWS rows (default: {DEFAULT_BLOCK_ROWS}); accuracies are "
+                             "measured on a reservoir-sampled holdout. Privacy trains its differentially "
+                             "private model in memory on the reservoir-sampled training rows.")
+    parser.add_argument("--bootstrap", nargs="?", type=int, const=uncertainty.DEFAULT_RESAMPLES, default=None,
+                        metavar="N",
+                        help="Add bootstrap confidence interval columns (N resamples, default "
+                             f"{uncertainty.DEFAULT_RESAMPLES}) for the fairness, transparency, robustness "
+                             "and final scores.")
+    parser.add_argument("--triage", nargs="?", type=int, const=triage.DEFAULT_SAMPLE_ROWS, default=None,
+                        metavar="ROWS",
+                        help="Run fairness and accountability on all rows, and the model-based indicators on a "
+                             f"stratified sample of ROWS rows (default {triage.DEFAULT_SAMPLE_ROWS}) first, "
+                             f"re-running them on all rows only when a sample score is near the "
+                             f"{PRESENT_THRESHOLD} threshold.")
+    parser.add_argument("--model", default=None, metavar="PATH",
+                        help="Audit this fitted classifier (pickle or joblib file) instead of training a baseline "
+                             "model. It must take the preprocessed feature columns (all but the last) in order. "
+                             "Only load model files you trust.")
+    parser.add_argument("--results-db", default=results_store.DEFAULT_DB_PATH, metavar="PATH",
+                        help="SQLite store every run's results are added to, for score history and trends "
+                             f"(default: {results_store.DEFAULT_DB_PATH}).")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Do not record this run in the results store.")
+    parser.add_argument("--watch", action="store_true",
+                        help="After evaluating the folder, keep watching it and evaluate new or modified datasets "
+                             "as they land.")
+    parser.add_argument("--watch-interval", type=float, default=2.0,
+                        help="Seconds between two checks of the folder in watch mode (default: 2).")
+    parser.add_argument("--settle-seconds", type=float, default=2.0,
+                        help="A file is only evaluated once unchanged for this long, so partial writes "
+                             "are not read (default: 2).")
+    args = parser.parse_args()
+    try:
+        args.indicators = resolve_indicators(args.indicators)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
 
 if __name__ == "__main__":
-    data_folder = "data"
-    process_all_files(data_folder)
\ No newline at end of file
+    args = parse_args()
+    options = normalise_evaluation_options(
+        fairness_sample_size=args.fairness_sample, explain_rows=args.explain_rows,
+        explanation_method=args.explanation_method, lime_workers=args.lime_workers,
+        eps_values=args.eps_curve, privacy_epsilons=args.privacy_epsilons,
+        privacy_seeds=args.privacy_seeds, privacy_workers=args.privacy_workers,
+        timing_columns=args.timing_columns, incremental=args.incremental,
+        streaming_block_rows=args.streaming_training, bootstrap_resamples=args.bootstrap,
+        model_path=args.model, triage_sample_rows=args.triage, indicators=args.indicators,
+    )
+    cache_max_bytes = int(args.cache_max_mb * 1024 * 1024)
+    results_db = None if args.no_history else args.results_db
+    if args.watch:
+        import watcher
+        # Files changed while the initial batch runs are picked up by the watcher.
+        known = watcher.snapshot(args.data_folder)
+    process_all_files(args.data_folder, workers=args.workers, timeout=args.timeout,
+                      use_cache=not args.no_cache, invalidate_cache=args.invalidate_cache,
+                      cache_max_bytes=cache_max_bytes, chunksize=args.chunksize,
+                      trace_path=args.trace, profile_files=args.profile, results_db=results_db,
+                      **options)
+    if args.watch:
+        watch_data_folder(args.data_folder, known=known, workers=args.workers, use_cache=not args.no_cache,
+                          cache_max_bytes=cache_max_bytes, chunksize=args.chunksize,
+                          interval=args.watch_interval, settle_seconds=args.settle_seconds, results_db=results_db,
+                          **options)
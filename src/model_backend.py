@@ -0,0 +1,123 @@
+import os
+import pickle
+import hashlib
+import logging
+import weakref
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Rows sent to a model in one predict/predict_proba call.
+DEFAULT_BATCH_ROWS = 100_000
+
+class CallableModel:
+    """
+    Adapter for a model that is only reachable through functions, e.g. a remote service or
+    another framework, so the calculators can audit it like a fitted scikit-learn classifier.
+
+      - predict_proba(X) -> (rows, classes) probabilities, and/or predict(X) -> labels;
+        both receive float64 feature matrices (every column but the target, in order).
+      - classes: the labels, in the column order of predict_proba.
+      - Calls are made on at most batch_rows rows at a time.
+    Without predict_proba the model can be scored for accuracy but not explained or attacked.
+    To be sent to worker processes (e.g. LIME workers), the functions must be picklable.
+    """
+
+    def __init__(self, predict_proba=None, predict=None, classes=None, batch_rows=DEFAULT_BATCH_ROWS):
+        if predict_proba is None and predict is None:
+            raise ValueError("A predict or predict_proba function is required.")
+        if predict is None and classes is None:
+            raise ValueError("classes are required to turn predict_proba outputs into labels.")
+        self._predict_proba = predict_proba
+        self._predict = predict
+        self.classes_ = None if classes is None else np.asarray(classes)
+        self.batch_rows = batch_rows
+
+    @property
+    def predict_proba(self):
+        if self._predict_proba is None:
+            raise AttributeError("This model has no predict_proba function.")
+        return lambda X: predict_in_batches(self._predict_proba, X, self.batch_rows)
+
+    def predict(self, X):
+        if self._predict is not None:
+            return predict_in_batches(self._predict, X, self.batch_rows)
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y)))
+
+def predict_in_batches(predict, X, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    predict(X) made on at most batch_rows rows at a time and concatenated.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if len(X) <= batch_rows:
+        return np.asarray(predict(X))
+    return np.concatenate([np.asarray(predict(X[start:start + batch_rows]))
+                           for start in range(0, len(X), batch_rows)])
+
+def is_black_box(model):
+    """
+    True for models only reachable through functions (CallableModel), which have neither
+    closed-form gradients nor an estimator interface for ART.
+    """
+    return isinstance(model, CallableModel)
+
+def load_model(model_path):
+    """
+    Load a fitted estimator saved with pickle or joblib (e.g. joblib.dump(model, "model.pkl")).
+    Only load files from trusted sources: unpickling can run arbitrary code.
+    """
+    try:
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+        try:
+            import joblib
+            model = joblib.load(model_path)
+        except ImportError:
+            with open(model_path, "rb") as model_file:
+                model = pickle.load(model_file)
+        logging.info(f"Model '{type(model).__name__}' loaded from '{model_path}'.")
+        return model
+
+    except Exception as e:
+        logging.error(f"Failed to load model: {e}")
+        raise
+
+def model_digest(model):
+    """
+    Content hash of a model object, so that cached results of a different model are not reused.
+    """
+    try:
+        return hashlib.sha256(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+    except Exception:
+        return f"unpicklable-{id(model)}"
+
+# Test-split predictions per evaluation context, shared by the calculators.
+_test_predictions = weakref.WeakKeyDictionary()
+
+def test_predictions(context, method="predict"):
+    """
+    context.baseline_model.<method>(context.X_test), computed once per context in batches
+    and reused by every calculator that needs it ("predict" or "predict_proba").
+    """
+    cached = _test_predictions.setdefault(context, {})
+    if method not in cached:
+        cached[method] = predict_in_batches(getattr(context.baseline_model, method), context.X_test)
+    return cached[method]
+
+def predict_frame(model, df, feature_columns, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Predictions of model for every row of df, from its feature columns, converting at most
+    batch_rows rows to float64 at a time.
+    """
+    if len(df) == 0:
+        return np.zeros(0)
+    return np.concatenate([
+        np.asarray(model.predict(df.iloc[start:start + batch_rows][feature_columns].to_numpy(dtype=np.float64)))
+        for start in range(0, len(df), batch_rows)
+    ])
@@ -0,0 +1,127 @@
+import logging
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+def hash_split(positions, test_fraction=0.2):
+    """
+    Deterministic test-row mask, about test_fraction of the rows, from a multiplicative hash of
+    each row's position in the file; the same row always lands in the same split.
+    """
+    hashed = (np.asarray(positions, dtype=np.uint64) * np.uint64(2654435761)) % np.uint64(2 ** 32)
+    return hashed < np.uint64(int(test_fraction * 2 ** 32))
+
+class OnlineLogisticModel:
+    """
+    Logistic regression trained incrementally (SGD with log loss) on running-standardized
+    features, for data that arrives in batches.
+
+      - partial_fit updates the running mean/variance, then the model, with one batch.
+      - coef_ and intercept_ are expressed on the raw (unstandardized) features, so the exact
+        linear attribution applies as for LogisticRegression, and so does the closed-form FGSM
+        attack on binary targets (multiclass models are one-vs-rest).
+    """
+
+    def __init__(self, classes, alpha=1e-4, random_state=42):
+        self.classes_ = np.asarray(classes)
+        self._scaler = StandardScaler()
+        self._model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+
+    def observe(self, X):
+        """
+        Update the running feature mean/variance only, e.g. in a statistics pass made before training.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if len(X):
+            self._scaler.partial_fit(X)
+        return self
+
+    def partial_fit(self, X, y, epochs=1, random_state=None, observe=True):
+        """
+        Update the model with one batch; with epochs > 1 the batch is replayed in a fresh
+        random order each time (used for the first, historical batch). With observe=False
+        the feature statistics are left as they are (they must have been observed before).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        if len(X) == 0:
+            return self
+        if observe:
+            self._scaler.partial_fit(X)
+        X_scaled = self._scaler.transform(X)
+        rng = np.random.default_rng(random_state)
+        for epoch in range(epochs):
+            order = np.arange(len(X)) if epoch == 0 else rng.permutation(len(X))
+            self._model.partial_fit(X_scaled[order], y[order], classes=self.classes_)
+        return self
+
+    @property
+    def coef_(self):
+        return self._model.coef_ / self._scaler.scale_
+
+    @property
+    def intercept_(self):
+        return self._model.intercept_ - self._model.coef_ @ (self._scaler.mean_ / self._scaler.scale_)
+
+    def decision_function(self, X):
+        return self._model.decision_function(self._scaler.transform(np.asarray(X, dtype=np.float64)))
+
+    def predict_proba(self, X):
+        return self._model.predict_proba(self._scaler.transform(np.asarray(X, dtype=np.float64)))
+
+    def predict(self, X):
+        return self._model.predict(self._scaler.transform(np.asarray(X, dtype=np.float64)))
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y)))
+
+class Reservoir:
+    """
+    Uniform random sample of at most capacity rows of a stream (Algorithm R), with labels.
+    """
+
+    def __init__(self, capacity, n_features, random_state=42):
+        self.capacity = capacity
+        self.seen = 0
+        self._X = np.zeros((capacity, n_features), dtype=np.float64)
+        self._y = None
+        self._rng = np.random.default_rng(random_state)
+
+    def add(self, X, y):
+        """
+        Offer a batch of rows; each ends up in the sample with probability capacity / rows seen.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        if self._y is None:
+            self._y = np.zeros(self.capacity, dtype=y.dtype)
+        elif self._y.dtype != y.dtype:
+            self._y = self._y.astype(np.result_type(self._y.dtype, y.dtype))
+
+        # Row t of the stream takes slot t while the sample is filling, then a random slot
+        # j <= t, kept only when j < capacity.
+        positions = self.seen + np.arange(len(X))
+        slots = np.where(positions < self.capacity, positions, self._rng.integers(0, positions + 1))
+        keep = slots < self.capacity
+        rows, slots = np.flatnonzero(keep), slots[keep]
+        # When a batch hits the same slot twice, the later row wins, as in the sequential algorithm.
+        _, last = np.unique(slots[::-1], return_index=True)
+        rows, slots = rows[::-1][last], slots[::-1][last]
+        self._X[slots] = X[rows]
+        self._y[slots] = y[rows]
+        self.seen += len(X)
+
+    @property
+    def X(self):
+        return self._X[:min(self.seen, self.capacity)]
+
+    @property
+    def y(self):
+        if self._y is None:
+            return np.zeros(0)
+        return self._y[:min(self.seen, self.capacity)]
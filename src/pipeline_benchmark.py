@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+
+import pandas as pd
+
+from data_loader import load_table, is_data_file
+from data_preprocessor import preprocess_data, plan_columns
+from indicators import INDICATOR_NAMES, INDICATORS, load_evaluator
+from scheduler import run_in_process_pool
+import instrumentation
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+# Stages shorter than this are too noisy to flag as time regressions.
+MIN_REGRESSION_SECONDS = 0.05
+
+def measure_stage(stage, rows, func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) and return (its result, its instrumentation record plus throughput).
+    """
+    records = []
+    with instrumentation.stage(records, stage) as record:
+        result = func(*args, **kwargs)
+    record["rows"] = rows
+    record["rows_per_sec"] = rows / record["wall_seconds"] if rows and record["wall_seconds"] > 0 else None
+    return result, record
+
+def benchmark_file(file_path):
+    """
+    Time every pipeline stage on one file. Meant to run in a fresh child process.
+    """
+    # Import every calculator first so import cost does not land in the first stage.
+    evaluators = {name: load_evaluator(name) for name in INDICATOR_NAMES}
+    from evaluation_context import EvaluationContext
+
+    records = []
+    df, record = measure_stage("load_table", None, lambda: load_table(file_path, *plan_columns(file_path)))
+    record["rows"] = len(df)
+    record["rows_per_sec"] = len(df) / record["wall_seconds"] if record["wall_seconds"] > 0 else None
+    records.append(record)
+    rows = len(df)
+
+    df, record = measure_stage("preprocess_data", rows, preprocess_data, df)
+    records.append(record)
+
+    try:
+        context, record = measure_stage("context", rows, lambda: _fitted_context(EvaluationContext, df))
+        records.append(record)
+    except Exception as e:
+        logging.warning(f"No evaluation context for {file_path}: {e}")
+        context = None
+
+    for name, evaluate in evaluators.items():
+        kwargs = {"context": context} if INDICATORS[name]["uses_context"] else {}
+        if INDICATORS[name]["uses_context"] and context is None:
+            continue
+        try:
+            _, record = measure_stage(name, rows, evaluate, df, **kwargs)
+            records.append(record)
+        except Exception as e:
+            logging.warning(f"Stage {name} failed for {file_path}: {e}")
+    return records
+
+def _fitted_context(context_class, df):
+    context = context_class(df)
+    context.baseline_model
+    return context
+
+def make_scaled_copy(file_path, scale, output_dir):
+    """
+    Write a synthetic CSV copy of a dataset with its rows repeated scale times.
+    """
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    scaled_path = os.path.join(output_dir, f"{base_name}_x{scale}.csv")
+    df = load_table(file_path)
+    pd.concat([df] * scale, ignore_index=True).to_csv(scaled_path, index=False)
+    return scaled_path
+
+def run_benchmark(data_folder="data", files=None, scales=(1,), timeout=None, include_startup=False):
+    """
+    Benchmark the pipeline on every dataset of data_folder (or the named files), at each scale.
+    Every file runs in its own child process, one at a time, so measurements do not interfere.
+
+    Returns:
+      A dictionary mapping "<file>@x<scale>/<stage>" to its measurement record.
+    """
+    file_names = files or sorted(name for name in os.listdir(data_folder) if is_data_file(name))
+    results = {}
+    scratch_dir = tempfile.mkdtemp(prefix="bias_benchmark_")
+    try:
+        tasks = []
+        for scale in scales:
+            for file_name in file_names:
+                file_path = os.path.join(data_folder, file_name)
+                if scale > 1:
+                    file_path = make_scaled_copy(file_path, scale, scratch_dir)
+                tasks.append((f"{file_name}@x{scale}", file_path))
+
+        for key, file_path in tasks:
+            records = run_in_process_pool([(key, file_path)], benchmark_file, max_workers=1, timeout=timeout)[key]
+            for record in records or []:
+                results[f"{key}/{record['stage']}"] = record
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    if include_startup:
+        from startup_benchmark import run_startup_benchmark
+        for target, seconds in run_startup_benchmark().items():
+            results[f"startup/{target}"] = {"stage": target, "rows": None, "wall_seconds": seconds,
+                                            "peak_rss_mb": None, "rss_growth_mb": None, "rows_per_sec": None}
+    return results
+
+def find_regressions(results, baseline, threshold=0.25, min_seconds=MIN_REGRESSION_SECONDS):
+    """
+    Stages whose wall time or peak RSS grew by more than threshold (a fraction) over the baseline.
+    """
+    regressions = []
+    for key, record in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if (record["wall_seconds"] > reference["wall_seconds"] * (1 + threshold)
+                and record["wall_seconds"] - reference["wall_seconds"] > min_seconds):
+            regressions.append(f"{key}: {reference['wall_seconds']:.3f}s -> {record['wall_seconds']:.3f}s")
+        if (record.get("peak_rss_mb") and reference.get("peak_rss_mb")
+                and record["peak_rss_mb"] > reference["peak_rss_mb"] * (1 + threshold)):
+            regressions.append(f"{key}: {reference['peak_rss_mb']:.1f}MB -> {record['peak_rss_mb']:.1f}MB peak RSS")
+    return regressions
+
+def print_table(results):
+    print(f"{'stage':<58} {'rows':>9} {'seconds':>9} {'peak MB':>9} {'rows/s':>12}")
+    for key, record in results.items():
+        rows = "" if record["rows"] is None else record["rows"]
+        peak = "" if record["peak_rss_mb"] is None else f"{record['peak_rss_mb']:.1f}"
+        rate = "" if record["rows_per_sec"] is None else f"{record['rows_per_sec']:.0f}"
+        print(f"{key:<58} {rows:>9} {record['wall_seconds']:>9.3f} {peak:>9} {rate:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on the bundled datasets.")
+    parser.add_argument("--data-folder", default="data", help="Folder containing the CSV datasets (default: data).")
+    parser.add_argument("--files", type=lambda value: value.split(","), default=None,
+                        help="Comma-separated file names to benchmark (default: every CSV in the folder).")
+    parser.add_argument("--scales", type=lambda value: [int(scale) for scale in value.split(",")], default=[1],
+                        help="Comma-separated row multipliers for synthetic scaled-up copies (default: 1).")
+    parser.add_argument("--timeout", type=float, default=None, help="Maximum seconds per file.")
+    parser.add_argument("--include-startup", action="store_true", help="Also record import latency.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help=f"Baseline JSON to compare against or update (default: {DEFAULT_BASELINE}).")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown or memory growth as a fraction of the baseline (default: 0.25).")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.data_folder, args.files, args.scales, args.timeout, args.include_startup)
+    print_table(results)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=4)
+        print(f"Baseline written to '{args.baseline}'.")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print("Performance regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
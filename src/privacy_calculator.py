@@ -1,9 +1,13 @@
 import logging
+import warnings
 import numpy as np
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
 from diffprivlib.models import LogisticRegression as DiffPrivLogReg
-from sklearn.model_selection import train_test_split
+from diffprivlib.utils import PrivacyLeakWarning
 from sklearn.metrics import accuracy_score
 from datetime import datetime
+from evaluation_context import build_context
 
 # Setup logging
 logging.basicConfig(
@@ -11,24 +15,81 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def evaluate_privacy(df):
+def _sweep_one_seed(X_train, y_train, X_test, y_test, epsilons, data_norm, seed):
+    """
+    Test accuracy of DP logistic regression for every epsilon, with one random seed.
+    Fits run from the smallest to the largest epsilon, each warm-started from the
+    previous coefficients. Those starting points are themselves private fits on the same
+    training data, so by sequential composition the model reported for an epsilon has
+    used the sum of the epsilons up to it, not that epsilon alone: the sweep measures the
+    privacy-utility trade-off, it is not a privacy guarantee for the warm-started models.
+    """
+    model = DiffPrivLogReg(data_norm=data_norm, max_iter=1000, warm_start=True, random_state=seed)
+    accuracies = []
+    for epsilon in epsilons:
+        model.set_params(epsilon=epsilon)
+        with warnings.catch_warnings():
+            # data_norm is set from the training data on purpose (see evaluate_privacy).
+            warnings.simplefilter("ignore", PrivacyLeakWarning)
+            model.fit(X_train, y_train)
+        accuracies.append(accuracy_score(y_test, model.predict(X_test)))
+    return accuracies
+
+def privacy_utility_sweep(context, epsilons, n_seeds=10, n_workers=1, data_norm=None, confidence=0.95,
+                          random_state=42):
+    """
+    Privacy-utility trade-off: DP model accuracy over a grid of epsilons, repeated with
+    n_seeds random seeds (one seed per worker task) on the shared train/test split.
+
+    Returns:
+      A list with, per epsilon, the mean accuracy, its standard deviation and a
+      normal-approximation confidence interval of the mean.
+    """
+    if n_seeds < 1:
+        raise ValueError("The privacy sweep needs at least one seed.")
+    epsilons = sorted(epsilons)
+    data_norm = context.data_norm if data_norm is None else data_norm
+    seeds = [random_state + i for i in range(n_seeds)]
+    args = (context.X_train, context.y_train, context.X_test, context.y_test, epsilons, data_norm)
+
+    if n_workers <= 1:
+        runs = [_sweep_one_seed(*args, seed) for seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            runs = list(pool.map(_sweep_one_seed, *[[arg] * n_seeds for arg in args], seeds))
+
+    runs = np.array(runs)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    sweep = []
+    for i, epsilon in enumerate(epsilons):
+        mean = float(runs[:, i].mean())
+        std = float(runs[:, i].std(ddof=1)) if n_seeds > 1 else 0.0
+        margin = z * std / np.sqrt(n_seeds)
+        sweep.append({"epsilon": float(epsilon), "mean_accuracy": mean, "std_accuracy": std,
+                      "ci_low": float(max(0.0, mean - margin)), "ci_high": float(min(1.0, mean + margin)), "runs": n_seeds})
+        logging.info(f"Privacy sweep epsilon={epsilon}: accuracy {mean:.3f} "
+                     f"[{sweep[-1]['ci_low']:.3f}, {sweep[-1]['ci_high']:.3f}]")
+    return sweep
+
+def evaluate_privacy(df, context=None, epsilons=None, n_seeds=10, n_workers=1, data_norm=None):
+    """
+    Accuracy of a differentially private logistic regression (epsilon=1.0) on the test split.
+
+      - data_norm bounds the L2 norm of a training row. By default it is the largest norm
+        in the training data, computed once per dataset; pass a public bound to avoid that
+        data-dependent choice.
+      - epsilons adds a privacy-utility sweep (see privacy_utility_sweep) to the results.
+    """
     try:
         logging.info("Starting privacy evaluation.")
 
-        # Use internal default: assume target is the last column
-        if df.shape[1] < 2:
-            raise ValueError("Not enough columns to separate features and target.")
-        
-        target_column = df.columns[-1]
-        feature_columns = list(df.columns[:-1])
-
-        # Split data into train and test sets (Fix: Set random_state=42)
-        X = df[feature_columns]
-        y = df[target_column]
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        # Shared split (target is the last column)
+        context = build_context(df, context)
+        X_train, X_test, y_train, y_test = context.X_train, context.X_test, context.y_train, context.y_test
+        data_norm = context.data_norm if data_norm is None else data_norm
 
         # Train a differentially private logistic regression model (Fix: Set random_state=42)
-        priv_model = DiffPrivLogReg(epsilon=1.0, max_iter=1000, random_state=42)
+        priv_model = DiffPrivLogReg(epsilon=1.0, data_norm=data_norm, max_iter=1000, random_state=42)
         priv_model.fit(X_train, y_train)
 
         # Evaluate model accuracy on test data
@@ -36,8 +97,13 @@ def evaluate_privacy(df):
         accuracy = accuracy_score(y_test, y_pred)
         logging.info(f"Privacy-preserving model accuracy: {accuracy}")
 
+        privacy_results = {"privacy_accuracy": accuracy}
+        if epsilons:
+            privacy_results["privacy_sweep"] = privacy_utility_sweep(context, epsilons, n_seeds=n_seeds,
+                                                                     n_workers=n_workers, data_norm=data_norm)
+
         logging.info("Privacy evaluation completed successfully.")
-        return {"privacy_accuracy": accuracy}
+        return privacy_results
 
     except Exception as e:
         logging.error(f"Error during privacy evaluation: {e}")
@@ -0,0 +1,150 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+
+from result_cache import file_digest
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_CACHE_DIR = os.path.join("Output_report", ".processed_cache")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Modules whose code decides what a preprocessed frame looks like.
+_PREPROCESSING_MODULES = ("data_loader.py", "data_preprocessor.py", "column_profile.py", "processed_cache.py")
+
+_code_digest = None
+
+def _preprocessing_code_digest():
+    global _code_digest
+    if _code_digest is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for module_name in _PREPROCESSING_MODULES:
+            digest.update(module_name.encode())
+            digest.update(file_digest(os.path.join(src_dir, module_name)).encode())
+        _code_digest = digest.hexdigest()
+    return _code_digest
+
+def processed_key(file_path, chunked=False, content_digest=None):
+    """
+    Key of a dataset's preprocessed columns: the source file's content hash (content_digest,
+    when already known), the preprocessing code, and whether the chunked (downcasting)
+    preprocessor produced them.
+    """
+    payload = {"content": content_digest or file_digest(file_path), "code": _preprocessing_code_digest(), "chunked": bool(chunked)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _entry_dir(cache_dir, key):
+    return os.path.join(cache_dir, key)
+
+def store_processed(key, df, category_maps=None, source=None, cache_dir=DEFAULT_CACHE_DIR,
+                    max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Store a preprocessed frame once under key: one .npy file per column plus a meta.json
+    with the column names, row count and the category list of every label-encoded column.
+    The entry is written to a temporary directory and renamed into place, so readers never
+    see a partial entry. Returns the entry directory, or None if it could not be written.
+    """
+    if any(df[col].dtype == object for col in df.columns):
+        logging.warning("Preprocessed data has non-numeric columns; not caching it.")
+        return None
+
+    entry_dir = _entry_dir(cache_dir, key)
+    if os.path.exists(os.path.join(entry_dir, "meta.json")):
+        return entry_dir
+    tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+        for i, col in enumerate(df.columns):
+            np.save(os.path.join(tmp_dir, f"col_{i}.npy"), df[col].to_numpy())
+        meta = {
+            "source": source,
+            "rows": len(df),
+            "columns": [str(col) for col in df.columns],
+            "category_maps": category_maps or {},
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as meta_file:
+            json.dump(meta, meta_file)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another worker stored the same content first.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        logging.info(f"Preprocessed data stored in '{entry_dir}'.")
+        evict(cache_dir, max_bytes)
+        return entry_dir
+    except OSError as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logging.warning(f"Could not store preprocessed data: {e}")
+        return None
+
+def has_processed(key, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    True if preprocessed columns are stored under key.
+    """
+    return os.path.exists(os.path.join(_entry_dir(cache_dir, key), "meta.json"))
+
+def load_processed(key, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Return (DataFrame, category_maps) for key, or None on a cache miss. Columns are
+    memory-mapped copy-on-write, so loading costs no parsing and no copy, and a
+    calculator writing into the frame never changes the stored entry.
+    """
+    entry_dir = _entry_dir(cache_dir, key)
+    meta_path = os.path.join(entry_dir, "meta.json")
+    try:
+        with open(meta_path, "r") as meta_file:
+            meta = json.load(meta_file)
+        columns = {col: np.load(os.path.join(entry_dir, f"col_{i}.npy"), mmap_mode="c")
+                   for i, col in enumerate(meta["columns"])}
+    except (FileNotFoundError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logging.warning(f"Ignoring unreadable preprocessed data in '{entry_dir}': {e}")
+        return None
+    # Mark the entry as recently used for eviction.
+    os.utime(meta_path)
+    df = pd.DataFrame(columns, copy=False)
+    if not columns:
+        df = pd.DataFrame(index=pd.RangeIndex(meta["rows"]))
+    logging.info(f"Preprocessed data of '{meta['source']}' memory-mapped from '{entry_dir}'.")
+    return df, meta["category_maps"]
+
+def _entry_size(entry_dir):
+    return sum(os.path.getsize(path) for path in glob.glob(os.path.join(entry_dir, "*")))
+
+def evict(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Delete least recently used entries until the cache fits in max_bytes.
+    """
+    entries = []
+    for meta_path in glob.glob(os.path.join(cache_dir, "*", "meta.json")):
+        entry_dir = os.path.dirname(meta_path)
+        try:
+            entries.append((os.stat(meta_path).st_mtime, _entry_size(entry_dir), entry_dir))
+        except FileNotFoundError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Remove every stored preprocessed dataset.
+    """
+    removed = 0
+    for meta_path in glob.glob(os.path.join(cache_dir, "*", "meta.json")):
+        shutil.rmtree(os.path.dirname(meta_path), ignore_errors=True)
+        removed += 1
+    logging.info(f"Preprocessed data cache invalidated ({removed} entries removed).")
@@ -1,7 +1,7 @@
 import os
-import json
 import logging
-from datetime import datetime
+
+import results_store
 
 # Setup logging
 logging.basicConfig(
@@ -10,18 +10,15 @@ logging.basicConfig(
 )
 
 # Report generation function
-def generate_report(results, config, file_name):
+def generate_report(results, config, file_name, db_path=results_store.DEFAULT_DB_PATH):
+    """
+    Build the detailed report of one dataset and store it in the results store (reports
+    table, indexed by file name and time), instead of one timestamped JSON file per call.
+    Returns the id of the stored report.
+    """
     try:
         logging.info("Starting report generation.")
 
-        # Create output directory
-        output_dir = "Output report"
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Generate timestamped file names
-        timestamp = datetime.now().strftime("%d%m%y%H%M")
-        detailed_report_path = os.path.join(output_dir, f"report_{file_name}_{timestamp}.json")
-
         # Interpretation based on thresholds
         thresholds = config.get("indicator_thresholds", {})
         summary = {
@@ -43,19 +40,22 @@ def generate_report(results, config, file_name):
         }
 
         # Save detailed report
-        with open(detailed_report_path, "w") as report_file:
-            json.dump(final_report, report_file, indent=4)
-        logging.info(f"Detailed report saved to '{detailed_report_path}'.")
+        report_id = results_store.record_report(file_name, final_report, kind="report", db_path=db_path)
+        logging.info(f"Detailed report {report_id} saved to '{db_path}'.")
 
         logging.info("Report generation completed successfully.")
-        return detailed_report_path
+        return report_id
 
     except Exception as e:
         logging.error(f"Error during report generation: {e}")
         raise
 
 # Conclusion report generation function
-def generate_conclusion_report(results):
+def generate_conclusion_report(results, file_name="", db_path=results_store.DEFAULT_DB_PATH):
+    """
+    Write the plain-language conclusion to conclusion.txt (latest one only) and keep every
+    conclusion in the results store; db_path=None skips the store.
+    """
     try:
         logging.info("Generating conclusion report for normal users.")
 
@@ -77,6 +77,12 @@ def generate_conclusion_report(results):
         transparency_explanation = f"Transparency Score: {transparency_score:.2f}\n"
         robustness_explanation = f"Robustness Score: {robustness_score:.2f}\n"
         privacy_explanation = f"Privacy Score: {privacy_score:.2f}\n"
+        privacy_sweep = results['privacy'].get('privacy_sweep')
+        if privacy_sweep:
+            privacy_explanation += "Privacy-utility trade-off (mean accuracy and confidence interval per epsilon):\n"
+            for point in privacy_sweep:
+                privacy_explanation += (f"- epsilon {point['epsilon']:g}: {point['mean_accuracy']:.2f} "
+                                        f"[{point['ci_low']:.2f}, {point['ci_high']:.2f}] over {point['runs']} runs\n")
         accountability_explanation = (
             f"Accountability:\n"
             f"- Auditability: {'Present' if results['accountability']['auditability'] else 'Not Present'}.\n"
@@ -94,8 +100,11 @@ def generate_conclusion_report(results):
         os.makedirs(output_dir, exist_ok=True)
         conclusion_file_path = os.path.join(output_dir, "conclusion.txt")
 
+        conclusion_text = final_note_explanation + fairness_explanation + transparency_explanation + robustness_explanation + privacy_explanation + accountability_explanation
         with open(conclusion_file_path, "w") as conclusion_file:
-            conclusion_file.write(final_note_explanation + fairness_explanation + transparency_explanation + robustness_explanation + privacy_explanation + accountability_explanation)
+            conclusion_file.write(conclusion_text)
+        if db_path:
+            results_store.record_report(file_name, conclusion_text, kind="conclusion", db_path=db_path)
 
         logging.info(f"Conclusion report saved to '{conclusion_file_path}'.")
         return conclusion_file_path
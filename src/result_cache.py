@@ -0,0 +1,134 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Bump when the meaning of a score changes without the evaluator source changing.
+EVALUATOR_VERSION = "1"
+
+DEFAULT_CACHE_DIR = os.path.join("Output_report", ".result_cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_code_digest = None
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a file's content, read in chunks so large files are never fully loaded.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def evaluator_code_digest():
+    """
+    SHA-256 over the tool's source files, computed once per process, so that
+    editing any module invalidates the cached scores.
+    """
+    global _code_digest
+    if _code_digest is None:
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for module_path in sorted(glob.glob(os.path.join(src_dir, "*.py"))):
+            digest.update(os.path.basename(module_path).encode())
+            digest.update(file_digest(module_path).encode())
+        _code_digest = digest.hexdigest()
+    return _code_digest
+
+def _key_params(params):
+    """
+    Parameters as they enter a cache key: an audited model object and a model file are
+    replaced by the hash of their content.
+    """
+    params = dict(params or {})
+    if params.get("model") is not None:
+        from model_backend import model_digest
+        params["model"] = model_digest(params["model"])
+    if params.get("model_path"):
+        params["model_path"] = file_digest(params["model_path"])
+    return params
+
+def cache_key(file_path, params=None, content_digest=None):
+    """
+    Cache key for one dataset: its content hash (content_digest, when already known),
+    the evaluator version and code, and any parameters that change the scores
+    (including the audited model, if any).
+    """
+    payload = {
+        "content": content_digest or file_digest(file_path),
+        "version": EVALUATOR_VERSION,
+        "code": evaluator_code_digest(),
+        "params": _key_params(params),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.json")
+
+def get_cached_row(key, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Return the cached results row for key, or None on a cache miss.
+    """
+    entry_path = _entry_path(cache_dir, key)
+    try:
+        with open(entry_path, "r") as entry_file:
+            row = json.load(entry_file)
+    except (FileNotFoundError, ValueError):
+        return None
+    # Mark the entry as recently used for eviction.
+    os.utime(entry_path)
+    return row
+
+def put_cached_row(key, row, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Store a results row under key, then evict old entries if the cache is over max_bytes.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        entry_path = _entry_path(cache_dir, key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as entry_file:
+            json.dump(row, entry_file)
+        os.replace(tmp_path, entry_path)
+        evict(cache_dir, max_bytes)
+    except OSError as e:
+        logging.warning(f"Could not write result cache entry: {e}")
+
+def evict(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Delete least recently used entries until the cache fits in max_bytes.
+    """
+    entries = []
+    for entry_path in glob.glob(os.path.join(cache_dir, "*.json")):
+        try:
+            stat = os.stat(entry_path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(entry_path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Remove every cached results row.
+    """
+    removed = 0
+    for entry_path in glob.glob(os.path.join(cache_dir, "*.json")):
+        os.remove(entry_path)
+        removed += 1
+    logging.info(f"Result cache invalidated ({removed} entries removed).")
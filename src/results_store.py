@@ -0,0 +1,221 @@
+import os
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime, timezone
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_DB_PATH = os.path.join("Output_report", "results.db")
+FINAL_SCORE_COLUMN = "Final Compliance Score"
+# Seconds a writer waits for another process's transaction to finish.
+BUSY_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    options TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    result_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    file_name TEXT NOT NULL,
+    file_hash TEXT,
+    evaluated_at TEXT NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    final_score REAL,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_file_hash ON results(file_hash);
+CREATE INDEX IF NOT EXISTS results_file_name_time ON results(file_name, evaluated_at);
+CREATE INDEX IF NOT EXISTS results_time ON results(evaluated_at);
+CREATE INDEX IF NOT EXISTS results_run ON results(run_id);
+CREATE TABLE IF NOT EXISTS reports (
+    report_id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_file_name_time ON reports(file_name, created_at);
+CREATE INDEX IF NOT EXISTS reports_time ON reports(created_at);
+"""
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _score(value):
+    """
+    A results.csv score as a float, or None for "NA" and other non-numeric values.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """
+    Open (and create if needed) the results store.
+
+      - Write-ahead logging lets readers query while a run is being recorded, and
+        concurrent writers (e.g. watch-mode workers) wait up to BUSY_TIMEOUT for each other.
+      - synchronous=NORMAL is durable across application crashes, and the WAL keeps the
+        store consistent after a power loss.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+def record_run(rows, source="batch", options=None, file_hashes=None, cached_files=(), db_path=DEFAULT_DB_PATH):
+    """
+    Record one run and its results rows in a single transaction.
+
+      - rows are results.csv rows (dictionaries with a "File Name").
+      - file_hashes maps file names to their content hash (see main.content_digest_for).
+      - cached_files are the file names whose row was served from the result cache.
+      - options are the evaluation options of the run; values that are not JSON
+        (e.g. a model object) are stored by their text form.
+
+    Returns:
+      The id of the new run.
+    """
+    file_hashes = file_hashes or {}
+    cached_files = set(cached_files)
+    evaluated_at = _now()
+    try:
+        connection = connect(db_path)
+        try:
+            with connection:
+                run_id = connection.execute(
+                    "INSERT INTO runs (started_at, source, options) VALUES (?, ?, ?)",
+                    (evaluated_at, source, json.dumps(options or {}, sort_keys=True, default=str)),
+                ).lastrowid
+                connection.executemany(
+                    "INSERT INTO results (run_id, file_name, file_hash, evaluated_at, cached, final_score, row) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, row["File Name"], file_hashes.get(row["File Name"]), evaluated_at,
+                      int(row["File Name"] in cached_files), _score(row.get(FINAL_SCORE_COLUMN)),
+                      json.dumps(row, default=str))
+                     for row in rows],
+                )
+        finally:
+            connection.close()
+        logging.info(f"Run {run_id} ({len(rows)} results) recorded in '{db_path}'.")
+        return run_id
+
+    except Exception as e:
+        logging.error(f"Failed to record results in '{db_path}': {e}")
+        raise
+
+def record_report(file_name, content, kind="report", db_path=DEFAULT_DB_PATH):
+    """
+    Store a generated report (a JSON-serializable object or text) and return its id.
+    """
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    connection = connect(db_path)
+    try:
+        with connection:
+            return connection.execute(
+                "INSERT INTO reports (file_name, kind, created_at, content) VALUES (?, ?, ?, ?)",
+                (file_name, kind, _now(), content),
+            ).lastrowid
+    finally:
+        connection.close()
+
+def score_history(file_name=None, file_hash=None, column=FINAL_SCORE_COLUMN, since=None, until=None,
+                  db_path=DEFAULT_DB_PATH):
+    """
+    Trend of one score column across runs, oldest first, from the indexed results table.
+
+      - file_name / file_hash restrict it to one dataset (by name, or by content).
+      - since / until bound the run time (ISO 8601 strings, UTC).
+      - The final score is read from its own column; other score columns are extracted
+        from the stored rows.
+
+    Returns:
+      A DataFrame with run_id, evaluated_at, file_name, file_hash, cached and the score.
+    """
+    if column == FINAL_SCORE_COLUMN:
+        score_sql = "final_score"
+        params = []
+    else:
+        score_sql = "json_extract(row, ?)"
+        params = ['$."' + column.replace('"', '\\"') + '"']
+    conditions = []
+    for condition, value in (("file_name = ?", file_name), ("file_hash = ?", file_hash),
+                             ("evaluated_at >= ?", since), ("evaluated_at <= ?", until)):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (f"SELECT run_id, evaluated_at, file_name, file_hash, cached, {score_sql} AS score "
+             f"FROM results {where} ORDER BY evaluated_at, result_id")
+    connection = connect(db_path)
+    try:
+        history = pd.read_sql_query(query, connection, params=params)
+    finally:
+        connection.close()
+    history["score"] = pd.to_numeric(history["score"], errors="coerce")
+    return history.rename(columns={"score": column})
+
+def score_trends(column=FINAL_SCORE_COLUMN, since=None, db_path=DEFAULT_DB_PATH):
+    """
+    Per-dataset summary of one score column across runs: number of runs, first, last,
+    minimum, maximum and last-minus-first change, most degraded datasets first.
+    """
+    history = score_history(column=column, since=since, db_path=db_path).dropna(subset=[column])
+    if history.empty:
+        return pd.DataFrame(columns=["file_name", "runs", "first", "last", "min", "max", "change"])
+    grouped = history.groupby("file_name")[column]
+    trends = pd.DataFrame({
+        "runs": grouped.size(), "first": grouped.first(), "last": grouped.last(),
+        "min": grouped.min(), "max": grouped.max(),
+    })
+    trends["change"] = trends["last"] - trends["first"]
+    return trends.sort_values("change", kind="stable").reset_index()
+
+def run_results(run_id=None, db_path=DEFAULT_DB_PATH):
+    """
+    The results rows of one run (the latest by default), as in results.csv.
+    """
+    connection = connect(db_path)
+    try:
+        if run_id is None:
+            latest = connection.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+            if latest is None:
+                return pd.DataFrame()
+            run_id = latest
+        rows = connection.execute("SELECT row FROM results WHERE run_id = ? ORDER BY file_name",
+                                  (run_id,)).fetchall()
+    finally:
+        connection.close()
+    return pd.DataFrame([json.loads(row) for (row,) in rows])
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the score history recorded by main.py.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"Results store (default: {DEFAULT_DB_PATH}).")
+    parser.add_argument("--file", default=None, help="Show every recorded score of this dataset.")
+    parser.add_argument("--column", default=FINAL_SCORE_COLUMN,
+                        help=f"Score column to follow (default: {FINAL_SCORE_COLUMN}).")
+    parser.add_argument("--since", default=None, help="Only runs at or after this ISO 8601 time (UTC).")
+    args = parser.parse_args()
+
+    if args.file:
+        table = score_history(file_name=args.file, column=args.column, since=args.since, db_path=args.db)
+    else:
+        table = score_trends(column=args.column, since=args.since, db_path=args.db)
+    print(table.to_string(index=False) if not table.empty else "No recorded results.")
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,8 @@
 import logging
 import numpy as np
 from datetime import datetime
-from art.attacks.evasion import FastGradientMethod
-from art.estimators.classification import SklearnClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from evaluation_context import build_context
+from model_backend import test_predictions, is_black_box
 
 # Ensure reproducibility for NumPy
 np.random.seed(42)
@@ -16,43 +14,203 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def evaluate_robustness(df):
-    try:
-        logging.info("Starting robustness evaluation.")
+# Upper bound on the number of perturbed values materialised at once by the closed-form attack.
+_MAX_BATCH_VALUES = 4_000_000
+
+def is_linear_classifier(model):
+    """
+    True for fitted linear classifiers (coef_, intercept_, predict_proba) whose probabilities are
+    the sigmoid or softmax of their linear scores, which the closed-form gradient assumes: binary
+    models, and multiclass LogisticRegression with the multinomial loss. One-vs-rest multiclass
+    models (SGDClassifier, liblinear or multi_class="ovr" LogisticRegression, OnlineLogisticModel)
+    normalise per-class sigmoids instead and take the generic path.
+    """
+    if not all(hasattr(model, attr) for attr in ("coef_", "intercept_", "classes_", "predict_proba")):
+        return False
+    if len(model.classes_) == 2 and np.shape(model.coef_)[0] == 1:
+        return True
+    from sklearn.linear_model import LogisticRegression
+    if not isinstance(model, LogisticRegression):
+        return False
+    multi_class = getattr(model, "multi_class", "auto")
+    return multi_class == "multinomial" or (multi_class in ("auto", "deprecated") and model.solver != "liblinear")
+
+def linear_fgsm_correct(model, X, y, eps_values, proba=None):
+    """
+    Whether a linear classifier still predicts each row correctly under an untargeted L-inf
+    FGSM attack, for every eps at once.
+
+    For a linear model the input gradient of the cross-entropy loss is (p - onehot(label)) @ W,
+    so its sign is known in closed form. The model's own predictions on the clean inputs are
+    used as labels and inputs are perturbed in float32, exactly as ART's FastGradientMethod
+    does, so results match the ART attack without its gradient machinery. proba, the model's
+    predict_proba on X when already known, saves recomputing it.
+
+    Returns:
+      A boolean array of shape (number of eps values, number of rows).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    eps = np.asarray(eps_values, dtype=np.float64)[:, None, None]
+
+    weights = model.coef_
+    if weights.shape[0] == 1:
+        weights = np.vstack([-weights, weights])
+    labels = np.argmax(model.predict_proba(X) if proba is None else proba, axis=1)
+
+    correct = np.zeros((len(eps_values), len(X)), dtype=bool)
+    batch_rows = max(1, _MAX_BATCH_VALUES // max(1, len(eps_values) * X.shape[1]))
+    for start in range(0, len(X), batch_rows):
+        X_batch = X[start:start + batch_rows]
+        X32 = X_batch.astype(np.float32)
+
+        # 1. Sign of the loss gradient, evaluated at the float32 inputs.
+        proba = model.predict_proba(X32)
+        onehot = np.zeros_like(proba)
+        onehot[np.arange(len(labels[start:start + batch_rows])), labels[start:start + batch_rows]] = 1.0
+        signs = np.sign((proba - onehot) @ weights)
+
+        # 2. One step of size eps, projected back onto the eps-ball, for every eps.
+        stepped = (X32[None] + eps * signs[None]).astype(np.float32)
+        X_adv = (X_batch[None] + np.clip(stepped - X_batch[None], -eps, eps)).astype(np.float32)
+
+        # 3. Predictions of the linear model on every perturbed copy.
+        scores = X_adv.reshape(-1, X.shape[1]) @ model.coef_.T + model.intercept_
+        if scores.shape[1] == 1:
+            predicted = (scores[:, 0] > 0).astype(np.int64)
+        else:
+            predicted = scores.argmax(axis=1)
+        predicted = model.classes_[predicted].reshape(len(eps_values), -1)
+        correct[:, start:start + batch_rows] = predicted == np.asarray(y[start:start + batch_rows])[None]
+
+    return correct
+
+def linear_fgsm_accuracy(model, X, y, eps_values):
+    """
+    Accuracy of a linear classifier under the closed-form FGSM attack (see linear_fgsm_correct),
+    one per eps value.
+    """
+    return [float(accuracy) for accuracy in linear_fgsm_correct(model, X, y, eps_values).mean(axis=1)]
 
-        # Use internal default: assume target is the last column
-        if df.shape[1] < 2:
-            raise ValueError("Not enough columns to separate features and target.")
-        
-        target_column = df.columns[-1]
-        feature_columns = list(df.columns[:-1])
+def finite_difference_fgsm_correct(model, X, y, eps_values, proba=None, step=1e-4):
+    """
+    Per-row correctness under FGSM for black-box models, which only expose predict_proba:
+    the sign of the input gradient of the cross-entropy loss (labels are the model's own
+    predictions, as in the other attacks) is estimated by central finite differences of
+    size step. Every perturbed copy of a batch goes through one predict_proba call.
 
-        # Split data into train and test sets (Set random_state=42)
-        X = df[feature_columns]
-        y = df[target_column]
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    Returns:
+      A boolean array of shape (number of eps values, number of rows).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    n_rows, n_features = X.shape
+    eps = np.asarray(eps_values, dtype=np.float64)[:, None, None]
+    labels = np.argmax(model.predict_proba(X) if proba is None else proba, axis=1)
 
-        # Train a logistic regression model (Set random_state=42)
-        model = LogisticRegression(max_iter=1000, random_state=42)
-        model.fit(X_train, y_train)
+    correct = np.zeros((len(eps_values), n_rows), dtype=bool)
+    batch_rows = max(1, _MAX_BATCH_VALUES // max(1, 2 * n_features * n_features))
+    for start in range(0, n_rows, batch_rows):
+        X_batch = X[start:start + batch_rows]
+        batch_labels = labels[start:start + batch_rows]
 
-        # Wrap model with ART classifier
+        # 1. Loss at x + step * e_j and x - step * e_j, for every row and feature j.
+        offsets = step * np.eye(n_features)
+        shifted = np.concatenate([X_batch[:, None, :] + offsets, X_batch[:, None, :] - offsets])
+        proba = np.asarray(model.predict_proba(shifted.reshape(-1, n_features)))
+        proba = proba.reshape(2, len(X_batch), n_features, -1)
+        label_proba = np.take_along_axis(proba, batch_labels[None, :, None, None], axis=3)[..., 0]
+        loss = -np.log(np.clip(label_proba, 1e-12, 1.0))
+        signs = np.sign(loss[0] - loss[1])
+
+        # 2. One step of size eps for every eps, and the model's predictions on each copy.
+        X_adv = X_batch[None] + eps * signs[None]
+        predicted = model.predict(X_adv.reshape(-1, n_features)).reshape(len(eps_values), -1)
+        correct[:, start:start + batch_rows] = predicted == np.asarray(y[start:start + batch_rows])[None]
+
+    return correct
+
+def art_gradient_classifier(model):
+    """
+    ART wrapper of model when ART can compute its loss gradients (e.g. SVC or MLPClassifier,
+    not tree ensembles); None otherwise, including for black-box models.
+    """
+    if is_black_box(model):
+        return None
+    from art.estimators.classification import SklearnClassifier
+    from art.estimators.estimator import LossGradientsMixin
+
+    art_classifier = SklearnClassifier(model=model)
+    return art_classifier if isinstance(art_classifier, LossGradientsMixin) else None
+
+def art_fgsm_correct(model, X, y, eps_values, art_classifier=None):
+    """
+    Per-row correctness under ART's FastGradientMethod, for models without a closed-form
+    gradient, as an array of shape (number of eps values, number of rows).
+    """
+    from art.attacks.evasion import FastGradientMethod
+    from art.estimators.classification import SklearnClassifier
+
+    # Wrap model with ART classifier
+    if art_classifier is None:
         art_classifier = SklearnClassifier(model=model)
+    correct = []
+    for eps in eps_values:
+        attack = FastGradientMethod(estimator=art_classifier, eps=eps)
+        X_adv = attack.generate(X)
+        correct.append(model.predict(X_adv) == np.asarray(y))
+    return np.array(correct, dtype=bool).reshape(len(eps_values), len(X))
 
-        # Evaluate initial accuracy
-        initial_accuracy = model.score(X_test, y_test)
-        logging.info(f"Initial model accuracy: {initial_accuracy}")
+def art_fgsm_accuracy(model, X, y, eps_values):
+    """
+    Accuracy under ART's FastGradientMethod (see art_fgsm_correct), one per eps value.
+    """
+    return [float(accuracy) for accuracy in art_fgsm_correct(model, X, y, eps_values).mean(axis=1)]
 
-        # Generate adversarial examples (Ensure deterministic attack if possible)
-        attack = FastGradientMethod(estimator=art_classifier, eps=0.2)
-        X_test_adv = attack.generate(X_test.to_numpy())
+def evaluate_robustness(df, context=None, eps=0.2, eps_values=None):
+    """
+    Accuracy of the baseline model before and after an FGSM attack of size eps.
+
+      - Binary linear models and multinomial logistic regressions are attacked in closed form
+        (see is_linear_classifier), estimators with ART loss gradients through
+        ART, and the others (model_backend.CallableModel, tree ensembles) through
+        finite-difference gradients of predict_proba.
+      - eps_values adds an accuracy-vs-eps curve, computed in the same vectorized pass.
+      - adversarial_correct flags the test rows still predicted correctly under the attack
+        of size eps (used for bootstrap intervals, see uncertainty.score_intervals).
+    """
+    try:
+        logging.info("Starting robustness evaluation.")
+
+        # Shared split and baseline model (target is the last column)
+        context = build_context(df, context)
+        model = context.baseline_model
+        X_test, y_test = context.X_test, context.y_test
+
+        # Evaluate initial accuracy (test predictions are shared with the other calculators)
+        initial_accuracy = float(np.mean(test_predictions(context) == np.asarray(y_test)))
+        logging.info(f"Initial model accuracy: {initial_accuracy}")
 
-        # Evaluate accuracy on adversarial examples
-        adversarial_accuracy = model.score(X_test_adv, y_test)
+        # Evaluate accuracy on adversarial examples for every eps
+        all_eps = sorted(set(eps_values or []) | {eps})
+        art_classifier = None if is_linear_classifier(model) else art_gradient_classifier(model)
+        if is_linear_classifier(model):
+            attack_engine = "closed_form"
+            correct = linear_fgsm_correct(model, X_test, y_test, all_eps, test_predictions(context, "predict_proba"))
+        elif art_classifier is not None:
+            attack_engine = "art"
+            correct = art_fgsm_correct(model, X_test, y_test, all_eps, art_classifier)
+        else:
+            attack_engine = "finite_difference"
+            correct = finite_difference_fgsm_correct(model, X_test, y_test, all_eps,
+                                                     test_predictions(context, "predict_proba"))
+        accuracies = [float(accuracy) for accuracy in correct.mean(axis=1)]
+        accuracy_curve = [(float(e), float(acc)) for e, acc in zip(all_eps, accuracies)]
+        adversarial_accuracy = accuracies[all_eps.index(eps)]
         logging.info(f"Adversarial model accuracy: {adversarial_accuracy}")
 
         logging.info("Robustness evaluation completed successfully.")
-        return {"initial_accuracy": initial_accuracy, "adversarial_accuracy": adversarial_accuracy}
+        return {"initial_accuracy": initial_accuracy, "adversarial_accuracy": adversarial_accuracy,
+                "accuracy_curve": accuracy_curve, "attack_engine": attack_engine,
+                "adversarial_correct": correct[all_eps.index(eps)]}
 
     except Exception as e:
         logging.error(f"Error during robustness evaluation: {e}")
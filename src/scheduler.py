@@ -0,0 +1,115 @@
+import os
+import time
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+
+from threadpoolctl import threadpool_limits
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+def default_worker_count():
+    """
+    Number of worker processes used when the caller asks for "all cores".
+    """
+    return max(1, os.cpu_count() or 1)
+
+def _run_task(worker, arg, conn):
+    """
+    Child-process entry point: run one task and send its outcome back to the parent.
+    BLAS threads are pinned to one per process so that N workers use N cores.
+    """
+    try:
+        with threadpool_limits(limits=1):
+            result = worker(arg)
+        conn.send(("ok", result))
+    except BaseException as e:
+        conn.send(("error", repr(e)))
+    finally:
+        conn.close()
+
+def _receive(conn):
+    """
+    The outcome a worker sent, or an error outcome if it closed the pipe without sending one.
+    """
+    try:
+        return conn.recv()
+    except EOFError:
+        return ("error", "worker exited without a result")
+
+def run_in_process_pool(tasks, worker, max_workers=None, timeout=None):
+    """
+    Run worker(arg) for every (key, arg) in tasks, each in its own child process.
+
+      - At most max_workers processes run at the same time; tasks start in the given order,
+        so callers should put their most expensive tasks first.
+      - A task that runs longer than timeout seconds is killed. A task that already sent its
+        result but has not exited by then keeps its result.
+      - A task that raises, crashes the interpreter or is killed only loses its own result.
+
+    Returns:
+      A dictionary mapping each key to the worker's return value, or None if the task failed.
+    """
+    max_workers = max_workers or default_worker_count()
+    pending = list(tasks)
+    running = {}
+    results = {}
+
+    while pending or running:
+        # 1. Fill free slots with the next tasks.
+        while pending and len(running) < max_workers:
+            key, arg = pending.pop(0)
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_task, args=(worker, arg, child_conn), name=f"worker-{key}")
+            process.start()
+            child_conn.close()
+            deadline = time.monotonic() + timeout if timeout else None
+            running[key] = {"process": process, "conn": parent_conn, "deadline": deadline, "outcome": None}
+            logging.info(f"Started {key} in process {process.pid}.")
+
+        # 2. Wait for a result, a process exit or the nearest deadline.
+        deadlines = [task["deadline"] for task in running.values() if task["deadline"] is not None]
+        wait_timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        handles = []
+        for task in running.values():
+            handles.append(task["process"].sentinel)
+            if task["outcome"] is None:
+                handles.append(task["conn"])
+        wait(handles, timeout=wait_timeout)
+
+        # 3. Collect finished, crashed and timed-out tasks.
+        for key in list(running):
+            task = running[key]
+            process = task["process"]
+            if task["outcome"] is None and task["conn"].poll():
+                task["outcome"] = _receive(task["conn"])
+
+            if process.is_alive():
+                if task["deadline"] is not None and time.monotonic() >= task["deadline"]:
+                    # A result sent after the poll above still counts; only the process is killed.
+                    if task["outcome"] is None and task["conn"].poll():
+                        task["outcome"] = _receive(task["conn"])
+                    process.kill()
+                    process.join()
+                    if task["outcome"] is None:
+                        task["outcome"] = ("error", f"timed out after {timeout} seconds")
+                else:
+                    # Still running, or exiting after sending its result: collected once it exits
+                    # (or at its deadline), without blocking the other tasks.
+                    continue
+            else:
+                process.join()
+
+            status, value = task["outcome"] or ("error", f"worker crashed with exit code {process.exitcode}")
+            if status == "ok":
+                results[key] = value
+            else:
+                logging.error(f"Task {key} failed: {value}")
+                results[key] = None
+            task["conn"].close()
+            del running[key]
+
+    return results
@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from indicators import INDICATOR_NAMES, resolve_indicators
+from scheduler import default_worker_count
+import result_cache
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# process_file options a client may set per job; they are part of the result cache key.
+# model/model_path are deliberately absent: loading a model file unpickles it, which would
+# let any client run code on the server.
+JOB_OPTIONS = {"indicators", "fairness_sample_size", "explain_rows", "explanation_method", "eps_values",
+               "privacy_epsilons", "privacy_seeds", "timing_columns", "incremental", "streaming_block_rows",
+               "bootstrap_resamples", "triage_sample_rows"}
+# Options that must be a positive integer; those also in OPTIONAL may be null.
+_POSITIVE_INT_OPTIONS = {"fairness_sample_size", "explain_rows", "privacy_seeds", "streaming_block_rows",
+                         "bootstrap_resamples", "triage_sample_rows"}
+_OPTIONAL = {"fairness_sample_size", "streaming_block_rows", "bootstrap_resamples", "triage_sample_rows",
+             "indicators", "eps_values", "privacy_epsilons"}
+_EXPLANATION_METHODS = {"auto", "linear", "lime"}
+
+def _warm_worker():
+    """
+    Worker initializer: import the CLI and every calculator once, so jobs never pay for
+    imports, and pin BLAS to one thread per worker process.
+    """
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(limits=1)
+    import main
+    import evaluation_context
+    from indicators import load_evaluator
+    for name in INDICATOR_NAMES:
+        load_evaluator(name)
+
+def _ping():
+    return os.getpid()
+
+def _evaluate_job(file_path, options, use_processed_cache=True, content_digest=None):
+    import main
+    return main.process_file(file_path, use_processed_cache=use_processed_cache, content_digest=content_digest,
+                             **options)
+
+class EvaluationService:
+    """
+    Warm pool of worker processes evaluating one dataset per job.
+
+      - At most workers jobs run at once and at most max_queue more wait; further
+        submissions are refused (back-pressure) instead of piling up.
+      - Rows of unchanged files are served from the result cache, as in process_all_files,
+        under the same key as the CLI (options normalised by main.normalise_evaluation_options).
+      - use_cache=False also disables the preprocessed-data cache in the workers.
+    """
+
+    def __init__(self, workers=None, max_queue=16, job_timeout=None, use_cache=True):
+        self.workers = workers or default_worker_count()
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.use_cache = use_cache
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # Start and warm every worker now rather than on the first jobs.
+        for future in [self._pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        logging.info(f"Evaluation service ready with {self.workers} warm worker(s).")
+
+    @property
+    def active_jobs(self):
+        with self._lock:
+            return self._active
+
+    def evaluate(self, file_path, options=None):
+        """
+        Evaluate one dataset and return (row, served_from_cache), or None when the service
+        is saturated. Raises TimeoutError if the job takes longer than job_timeout.
+        """
+        import main
+        options = main.normalise_evaluation_options(**(options or {}))
+        key = None
+        content_digest = None
+        if self.use_cache:
+            # Hashed once, for the result cache and the worker's preprocessed-data cache.
+            content_digest = main.content_digest_for(file_path, options)
+            key = result_cache.cache_key(file_path, params=options, content_digest=content_digest)
+            row = result_cache.get_cached_row(key)
+            if row is not None:
+                row["File Name"] = os.path.basename(file_path)
+                return row, True
+
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._active += 1
+        future = self._pool.submit(_evaluate_job, file_path, options, self.use_cache, content_digest)
+
+        def release(_):
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+        future.add_done_callback(release)
+
+        try:
+            row = future.result(timeout=self.job_timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Evaluation of {os.path.basename(file_path)} exceeded {self.job_timeout}s.")
+        if row is not None and key is not None:
+            result_cache.put_cached_row(key, row)
+        return row, False
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def parse_job_options(options, upload=False):
+    """
+    Validate the options of a job. Raises ValueError on an unknown option or indicator,
+    or on a value of the wrong type, so that a malformed job is refused instead of
+    producing (and caching) an NA score. incremental is refused for uploads (upload=True):
+    each upload is a new temporary file, so its state could never be reused.
+    """
+    if not isinstance(options, dict):
+        raise ValueError("options must be a JSON object.")
+    unknown = set(options) - JOB_OPTIONS
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(JOB_OPTIONS))}.")
+    for name, value in options.items():
+        if value is None:
+            if name not in _OPTIONAL:
+                raise ValueError(f"{name} cannot be null.")
+        elif name in _POSITIVE_INT_OPTIONS:
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise ValueError(f"{name} must be a positive integer.")
+        elif name in ("timing_columns", "incremental"):
+            if not isinstance(value, bool):
+                raise ValueError(f"{name} must be true or false.")
+        elif name == "explanation_method":
+            if value not in _EXPLANATION_METHODS:
+                raise ValueError(f"explanation_method must be one of {', '.join(sorted(_EXPLANATION_METHODS))}.")
+        elif name in ("eps_values", "privacy_epsilons"):
+            if not isinstance(value, list) or not all(_is_number(item) and item > 0 for item in value):
+                raise ValueError(f"{name} must be a list of positive numbers.")
+        elif name == "indicators":
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError("indicators must be a list of indicator names.")
+    if upload and options.get("incremental"):
+        raise ValueError("incremental only applies to datasets on the server's disk, not to uploads.")
+    if options.get("indicators") is not None:
+        options["indicators"] = resolve_indicators(options["indicators"])
+    return options
+
+class EvaluationHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health                       -> worker count and running jobs.
+    POST /evaluate  {"path": ..., "options": {...}}
+                                       -> the results.csv row of a dataset on the server's disk.
+    POST /evaluate?name=x.csv&options=<json>  (CSV body)
+                                       -> the row of an uploaded dataset (not incremental).
+    A saturated service answers 503 with Retry-After; a job over the timeout answers 504.
+    """
+
+    service = None
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send_json(404, {"error": "Not found."})
+            return
+        self._send_json(200, {"status": "ok", "workers": self.service.workers,
+                              "active_jobs": self.service.active_jobs, "max_queue": self.service.max_queue})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/evaluate":
+            self._send_json(404, {"error": "Not found."})
+            return
+
+        upload_dir = None
+        try:
+            # 1. Read the job: a path on the server, or an uploaded CSV.
+            try:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                query = parse_qs(url.query, keep_blank_values=True)
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    job = json.loads(body or b"{}")
+                    file_path = job.get("path")
+                    options = parse_job_options(job.get("options") or {})
+                    if not file_path or not os.path.isfile(file_path):
+                        raise ValueError(f"Dataset not found: {file_path}")
+                else:
+                    name = os.path.basename(query.get("name", ["upload.csv"])[0])
+                    if name in ("", ".", ".."):
+                        raise ValueError(f"Invalid upload name: {name!r}.")
+                    options = parse_job_options(json.loads(query.get("options", ["{}"])[0]), upload=True)
+                    upload_dir = tempfile.mkdtemp(prefix="bias_upload_")
+                    file_path = os.path.join(upload_dir, name)
+                    with open(file_path, "wb") as upload:
+                        upload.write(body)
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+            # 2. Evaluate it on the warm pool.
+            start = time.perf_counter()
+            outcome = self.service.evaluate(file_path, options)
+            if outcome is None:
+                self._send_json(503, {"error": "Evaluation queue is full, retry later."}, {"Retry-After": "1"})
+                return
+            row, cached = outcome
+            if row is None:
+                self._send_json(422, {"error": f"Could not evaluate {os.path.basename(file_path)}."})
+                return
+            self._send_json(200, {"row": row, "cached": cached, "seconds": time.perf_counter() - start})
+        except TimeoutError as e:
+            self._send_json(504, {"error": str(e)})
+        except Exception as e:
+            logging.error(f"Evaluation job failed: {e}")
+            self._send_json(500, {"error": str(e)})
+        finally:
+            if upload_dir:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} - {format % args}")
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_queue=16, job_timeout=None, use_cache=True):
+    """
+    Build the HTTP server and its warm worker pool; call serve_forever() to run it.
+    """
+    handler = type("BoundEvaluationHandler", (EvaluationHandler,),
+                   {"service": EvaluationService(workers, max_queue, job_timeout, use_cache)})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dataset evaluations over HTTP from warm worker processes.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT}).")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Worker processes; 0 uses every CPU core (default: 0).")
+    parser.add_argument("--max-queue", type=int, default=16,
+                        help="Jobs allowed to wait for a worker before new ones get 503 (default: 16).")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Seconds a client waits for one job before getting 504.")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-evaluate instead of using the result cache.")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.workers or None, args.max_queue, args.timeout, not args.no_cache)
+    logging.info(f"Listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.service.shutdown()
+
+if __name__ == "__main__":
+    main()
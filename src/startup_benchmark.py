@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from indicators import INDICATOR_NAMES
+
+# Code timed in a fresh interpreter for each target: importing the CLI, then the
+# calculator of one indicator the way process_file loads it.
+_CLI_IMPORT = "import main"
+_INDICATOR_IMPORT = "import main\nfrom indicators import load_evaluator\nload_evaluator({name!r})"
+
+_TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+def time_import(code, repeat=5):
+    """
+    Median wall time (seconds) of running code in a fresh Python interpreter, measured
+    inside the child so that interpreter startup itself is excluded.
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(code=code)],
+            cwd=src_dir, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+def run_startup_benchmark(repeat=5):
+    """
+    Import latency of the CLI and of each indicator's calculator.
+
+    Returns:
+      A dictionary mapping "cli" and "indicator:<name>" to median seconds.
+    """
+    timings = {"cli": time_import(_CLI_IMPORT, repeat)}
+    for name in INDICATOR_NAMES:
+        timings[f"indicator:{name}"] = time_import(_INDICATOR_IMPORT.format(name=name), repeat)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import latency of the CLI and of each indicator.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement (default: 5).")
+    parser.add_argument("--max-cli-seconds", type=float, default=None,
+                        help="Exit with status 1 if importing the CLI takes longer than this.")
+    parser.add_argument("--output", default=None, help="Also write the timings to this JSON file.")
+    args = parser.parse_args()
+
+    timings = run_startup_benchmark(args.repeat)
+    for target, seconds in timings.items():
+        print(f"{target:<28} {seconds * 1000:8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(timings, output_file, indent=4)
+
+    if args.max_cli_seconds is not None and timings["cli"] > args.max_cli_seconds:
+        print(f"CLI import took {timings['cli']:.3f}s, over the {args.max_cli_seconds:.3f}s budget.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
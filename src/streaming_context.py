@@ -0,0 +1,114 @@
+import logging
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Rows converted to float64 and fed to the model at a time.
+DEFAULT_BLOCK_ROWS = 100_000
+# SGD passes over the training rows.
+DEFAULT_EPOCHS = 5
+# Rows kept of each split: the test sample scores model_accuracy and adversarial_accuracy.
+HOLDOUT_ROWS = 50_000
+TEST_FRACTION = 0.2
+
+class StreamingContext:
+    """
+    Evaluation context trained out of core, for frames whose float64 feature matrix does not
+    fit in memory (e.g. chunked or memory-mapped frames). It has the attributes of
+    EvaluationContext, so the model-based calculators use it unchanged.
+
+      - The last column is the target. Rows go to the test split by a hash of their position
+        (about TEST_FRACTION of them), the others are used for training.
+      - A first pass collects the feature statistics, data_norm and
+        uniform reservoir samples of at most holdout_rows rows of each split (X_train/X_test).
+      - baseline_model is an OnlineLogisticModel trained with minibatch SGD over epochs passes
+        of block_rows rows, in a shuffled order; only one block is in float64 at a time.
+        With model (a fitted estimator or model_backend.CallableModel), that model is audited
+        instead and only the first pass is made.
+
+    Accuracy tolerance: on the bundled datasets where the in-memory LogisticRegression fit
+    converges (10k-100k rows), model accuracy stays within 0.01 of it. Adversarial accuracy
+    depends on the learned coefficients and can differ more (0.95 vs 0.98 on credit_test.csv).
+    Where the in-memory fit stops at max_iter on unscaled features, the SGD model on
+    standardized features usually scores higher. With HOLDOUT_ROWS test rows, the sampling
+    error of both accuracies is below 0.005.
+    """
+
+    def __init__(self, df, block_rows=DEFAULT_BLOCK_ROWS, epochs=DEFAULT_EPOCHS, holdout_rows=HOLDOUT_ROWS,
+                 random_state=42, model=None):
+        # Imported here, so the CLI can read DEFAULT_BLOCK_ROWS without importing scikit-learn.
+        from online_model import OnlineLogisticModel, Reservoir
+
+        if df.shape[1] < 2:
+            raise ValueError("Not enough columns to separate features and target.")
+
+        self.target_column = df.columns[-1]
+        self.feature_columns = list(df.columns[:-1])
+        self.random_state = random_state
+        self._df = df
+        self._block_starts = np.arange(0, len(df), max(1, block_rows))
+        self._block_rows = max(1, block_rows)
+        self._train = Reservoir(holdout_rows, len(self.feature_columns), random_state)
+        self._test = Reservoir(holdout_rows, len(self.feature_columns), random_state + 1)
+        self.data_norm = 0.0
+
+        if model is None:
+            classes = np.unique(df[self.target_column].to_numpy())
+            if len(classes) < 2:
+                raise ValueError("The target column has a single class.")
+            self.baseline_model = OnlineLogisticModel(classes, random_state=random_state)
+        else:
+            self.baseline_model = model
+            epochs = 0
+
+        # 1. Statistics pass: feature mean/variance, reservoirs and data_norm.
+        for start in self._block_starts:
+            X, y, is_test = self._block(start)
+            X_train, y_train = X[~is_test], y[~is_test]
+            if model is None:
+                self.baseline_model.observe(X_train)
+            self._train.add(X_train, y_train)
+            self._test.add(X[is_test], y[is_test])
+            if len(X_train):
+                self.data_norm = max(self.data_norm, float(np.linalg.norm(X_train, axis=1).max()))
+
+        # 2. Training passes, blocks and the rows inside them in a fresh random order each time.
+        if not epochs:
+            return
+        logging.info(f"Training the baseline model out of core: {len(df)} rows in "
+                     f"{len(self._block_starts)} block(s), {epochs} epoch(s).")
+        rng = np.random.default_rng(random_state)
+        for _ in range(epochs):
+            for start in rng.permutation(self._block_starts):
+                X, y, is_test = self._block(start)
+                order = rng.permutation(np.flatnonzero(~is_test))
+                self.baseline_model.partial_fit(X[order], y[order], observe=False)
+
+    def _block(self, start):
+        """
+        Features (float64), target and test mask of the block of rows starting at start.
+        """
+        from online_model import hash_split
+        block = self._df.iloc[start:start + self._block_rows]
+        X = block[self.feature_columns].to_numpy(dtype=np.float64)
+        y = block[self.target_column].to_numpy()
+        return X, y, hash_split(start + np.arange(len(block)), TEST_FRACTION)
+
+    @property
+    def X_train(self):
+        return self._train.X
+
+    @property
+    def y_train(self):
+        return self._train.y
+
+    @property
+    def X_test(self):
+        return self._test.X
+
+    @property
+    def y_test(self):
+        return self._test.y
@@ -1,10 +1,10 @@
 ﻿import logging
 from datetime import datetime
-from lime.lime_tabular import LimeTabularExplainer
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.metrics import accuracy_score
 import numpy as np
+from evaluation_context import build_context
+from model_backend import test_predictions
 
 # Setup logging
 logging.basicConfig(
@@ -12,46 +12,141 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def evaluate_transparency(df):
+# Per-process LIME state, set up once per worker by _init_lime_worker.
+_lime_worker = {}
+
+def _make_explainer(training_data, feature_names):
+    # LIME is only imported when an explanation actually needs it.
+    from lime.lime_tabular import LimeTabularExplainer
+    return LimeTabularExplainer(
+        training_data=training_data,
+        feature_names=feature_names,
+        class_names=["Negative", "Positive"],
+        mode="classification"
+    )
+
+def _init_lime_worker(training_data, feature_names, model):
+    _lime_worker["explainer"] = _make_explainer(training_data, feature_names)
+    _lime_worker["model"] = model
+
+def _explain_rows_with_lime(rows, seeds, num_samples):
+    """
+    LIME explanations of a batch of rows. Each explain_instance call sends all
+    num_samples perturbations of its row through one vectorized predict_proba call.
+    The random state is reset per row so results do not depend on how rows are batched.
+    """
+    from sklearn.utils import check_random_state
+    explainer, model = _lime_worker["explainer"], _lime_worker["model"]
+    weights = np.zeros((len(rows), rows.shape[1]))
+    local = []
+    for i, (row, seed) in enumerate(zip(rows, seeds)):
+        explainer.random_state = check_random_state(seed)
+        if explainer.discretizer is not None:
+            explainer.discretizer.random_state = check_random_state(seed)
+        explanation = explainer.explain_instance(data_row=row, predict_fn=model.predict_proba,
+                                                 num_samples=num_samples)
+        for feature, weight in explanation.as_map()[1]:
+            weights[i, feature] = weight
+        local.append(explanation.as_list())
+    return weights, local
+
+def _lime_weights(context, model, rows, n_workers, num_samples, random_state):
+    """
+    LIME feature weights (one row per explained instance) and the local explanation of the first row.
+    """
+    seeds = [random_state + i for i in range(len(rows))]
+    if n_workers <= 1 or len(rows) == 1:
+        _init_lime_worker(context.X_train, context.feature_columns, model)
+        weights, local = _explain_rows_with_lime(rows, seeds, num_samples)
+        return weights, local[0]
+
+    batches = np.array_split(np.arange(len(rows)), n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_lime_worker,
+                             initargs=(context.X_train, context.feature_columns, model)) as pool:
+        futures = [pool.submit(_explain_rows_with_lime, rows[batch], [seeds[i] for i in batch], num_samples)
+                   for batch in batches if len(batch)]
+        outputs = [future.result() for future in futures]
+    weights = np.vstack([batch_weights for batch_weights, _ in outputs])
+    return weights, outputs[0][1][0]
+
+def _linear_weights(context, model, rows, predicted_labels):
+    """
+    Exact additive explanation of a linear model: coefficient x (feature value - training mean),
+    for the class each row is predicted as. One matrix product for all rows, no LIME sampling.
+    """
+    deviations = rows - context.X_train.mean(axis=0)
+    coef = model.coef_
+    if coef.shape[0] == 1:
+        return deviations * coef[0]
+    predicted = np.searchsorted(model.classes_, predicted_labels)
+    return deviations * coef[predicted]
+
+def evaluate_transparency(df, context=None, explain_rows=1, explanation_method="auto", n_workers=1,
+                          num_samples=5000, random_state=42):
+    """
+    Accuracy of the baseline model on the test split plus feature-importance explanations.
+
+      - explain_rows test rows are explained (the first row when 1, otherwise a random sample),
+        and their absolute weights are averaged into a global importance table.
+      - explanation_method "linear" uses the exact coefficient x deviation attribution,
+        "lime" runs LimeTabularExplainer, "auto" picks "linear" whenever the model has coef_.
+      - n_workers spreads LIME explanations over that many processes.
+      - correct_predictions flags the test rows the model predicts correctly (used for
+        bootstrap intervals, see uncertainty.score_intervals).
+      - Models without predict_proba cannot be explained with LIME; they still get their
+        accuracy, with empty importance tables.
+    """
     try:
         logging.info("Starting transparency evaluation.")
 
-        # Use internal default: assume target is the last column
-        if df.shape[1] < 2:
-            raise ValueError("Not enough columns to separate features and target.")
-        
-        target_column = df.columns[-1]
-        feature_columns = list(df.columns[:-1])
-
-        # Split data into train and test sets (Fix: Set random_state=42)
-        X = df[feature_columns]
-        y = df[target_column]
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        # Train a logistic regression model (Fix: Set random_state=42)
-        model = LogisticRegression(max_iter=1000, random_state=42)
-        model.fit(X_train, y_train)
-
-        # Evaluate model accuracy
-        y_pred = model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
+        # Shared split and baseline model (target is the last column)
+        context = build_context(df, context)
+        model = context.baseline_model
+
+        # Evaluate model accuracy (test predictions are shared with the other calculators)
+        y_pred = test_predictions(context)
+        accuracy = accuracy_score(context.y_test, y_pred)
         logging.info(f"Model accuracy: {accuracy}")
 
-        # Use LIME for interpretability
-        explainer = LimeTabularExplainer(
-            training_data=X_train.values,
-            feature_names=feature_columns,
-            class_names=["Negative", "Positive"],
-            mode="classification"
-        )
-        explanation = explainer.explain_instance(
-            data_row=X_test.values[0],
-            predict_fn=model.predict_proba
+        # Rows to explain
+        n_rows = min(max(1, explain_rows), len(context.X_test))
+        if n_rows == 1:
+            row_index = np.array([0])
+        else:
+            row_index = np.sort(np.random.default_rng(random_state).choice(len(context.X_test), n_rows, replace=False))
+        rows = context.X_test[row_index]
+
+        if explanation_method == "auto":
+            explanation_method = "linear" if hasattr(model, "coef_") else "lime"
+        if explanation_method == "lime" and not hasattr(model, "predict_proba"):
+            # Predict-only models (e.g. model_backend.CallableModel without predict_proba) are scored, not explained.
+            logging.warning("The model has no predict_proba; skipping the LIME explanations.")
+            return {"model_accuracy": accuracy, "correct_predictions": y_pred == np.asarray(context.y_test),
+                    "lime_results": {"feature_importance": []}, "global_importance": [],
+                    "explanation_method": None, "explained_rows": 0}
+
+        # Use LIME (or the exact linear attribution) for interpretability
+        if explanation_method == "linear":
+            weights = _linear_weights(context, model, rows, y_pred[row_index])
+            order = np.argsort(-np.abs(weights[0]), kind="stable")[:10]
+            local_importance = [(context.feature_columns[i], float(weights[0, i])) for i in order]
+        elif explanation_method == "lime":
+            weights, local_importance = _lime_weights(context, model, rows, n_workers, num_samples, random_state)
+        else:
+            raise ValueError(f"Unknown explanation method: {explanation_method}")
+
+        mean_abs_weights = np.abs(weights).mean(axis=0)
+        global_importance = sorted(
+            ((feature, float(weight)) for feature, weight in zip(context.feature_columns, mean_abs_weights)),
+            key=lambda item: item[1], reverse=True
         )
-        lime_results = {"feature_importance": explanation.as_list()}
+        lime_results = {"feature_importance": local_importance}
+        logging.info(f"Most important features ({explanation_method}, {n_rows} rows): {global_importance[:3]}")
 
         logging.info("Transparency evaluation completed successfully.")
-        return {"model_accuracy": accuracy, "lime_results": lime_results}
+        return {"model_accuracy": accuracy, "correct_predictions": y_pred == np.asarray(context.y_test),
+                "lime_results": lime_results, "global_importance": global_importance,
+                "explanation_method": explanation_method, "explained_rows": n_rows}
 
     except Exception as e:
         logging.error(f"Error during transparency evaluation: {e}")
@@ -0,0 +1,61 @@
+import logging
+import pandas as pd
+
+from column_profile import column_roles
+from fairness_calculator import stratified_sample
+from indicators import INDICATORS, PRESENT_THRESHOLD
+import uncertainty
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Rows the expensive indicators are first evaluated on.
+DEFAULT_SAMPLE_ROWS = 5_000
+# Sample scores this close to PRESENT_THRESHOLD are recomputed on the full data.
+ESCALATION_MARGIN = 0.05
+# Indicators whose sample score underestimates the full-data score, and by how much at most:
+# differentially private training loses more accuracy on fewer rows (about 0.1 at 2,000 rows
+# on the bundled datasets), so "not present" sample scores within this margin are escalated.
+LOW_BIAS_MARGINS = {"privacy": 0.15}
+
+def split_by_cost(indicators):
+    """
+    (cheap, expensive) indicators of a selection, each in evaluation order (see indicators.INDICATORS).
+    """
+    cheap = [name for name in indicators if INDICATORS[name].get("cost") == "cheap"]
+    return cheap, [name for name in indicators if name not in cheap]
+
+def triage_sample(df, sample_rows=DEFAULT_SAMPLE_ROWS, random_state=42):
+    """
+    Proportional stratified sample of about sample_rows rows of df, by target (the last
+    column) and protected attributes, so that the sample keeps every class and group.
+    Rows keep their original order.
+    """
+    strata_columns = [col for col in df.columns[:-1] if "protected" in column_roles(col)] + [df.columns[-1]]
+    strata, _ = pd.factorize(pd.MultiIndex.from_frame(df[strata_columns].astype(str)))
+    rows = stratified_sample(strata, sample_rows, random_state)
+    return df.iloc[rows]
+
+def needs_full_data(name, score, results, margin=ESCALATION_MARGIN, n_resamples=uncertainty.DEFAULT_RESAMPLES):
+    """
+    Whether a score computed on the triage sample is too close to PRESENT_THRESHOLD to
+    decide "present" or "not present":
+
+      - the sample evaluation failed or is not applicable (the sample may lack a class),
+      - the score is within margin of the threshold, or below it by less than the
+        indicator's LOW_BIAS_MARGINS entry, or
+      - its bootstrap confidence interval on the sample rows contains the threshold
+        (indicators scored per test row: transparency and robustness).
+    """
+    if score is None:
+        return True
+    if abs(score - PRESENT_THRESHOLD) <= margin:
+        return True
+    if PRESENT_THRESHOLD - LOW_BIAS_MARGINS.get(name, 0.0) <= score < PRESENT_THRESHOLD:
+        return True
+    intervals = uncertainty.score_intervals({name: results}, {name: score}, n_resamples)
+    column = INDICATORS[name]["column"]
+    low, high = intervals.get(f"{column} CI Low"), intervals.get(f"{column} CI High")
+    return low is not None and low < PRESENT_THRESHOLD <= high
@@ -0,0 +1,113 @@
+import logging
+import numpy as np
+
+from indicators import INDICATORS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_RESAMPLES = 200
+
+def resample_cells(counts, n_resamples, rng):
+    """
+    Cell counts of n_resamples bootstrap resamples of the rows summarised by counts.
+
+    Drawing as many rows as there are, with replacement, and counting them per cell is the
+    same as one multinomial draw over the cells, so every resample is generated at once in
+    O(cells) work, whatever the number of rows.
+
+    Returns:
+      An array of shape (n_resamples, *counts.shape).
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros((n_resamples,) + counts.shape, dtype=np.int64)
+    draws = rng.multinomial(total, counts.ravel() / total, size=n_resamples)
+    return draws.reshape((n_resamples,) + counts.shape)
+
+def _fairness_draws(results, n_resamples, rng):
+    """
+    Fairness scores of the resamples, from the group sizes and selection rates of the first
+    protected attribute (bootstrap of the rows fairness was computed on).
+    """
+    groups = results.get("attributes", {}).get(results.get("protected_attribute"), {}).get("groups")
+    if not groups:
+        return None
+    sizes = np.array([group["count"] for group in groups.values()])
+    selected = np.rint(sizes * np.array([group["selection_rate"] for group in groups.values()])).astype(np.int64)
+    cells = resample_cells(np.stack([sizes - selected, selected], axis=1), n_resamples, rng)
+
+    # Groups that drew no rows are left out, as metrics_from_tables does.
+    counts = cells.sum(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.where(counts > 0, cells[:, :, 1] / counts, np.nan)
+    dp_diff = np.nanmax(rates, axis=1) - np.nanmin(rates, axis=1)
+    return np.clip(1 - np.abs(dp_diff), 0.0, 1.0)
+
+def _accuracy_draws(correct_by_indicator, n_resamples, rng):
+    """
+    Accuracies of the resamples for indicators scored on the same test rows. The rows are
+    resampled jointly (one cell per combination of outcomes), so the draws keep the
+    correlation between, e.g., clean and adversarial accuracy.
+    """
+    names = list(correct_by_indicator)
+    flags = np.stack([np.asarray(correct_by_indicator[name], dtype=np.int64) for name in names])
+    if flags.shape[1] == 0:
+        return {}
+    outcome_codes = (flags << np.arange(len(names))[:, None]).sum(axis=0)
+    cells = resample_cells(np.bincount(outcome_codes, minlength=2 ** len(names)), n_resamples, rng)
+    n_rows = flags.shape[1]
+    outcomes = np.arange(2 ** len(names))
+    return {name: cells[:, (outcomes >> i) & 1 == 1].sum(axis=1) / n_rows for i, name in enumerate(names)}
+
+def score_intervals(results_by_indicator, scores, n_resamples=DEFAULT_RESAMPLES, confidence=0.95, random_state=42):
+    """
+    Percentile bootstrap confidence intervals of the fairness, transparency and robustness
+    scores and of the final compliance score.
+
+      - Fairness resamples the rows it was computed on; transparency and robustness
+        resample the test rows jointly. The fitted model is kept fixed, so the intervals
+        cover the sampling of the evaluated rows, not refitting.
+      - Other indicators (privacy, accountability) enter the final score with their point value.
+      - Every resample is drawn as cell counts (see resample_cells), so n_resamples costs
+        about the same as one.
+
+    Returns:
+      "<score column> CI Low" / "CI High" columns for results.csv.
+    """
+    rng = np.random.default_rng(random_state)
+    draws = {}
+    fairness = results_by_indicator.get("fairness")
+    if fairness is not None and scores.get("fairness") is not None:
+        draws["fairness"] = _fairness_draws(fairness, n_resamples, rng)
+
+    correct_by_indicator = {}
+    for name, key in (("transparency", "correct_predictions"), ("robustness", "adversarial_correct")):
+        results = results_by_indicator.get(name)
+        if results is not None and scores.get(name) is not None and results.get(key) is not None:
+            correct_by_indicator[name] = results[key]
+    if correct_by_indicator:
+        draws.update(_accuracy_draws(correct_by_indicator, n_resamples, rng))
+
+    columns = {}
+    tail = (1 - confidence) / 2
+    for name, values in draws.items():
+        if values is None:
+            continue
+        low, high = np.quantile(values, [tail, 1 - tail])
+        columns[f"{INDICATORS[name]['column']} CI Low"] = float(low)
+        columns[f"{INDICATORS[name]['column']} CI High"] = float(high)
+
+    # Final score of every resample: indicators without draws keep their point score.
+    valid = [name for name, score in scores.items() if score is not None]
+    if valid:
+        final = np.mean([draws[name] if draws.get(name) is not None else np.full(n_resamples, scores[name])
+                         for name in valid], axis=0)
+        low, high = np.quantile(final, [tail, 1 - tail])
+        columns["Final Compliance Score CI Low"] = float(low)
+        columns["Final Compliance Score CI High"] = float(high)
+    logging.info(f"Bootstrap intervals from {n_resamples} resamples: {columns}")
+    return columns
@@ -0,0 +1,127 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+
+from data_loader import is_data_file
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_RESULTS_PATH = os.path.join("Output_report", "results.csv")
+
+def snapshot(data_folder):
+    """
+    Size and modification time of every dataset in data_folder, from one directory scan (no file is read).
+    """
+    signatures = {}
+    with os.scandir(data_folder) as entries:
+        for entry in entries:
+            if is_data_file(entry.name) and entry.is_file():
+                stat = entry.stat()
+                signatures[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return signatures
+
+def write_row(row, output_path=DEFAULT_RESULTS_PATH):
+    """
+    Insert or replace the row of one file in results.csv, keeping rows in file-name order.
+    The new table is written to a temporary file and renamed over the old one, so readers
+    never see a partially written results.csv.
+    """
+    if os.path.exists(output_path):
+        # Read as text so every existing value (including "NA") is written back unchanged.
+        results_df = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+        results_df = results_df[results_df["File Name"] != row["File Name"]]
+    else:
+        results_df = pd.DataFrame()
+    results_df = pd.concat([results_df, pd.DataFrame([row])], ignore_index=True)
+    results_df = results_df.sort_values("File Name", kind="stable")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    results_df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+
+async def watch_folder(data_folder, evaluate_file, output_path=DEFAULT_RESULTS_PATH, interval=2.0,
+                       settle_seconds=2.0, workers=1, known=None, stop=None):
+    """
+    Evaluate the datasets of data_folder as they are added or modified, until stop is set.
+
+      - The folder is polled every interval seconds (file sizes and times only).
+      - A new or changed file is only dispatched once its size and modification time have
+        stayed the same for settle_seconds, so files still being written are not read.
+      - evaluate_file(file_path) runs in a pool of workers processes; each returned row is
+        written to output_path with write_row.
+      - known maps file paths to the snapshot signature they were last evaluated at; those
+        files are only evaluated again when they change.
+      - When a worker crashes, the pool is replaced and the files it was evaluating are
+        dispatched again at the next poll.
+    """
+    loop = asyncio.get_running_loop()
+    stop = stop or asyncio.Event()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    write_lock = asyncio.Lock()
+    evaluated = dict(known or {})
+    pending = {}
+    running = {}
+
+    async def evaluate_and_record(file_path):
+        nonlocal executor
+        file_name = os.path.basename(file_path)
+        pool = executor
+        try:
+            row = await loop.run_in_executor(pool, evaluate_file, file_path)
+            if row is None:
+                logging.warning(f"No results for {file_name}.")
+                return
+            async with write_lock:
+                await loop.run_in_executor(None, write_row, row, output_path)
+            logging.info(f"Results of {file_name} written to '{output_path}'.")
+        except BrokenProcessPool:
+            # Every task of the crashed pool ends here: they are all evaluated again at the next
+            # poll, and only the first one replaces the pool (a later one would shut down the new pool).
+            evaluated.pop(file_path, None)
+            if executor is pool:
+                logging.error(f"A worker crashed while evaluating {file_name}; restarting the worker pool.")
+                pool.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                logging.error(f"Worker pool crashed while evaluating {file_name}; it will be evaluated again.")
+        except Exception as e:
+            logging.error(f"Evaluation of {file_name} failed: {e}")
+        finally:
+            running.pop(file_path, None)
+
+    logging.info(f"Watching '{data_folder}' for new or modified datasets.")
+    try:
+        while not stop.is_set():
+            # 1. Look for new or changed files and debounce them until they stop changing.
+            now = loop.time()
+            signatures = await loop.run_in_executor(None, snapshot, data_folder)
+            for file_path, signature in signatures.items():
+                if evaluated.get(file_path) == signature or file_path in running:
+                    continue
+                seen = pending.get(file_path)
+                if seen is None or seen[0] != signature:
+                    pending[file_path] = (signature, now)
+                elif now - seen[1] >= settle_seconds:
+                    # 2. Stable for long enough: dispatch it.
+                    del pending[file_path]
+                    evaluated[file_path] = signature
+                    logging.info(f"Evaluating new or modified file: {os.path.basename(file_path)}")
+                    running[file_path] = asyncio.create_task(evaluate_and_record(file_path))
+            for file_path in set(pending) - set(signatures):
+                del pending[file_path]
+
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if running:
+            await asyncio.gather(*running.values(), return_exceptions=True)
+        executor.shutdown()
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_profile import estimate_cardinality, first_binary_column, profile_columns
+
+@pytest.mark.parametrize("distinct", [1, 10, 1000, 50_000, 400_000])
+def test_cardinality_estimate_is_within_the_hyperloglog_error(distinct):
+    rng = np.random.default_rng(distinct)
+    values = rng.permutation(np.arange(distinct)).repeat(2)
+    # Relative standard error 1.04 / sqrt(2 ** 12), about 1.6%; allow four of them.
+    assert estimate_cardinality(values) == pytest.approx(distinct, rel=0.065, abs=1)
+
+def test_cardinality_of_strings_and_floats():
+    words = np.array([f"value-{i}" for i in range(20_000)] * 3, dtype=object)
+    assert estimate_cardinality(words) == pytest.approx(20_000, rel=0.065)
+    assert estimate_cardinality(np.linspace(0, 1, 30_000)) == pytest.approx(30_000, rel=0.065)
+
+def test_profile_columns():
+    df = pd.DataFrame({
+        "Sex": ["F", "M", None, "F"],
+        "income": [1.0, np.nan, 3.0, 4.0],
+        "loan_id": [1, 2, 3, 4],
+        "approved": [1, 0, 0, 1],
+    })
+    profile = profile_columns(df)
+    assert profile["Sex"]["kind"] == "object" and profile["Sex"]["nulls"] == 1
+    assert "protected" in profile["Sex"]["roles"] and "preserve" in profile["Sex"]["roles"]
+    assert profile["income"]["kind"] == "float" and profile["income"]["nulls"] == 1
+    assert profile["loan_id"]["kind"] == "int" and profile["loan_id"]["distinct"] == 4
+    assert profile["Sex"]["binary"] and profile["approved"]["binary"]
+    assert first_binary_column(profile, exclude=["Sex"]) == "approved"
+    assert "distinct" not in profile_columns(df, cardinality=False)["income"]
+
+def test_long_columns_are_estimated_unless_binary():
+    n = 5000
+    df = pd.DataFrame({"id": np.arange(n), "flag": np.arange(n) % 2})
+    profile = profile_columns(df, exact_rows=1000)
+    assert not profile["id"]["distinct_exact"] and not profile["id"]["binary"]
+    assert profile["id"]["distinct"] == pytest.approx(n, rel=0.065)
+    assert profile["flag"]["distinct_exact"] and profile["flag"]["binary"]
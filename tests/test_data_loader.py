@@ -0,0 +1,96 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import data_loader
+import processed_cache
+from data_loader import load_table
+
+FRAME = pd.DataFrame({
+    "id": [1, 2, 3],
+    "sex": ["F", "M", "F"],
+    "income": [10.5, 20.0, 30.25],
+    "approved": [1, 0, 1],
+})
+
+def _write(frame, path):
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+    elif path.endswith(".xlsx"):
+        frame.to_excel(path, index=False)
+    else:
+        frame.to_parquet(path, index=False)
+    return path
+
+@pytest.mark.parametrize("extension", ["csv", "xlsx", "parquet"])
+def test_load_table_formats(tmp_path, extension):
+    df = load_table(_write(FRAME, str(tmp_path / f"data.{extension}")))
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), FRAME, check_dtype=False)
+
+@pytest.mark.parametrize("extension", ["csv", "xlsx", "parquet"])
+def test_load_table_usecols(tmp_path, extension):
+    df = load_table(_write(FRAME, str(tmp_path / f"data.{extension}")), usecols=["sex", "approved"])
+    assert list(df.columns) == ["sex", "approved"]
+    assert df["approved"].tolist() == [1, 0, 1]
+
+def test_load_table_text_columns_skip_inference(tmp_path):
+    df = load_table(_write(FRAME, str(tmp_path / "data.csv")), text_columns=["id"])
+    assert df["id"].tolist() == ["1", "2", "3"]
+
+def test_load_table_empty_sheet(tmp_path):
+    path = _write(pd.DataFrame(), str(tmp_path / "empty.xlsx"))
+    with pytest.raises(pd.errors.EmptyDataError):
+        load_table(path)
+
+def test_load_table_missing_and_unsupported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_table(str(tmp_path / "missing.csv"))
+    path = tmp_path / "data.json"
+    path.write_text("{}")
+    with pytest.raises(ValueError):
+        load_table(str(path))
+
+def test_processed_key_changes_with_preprocessing_code(tmp_path, monkeypatch):
+    src_dir = os.path.dirname(os.path.abspath(processed_cache.__file__))
+    for module_name in processed_cache._PREPROCESSING_MODULES:
+        shutil.copy(os.path.join(src_dir, module_name), tmp_path / module_name)
+    dataset = _write(FRAME, str(tmp_path / "data.csv"))
+    monkeypatch.setattr(processed_cache, "__file__", str(tmp_path / "processed_cache.py"))
+
+    monkeypatch.setattr(processed_cache, "_code_digest", None)
+    key = processed_cache.processed_key(dataset)
+    monkeypatch.setattr(processed_cache, "_code_digest", None)
+    assert processed_cache.processed_key(dataset) == key
+
+    # The keep/encode rules live in column_profile.py.
+    with open(tmp_path / "column_profile.py", "a") as module_file:
+        module_file.write("\nEXPLICIT_PRESERVE = EXPLICIT_PRESERVE | {'zip_code'}\n")
+    monkeypatch.setattr(processed_cache, "_code_digest", None)
+    assert processed_cache.processed_key(dataset) != key
+    assert processed_cache.processed_key(dataset, chunked=True) != processed_cache.processed_key(dataset)
+
+def test_is_data_file():
+    assert data_loader.is_data_file("a.CSV")
+    assert data_loader.is_data_file("b.parquet")
+    assert not data_loader.is_data_file("notes.txt")
+
+def test_prefetch_uses_the_load_key(tmp_path, monkeypatch):
+    import main
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    monkeypatch.setattr(main, "prefetch_table", lambda file_path, skip, plan: calls.append((file_path, skip)))
+
+    # Chunked CSVs are streamed, never read ahead.
+    csv_path = _write(FRAME, str(tmp_path / "data.csv"))
+    main._prefetch(csv_path, True, chunksize=2)
+    assert calls == []
+
+    # chunksize does not apply to other formats, so their unchunked entry is looked up.
+    xlsx_path = _write(FRAME, str(tmp_path / "data.xlsx"))
+    main._prefetch(xlsx_path, True, chunksize=2)
+    (_, skip), = calls
+    assert not skip()
+    main.load_processed_frame(xlsx_path, chunksize=2, use_processed_cache=True)
+    assert skip()
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_preprocessor import compact_column, preprocess_csv_chunked, preprocess_data, smallest_int_dtype
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+def _mixed_frame(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "age": rng.integers(18, 90, n),
+        "income": rng.normal(50, 10, n).round(1),
+        "score": rng.integers(0, 5, n).astype(float),
+        "sex": rng.choice(["F", "M", None], n),
+        "race": rng.choice(["A", "B", "C", "D"], n),
+        "comment": rng.choice(["x", "y"], n),
+        "approved": rng.integers(0, 2, n),
+    })
+    # A column that is integer in early chunks and has missing values later.
+    frame.loc[n - 10:, "score"] = np.nan
+    return frame
+
+def _assert_same_preprocessing(path, chunksize):
+    expected_maps, chunked_maps = {}, {}
+    expected = preprocess_data(pd.read_csv(path), category_maps=expected_maps)
+    chunked = preprocess_csv_chunked(path, chunksize=chunksize, category_maps=chunked_maps)
+    assert list(chunked.columns) == list(expected.columns)
+    for col in expected.columns:
+        np.testing.assert_array_equal(chunked[col].to_numpy(dtype=np.float64), expected[col].to_numpy(dtype=np.float64))
+    assert chunked_maps == expected_maps
+
+@pytest.mark.parametrize("chunksize", [1, 7, 100, 1000])
+def test_chunked_matches_in_memory_preprocessing(tmp_path, chunksize):
+    path = str(tmp_path / "data.csv")
+    _mixed_frame().to_csv(path, index=False)
+    _assert_same_preprocessing(path, chunksize)
+
+@pytest.mark.parametrize("file_name", ["compas_scores.csv", "student-mat.csv", "loan_approval_dataset.csv"])
+def test_chunked_matches_on_bundled_datasets(file_name):
+    _assert_same_preprocessing(os.path.join(DATA_DIR, file_name), chunksize=5000)
+
+def test_chunked_columns_are_compact(tmp_path):
+    path = str(tmp_path / "data.csv")
+    _mixed_frame().to_csv(path, index=False)
+    df = preprocess_csv_chunked(path, chunksize=50)
+    assert df["age"].dtype == np.int8
+    assert df["sex"].dtype == np.int8
+    assert "comment" not in df.columns
+
+def test_compact_column():
+    assert smallest_int_dtype(-1, 200) == np.int16
+    assert compact_column(pd.Series([1, 2, 300])).dtype == np.int16
+    assert compact_column(pd.Series([0.5, 1.25])).dtype == np.float32
+    assert compact_column(pd.Series([0.1, 0.2])).dtype == np.float64
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness_calculator import metrics_from_tables, stratified_sample, sample_weights, evaluate_fairness
+
+# Columns: (neg, pred neg), (neg, pred pos), (pos, pred neg), (pos, pred pos)
+TABLES = np.array([
+    [3, 1, 1, 5],   # group a: selection 6/10, TPR 5/6, FPR 1/4
+    [6, 2, 1, 1],   # group b: selection 3/10, TPR 1/2, FPR 2/8
+    [0, 0, 0, 0],   # empty group, ignored
+])
+
+def test_metrics_from_tables_hand_computed():
+    metrics = metrics_from_tables(TABLES, ["a", "b", "c"])
+    assert metrics["demographic_parity_difference"] == pytest.approx(0.3)
+    assert metrics["disparate_impact"] == pytest.approx(0.5)
+    assert metrics["equalized_odds_difference"] == pytest.approx(5 / 6 - 1 / 2)
+    assert set(metrics["groups"]) == {"a", "b"}
+    assert metrics["groups"]["a"]["count"] == 10
+    assert metrics["groups"]["a"]["true_positive_rate"] == pytest.approx(5 / 6)
+    assert metrics["groups"]["b"]["false_positive_rate"] == pytest.approx(0.25)
+    assert "demographic_parity_ci" not in metrics
+
+def test_metrics_from_tables_without_positives_skips_tpr():
+    tables = np.array([[4, 1, 0, 0], [2, 3, 0, 0]])
+    metrics = metrics_from_tables(tables, ["a", "b"])
+    assert metrics["groups"]["a"]["true_positive_rate"] is None
+    assert metrics["equalized_odds_difference"] == pytest.approx(0.6 - 0.2)
+
+def test_metrics_from_tables_uses_weighted_rates_and_sampled_counts():
+    weighted = TABLES * np.array([[1.0], [4.0], [1.0]])
+    weighted[1] = [30, 2, 7, 1]  # group b reweighted: selection 3/40
+    metrics = metrics_from_tables(TABLES, ["a", "b", "c"], population_counts=np.array([10, 40, 0]), z=1.96,
+                                  weighted_tables=weighted)
+    assert metrics["groups"]["b"]["selection_rate"] == pytest.approx(3 / 40)
+    assert metrics["groups"]["b"]["count"] == 10
+    low, high = metrics["demographic_parity_ci"]
+    assert low <= metrics["demographic_parity_difference"] <= high
+
+def test_stratified_sample_keeps_every_stratum():
+    strata = np.repeat(np.arange(4), [10_000, 500, 20, 1])
+    rows = stratified_sample(strata, 1_000, random_state=0)
+    assert set(strata[rows]) == {0, 1, 2, 3}
+    assert abs(len(rows) - 1_000) <= 4
+    assert np.all(np.diff(rows) > 0)
+
+def test_sample_weights_restore_stratum_sizes():
+    strata = np.repeat(np.arange(3), [9_000, 900, 3])
+    rows = stratified_sample(strata, 500, random_state=1)
+    weights = sample_weights(strata, rows)
+    assert np.bincount(strata[rows], weights=weights) == pytest.approx([9_000, 900, 3])
+
+def _skewed_frame(n_rows=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    sex = (rng.random(n_rows) < 0.05).astype(int)  # small protected group
+    approved = (rng.random(n_rows) < np.where(sex == 1, 0.05, 0.3)).astype(int)
+    return pd.DataFrame({"sex": sex, "income": rng.normal(size=n_rows), "approved": approved})
+
+def test_sampled_fairness_estimates_match_full_data():
+    df = _skewed_frame()
+    full = evaluate_fairness(df)
+    sampled = evaluate_fairness(df, sample_size=300)
+    assert sampled["sampled_rows"] < len(df)
+    assert sampled["demographic_parity_difference"] == pytest.approx(full["demographic_parity_difference"], abs=0.01)
+    for group, metrics in full["attributes"]["sex"]["groups"].items():
+        assert sampled["attributes"]["sex"]["groups"][group]["selection_rate"] == pytest.approx(
+            metrics["selection_rate"], abs=0.01)
+    low, high = sampled["attributes"]["sex"]["demographic_parity_ci"]
+    assert low <= full["demographic_parity_difference"] <= high
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental_state
+from data_preprocessor import preprocess_data
+from fairness_calculator import evaluate_fairness
+
+def _frame(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "sex": rng.choice(["F", "M"], n),
+        "race": rng.choice(["A", "B", "C"], n),
+        "income": rng.normal(50, 10, n).round(2),
+        "approved": rng.integers(0, 2, n),
+    })
+
+def _append(path, frame):
+    frame.to_csv(path, mode="a", header=False, index=False)
+
+def _assert_fairness_matches_full_run(state, path):
+    expected = evaluate_fairness(preprocess_data(pd.read_csv(path)))
+    results = incremental_state.fairness_results(state)
+    assert results["demographic_parity_difference"] == pytest.approx(expected["demographic_parity_difference"])
+    assert results["max_demographic_parity_difference"] == pytest.approx(
+        expected["max_demographic_parity_difference"])
+
+def test_complete_records_keeps_quoted_newlines_for_later():
+    assert incremental_state._complete_records(b"a,b\n1,2\n3,") == b"a,b\n1,2\n"
+    assert incremental_state._complete_records(b'a,b\n1,"x\ny"\n2,"open\n') == b'a,b\n1,"x\ny"\n'
+    assert incremental_state._complete_records(b'a,"""quoted"""\n1,"x\n') == b'a,"""quoted"""\n'
+    assert incremental_state._complete_records(b'"x\n') == b""
+
+def test_appended_rows_match_a_full_run(tmp_path):
+    state_dir = str(tmp_path / "state")
+    path = str(tmp_path / "log.csv")
+    _frame(300, 0).to_csv(path, index=False)
+    state = incremental_state.update_file_state(path, state_dir)
+    assert state["rows"] == 300
+    _assert_fairness_matches_full_run(state, path)
+
+    _append(path, _frame(200, 1))
+    state = incremental_state.update_file_state(path, state_dir)
+    assert state["rows"] == 500
+    assert state["context"].rows == 500
+    _assert_fairness_matches_full_run(state, path)
+
+def test_state_is_reloaded_across_runs(tmp_path, monkeypatch):
+    state_dir = str(tmp_path / "state")
+    path = str(tmp_path / "log.csv")
+    _frame(100, 0).to_csv(path, index=False)
+    incremental_state.update_file_state(path, state_dir)
+    _append(path, _frame(50, 1))
+
+    # The saved state is updated with the appended rows only.
+    def fail(file_path):
+        raise AssertionError("the state was rebuilt")
+    monkeypatch.setattr(incremental_state, "_build_state", fail)
+    state = incremental_state.update_file_state(path, state_dir)
+    assert state["rows"] == 150
+    assert state["offset"] == os.path.getsize(path)
+    assert incremental_state.update_file_state(path, state_dir)["rows"] == 150
+
+def test_partial_quoted_record_waits_for_the_next_run(tmp_path):
+    state_dir = str(tmp_path / "state")
+    path = str(tmp_path / "log.csv")
+    frame = _frame(100, 0)
+    frame["note"] = "ok"
+    frame = frame[["sex", "race", "income", "note", "approved"]]
+    frame.to_csv(path, index=False)
+    incremental_state.update_file_state(path, state_dir)
+
+    with open(path, "a") as log:
+        log.write('F,A,51.0,"first line\n')
+    state = incremental_state.update_file_state(path, state_dir)
+    assert state["rows"] == 100
+
+    with open(path, "a") as log:
+        log.write('second line",1\n')
+    state = incremental_state.update_file_state(path, state_dir)
+    assert state["rows"] == 101
+    assert state["offset"] == os.path.getsize(path)
+
+@pytest.mark.parametrize("change", ["rewrite", "truncate"])
+def test_rewritten_or_truncated_file_is_rebuilt(tmp_path, change):
+    state_dir = str(tmp_path / "state")
+    path = str(tmp_path / "log.csv")
+    _frame(300, 0).to_csv(path, index=False)
+    incremental_state.update_file_state(path, state_dir)
+
+    if change == "rewrite":
+        _frame(300, 2).to_csv(path, index=False)
+    else:
+        _frame(300, 0).iloc[:120].to_csv(path, index=False)
+    state = incremental_state.update_file_state(path, state_dir)
+    assert state["rows"] == (300 if change == "rewrite" else 120)
+    assert state["context"].rows == state["rows"]
+    _assert_fairness_matches_full_run(state, path)
+
+def test_append_digest_follows_appends_and_rewrites(tmp_path):
+    path = str(tmp_path / "log.csv")
+    _frame(100, 0).to_csv(path, index=False)
+    digest = incremental_state.append_digest(path)
+    assert incremental_state.append_digest(path) == digest
+
+    _append(path, _frame(1, 1))
+    appended = incremental_state.append_digest(path)
+    assert appended != digest
+    _frame(101, 2).to_csv(path, index=False)
+    assert incremental_state.append_digest(path) != appended
+
+def test_clear_state(tmp_path):
+    state_dir = str(tmp_path / "state")
+    path = str(tmp_path / "log.csv")
+    _frame(50, 0).to_csv(path, index=False)
+    incremental_state.update_file_state(path, state_dir)
+    assert os.listdir(state_dir)
+    incremental_state.clear_state(state_dir)
+    assert not os.listdir(state_dir)
+
+def test_incremental_runs_are_keyed_without_hashing_the_file(tmp_path, monkeypatch):
+    import main
+    import result_cache
+    path = str(tmp_path / "log.csv")
+    _frame(100, 0).to_csv(path, index=False)
+    assert main.content_digest_for(path, {}) == result_cache.file_digest(path)
+
+    monkeypatch.setattr(result_cache, "file_digest", lambda file_path: pytest.fail("hashed in full"))
+    assert main.content_digest_for(path, {"incremental": True}) == incremental_state.append_digest(path)
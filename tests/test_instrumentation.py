@@ -0,0 +1,39 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+import instrumentation
+
+def test_stage_records_time_shape_and_status():
+    records = []
+    with instrumentation.stage(records, "load", pd.DataFrame({"a": [1, 2, 3]}), file_name="data.csv"):
+        time.sleep(0.01)
+    with pytest.raises(ValueError):
+        with instrumentation.stage(records, "broken"):
+            raise ValueError("failed")
+    load, broken = records
+    assert (load["file"], load["rows"], load["columns"], load["status"]) == ("data.csv", 3, 1, "ok")
+    assert load["wall_seconds"] >= 0.01 and load["peak_rss_mb"] > 0
+    assert broken["status"] == "error"
+
+def test_timing_columns_sum_repeated_stages():
+    records = [{"stage": name, "wall_seconds": seconds, "peak_rss_mb": peak}
+               for name, seconds, peak in (("context", 1.0, 100.0), ("transparency", 2.0, 150.0),
+                                           ("context", 0.5, 120.0), ("transparency", 4.0, 300.0))]
+    columns = instrumentation.timing_columns(records)
+    assert columns == {"context Seconds": 1.5, "transparency Seconds": 6.0,
+                       "Total Seconds": 7.5, "Peak Memory MB": 300.0}
+    assert instrumentation.timing_columns([]) == {}
+
+def test_trace_lines(tmp_path):
+    trace_path = str(tmp_path / "trace.jsonl")
+    instrumentation.reset_trace(trace_path)
+    records = []
+    with instrumentation.stage(records, "load"):
+        pass
+    instrumentation.append_trace(records, trace_path)
+    instrumentation.append_trace(records, trace_path)
+    with open(trace_path) as trace_file:
+        assert [json.loads(line)["stage"] for line in trace_file] == ["load", "load"]
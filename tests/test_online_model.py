@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from online_model import OnlineLogisticModel, Reservoir, hash_split
+
+def _data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(loc=[0, 100, -5], scale=[1, 20, 0.1], size=(n, 3))
+    y = ((X[:, 0] + (X[:, 1] - 100) / 20 + rng.normal(scale=0.3, size=n)) > 0).astype(int)
+    return X, y
+
+def test_raw_coefficients_reproduce_the_decision_function():
+    X, y = _data()
+    model = OnlineLogisticModel([0, 1])
+    for batch in np.array_split(np.arange(len(X)), 10):
+        model.partial_fit(X[batch], y[batch])
+    np.testing.assert_allclose(X @ model.coef_.T + model.intercept_, model.decision_function(X)[:, None])
+
+def test_batches_reach_the_batch_model_accuracy():
+    X, y = _data()
+    X_test, y_test = _data(seed=1)
+    model = OnlineLogisticModel([0, 1])
+    model.partial_fit(X[:500], y[:500], epochs=5, random_state=0)
+    for batch in np.array_split(np.arange(500, len(X)), 5):
+        model.partial_fit(X[batch], y[batch])
+    reference = LogisticRegression().fit(X, y).score(X_test, y_test)
+    assert model.score(X_test, y_test) > reference - 0.05
+    assert model.predict_proba(X_test[:5]).shape == (5, 2)
+
+def test_observe_then_train_without_observing():
+    X, y = _data()
+    observed = OnlineLogisticModel([0, 1]).observe(X)
+    observed.partial_fit(X, y, observe=False)
+    trained = OnlineLogisticModel([0, 1]).partial_fit(X, y)
+    np.testing.assert_allclose(observed.coef_, trained.coef_)
+
+def test_reservoir_fills_in_order_then_stays_at_capacity():
+    reservoir = Reservoir(5, 2)
+    assert reservoir.X.shape == (0, 2) and len(reservoir.y) == 0
+    X = np.arange(6, dtype=float).reshape(3, 2)
+    reservoir.add(X, np.array([0, 1, 2]))
+    np.testing.assert_array_equal(reservoir.X, X)
+    np.testing.assert_array_equal(reservoir.y, [0, 1, 2])
+
+    X = np.arange(200, dtype=float).reshape(100, 2)
+    reservoir.add(X, np.arange(100))
+    assert reservoir.seen == 103
+    assert reservoir.X.shape == (5, 2)
+    # Rows keep their labels (row i of each batch is [2i, 2i + 1] with label i).
+    np.testing.assert_array_equal(reservoir.X[:, 0], 2 * reservoir.y)
+
+@pytest.mark.parametrize("batch_size", [1, 7, 100])
+def test_reservoir_sample_is_uniform(batch_size):
+    n, capacity, trials = 50, 10, 1000
+    counts = np.zeros(n)
+    for seed in range(trials):
+        reservoir = Reservoir(capacity, 1, random_state=seed)
+        for start in range(0, n, batch_size):
+            rows = np.arange(start, min(start + batch_size, n))
+            reservoir.add(rows[:, None].astype(float), rows)
+        assert len(np.unique(reservoir.y)) == capacity
+        counts[reservoir.y] += 1
+    # Every row is kept with probability capacity / n (200 times here, standard deviation about 13).
+    assert np.abs(counts - trials * capacity / n).max() < 60
+
+def test_hash_split():
+    mask = hash_split(np.arange(100_000), 0.2)
+    assert mask.mean() == pytest.approx(0.2, abs=0.01)
+    np.testing.assert_array_equal(hash_split(np.arange(50_000, 60_000), 0.2), mask[50_000:60_000])
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import main
+import processed_cache
+import result_cache
+
+FRAME = pd.DataFrame({
+    "sex": np.array([0, 1, 0, 1], dtype=np.int8),
+    "income": [10.5, 20.0, 30.25, 40.0],
+    "approved": np.array([1, 0, 1, 0], dtype=np.int8),
+})
+
+def test_store_and_load_round_trip(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    entry_dir = processed_cache.store_processed("key", FRAME, {"sex": ["F", "M"]}, source="data.csv",
+                                                cache_dir=cache_dir)
+    assert entry_dir == os.path.join(cache_dir, "key")
+    assert processed_cache.has_processed("key", cache_dir)
+
+    df, category_maps = processed_cache.load_processed("key", cache_dir)
+    pd.testing.assert_frame_equal(df.copy(), FRAME)
+    assert category_maps == {"sex": ["F", "M"]}
+
+    # Columns are mapped copy-on-write: writing into the frame leaves the entry unchanged.
+    df.loc[0, "income"] = -1.0
+    assert processed_cache.load_processed("key", cache_dir)[0].loc[0, "income"] == 10.5
+
+def test_load_missing_and_non_numeric(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    assert processed_cache.load_processed("missing", cache_dir) is None
+    assert processed_cache.store_processed("text", pd.DataFrame({"a": ["x"]}), cache_dir=cache_dir) is None
+    assert not processed_cache.has_processed("text", cache_dir)
+
+def test_clear_and_evict(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for key in ("old", "new"):
+        processed_cache.store_processed(key, FRAME, cache_dir=cache_dir)
+    os.utime(os.path.join(cache_dir, "old", "meta.json"), (0, 0))
+    processed_cache.evict(cache_dir, max_bytes=processed_cache._entry_size(os.path.join(cache_dir, "new")))
+    assert not processed_cache.has_processed("old", cache_dir)
+    assert processed_cache.has_processed("new", cache_dir)
+
+    processed_cache.clear_cache(cache_dir)
+    assert not processed_cache.has_processed("new", cache_dir)
+
+def test_processed_key_follows_content(tmp_path):
+    path = tmp_path / "data.csv"
+    FRAME.to_csv(path, index=False)
+    key = processed_cache.processed_key(str(path))
+    assert processed_cache.processed_key(str(path), content_digest=result_cache.file_digest(str(path))) == key
+
+    FRAME.iloc[:2].to_csv(path, index=False)
+    assert processed_cache.processed_key(str(path)) != key
+
+def test_load_processed_frame_hashes_the_file_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "data.csv")
+    pd.DataFrame({"sex": ["F", "M", "F", "M"], "income": [1.0, 2.0, 3.0, 4.0],
+                  "approved": [1, 0, 1, 0]}).to_csv(path, index=False)
+    hashed = []
+
+    def counting_digest(file_path, chunk_size=1024 * 1024, digest=result_cache.file_digest):
+        if file_path == path:
+            hashed.append(file_path)
+        return digest(file_path, chunk_size)
+    monkeypatch.setattr(result_cache, "file_digest", counting_digest)
+    monkeypatch.setattr(processed_cache, "file_digest", counting_digest)
+
+    # A miss preprocesses and stores the frame, a hit memory-maps it: one hash each.
+    first = main.load_processed_frame(path, use_processed_cache=True)
+    assert len(hashed) == 1
+    second = main.load_processed_frame(path, use_processed_cache=True)
+    assert len(hashed) == 2
+    pd.testing.assert_frame_equal(second.copy(), first, check_dtype=False)
+
+    # A digest computed by the caller is reused as is.
+    main.load_processed_frame(path, use_processed_cache=True, content_digest=result_cache.file_digest(path))
+    assert len(hashed) == 3
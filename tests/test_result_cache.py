@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+import result_cache
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("sex,approved\nF,1\nM,0\n")
+    return str(path)
+
+def test_cache_key_follows_content_params_and_code(dataset, monkeypatch):
+    key = result_cache.cache_key(dataset, params={"explain_rows": 1})
+    assert result_cache.cache_key(dataset, params={"explain_rows": 1}) == key
+    assert result_cache.cache_key(dataset, params={"explain_rows": 1},
+                                  content_digest=result_cache.file_digest(dataset)) == key
+    assert result_cache.cache_key(dataset, params={"explain_rows": 2}) != key
+
+    monkeypatch.setattr(result_cache, "_code_digest", "other code")
+    assert result_cache.cache_key(dataset, params={"explain_rows": 1}) != key
+    monkeypatch.undo()
+
+    with open(dataset, "a") as data_file:
+        data_file.write("F,0\n")
+    assert result_cache.cache_key(dataset, params={"explain_rows": 1}) != key
+
+def test_model_file_is_keyed_by_content(dataset, tmp_path):
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b"first")
+    key = result_cache.cache_key(dataset, params={"model_path": str(model_path)})
+    model_path.write_bytes(b"second")
+    assert result_cache.cache_key(dataset, params={"model_path": str(model_path)}) != key
+
+def test_put_and_get_round_trip(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    assert result_cache.get_cached_row("key", cache_dir) is None
+    row = {"File Name": "data.csv", "Fairness Score": 0.5, "Privacy Score": "NA"}
+    result_cache.put_cached_row("key", row, cache_dir)
+    assert result_cache.get_cached_row("key", cache_dir) == row
+
+    with open(os.path.join(cache_dir, "key.json"), "w") as entry_file:
+        entry_file.write("{truncated")
+    assert result_cache.get_cached_row("key", cache_dir) is None
+
+def test_evict_and_clear(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    for key in ("old", "new"):
+        result_cache.put_cached_row(key, {"File Name": key}, cache_dir)
+    os.utime(os.path.join(cache_dir, "old.json"), (0, 0))
+    result_cache.evict(cache_dir, max_bytes=os.path.getsize(os.path.join(cache_dir, "new.json")))
+    assert result_cache.get_cached_row("old", cache_dir) is None
+    assert result_cache.get_cached_row("new", cache_dir) == {"File Name": "new"}
+
+    result_cache.clear_cache(cache_dir)
+    assert result_cache.get_cached_row("new", cache_dir) is None
+
+def test_unchanged_files_are_not_evaluated_again(dataset, tmp_path, monkeypatch):
+    import main
+    monkeypatch.chdir(tmp_path)
+    evaluated = []
+
+    def evaluate_file(file_path, content_digest=None):
+        evaluated.append(content_digest)
+        return {"File Name": os.path.basename(file_path), "Fairness Score": len(evaluated)}
+
+    first = main.evaluate_with_cache(dataset, evaluate_file, cache_params={"explain_rows": 1})
+    second = main.evaluate_with_cache(dataset, evaluate_file, cache_params={"explain_rows": 1})
+    assert second == first
+    assert evaluated == [result_cache.file_digest(dataset)]
+
+    main.evaluate_with_cache(dataset, evaluate_file, cache_params={"explain_rows": 2})
+    with open(dataset, "a") as data_file:
+        data_file.write("F,0\n")
+    main.evaluate_with_cache(dataset, evaluate_file, cache_params={"explain_rows": 1})
+    assert len(evaluated) == 3
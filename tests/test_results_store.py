@@ -0,0 +1,51 @@
+import pytest
+
+import results_store
+
+def _rows(scores):
+    return [{"File Name": name, "Fairness Score": "NA", "Robustness Score": score,
+             "Final Compliance Score": score if score is not None else "NA"} for name, score in scores.items()]
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    results_store.record_run(_rows({"a.csv": 0.9, "b.csv": 0.5}), file_hashes={"a.csv": "h1", "b.csv": "h2"},
+                             db_path=db_path)
+    results_store.record_run(_rows({"a.csv": 0.6, "b.csv": None}), file_hashes={"a.csv": "h3", "b.csv": "h2"},
+                             cached_files=["b.csv"], db_path=db_path)
+    return db_path
+
+def test_score_history(db_path):
+    history = results_store.score_history(file_name="a.csv", db_path=db_path)
+    assert history["Final Compliance Score"].tolist() == [0.9, 0.6]
+    assert history["run_id"].tolist() == [1, 2]
+
+    by_hash = results_store.score_history(file_hash="h2", db_path=db_path)
+    assert by_hash["file_name"].tolist() == ["b.csv", "b.csv"]
+    assert by_hash["cached"].tolist() == [0, 1]
+    assert by_hash["Final Compliance Score"].isna().tolist() == [False, True]
+
+def test_score_history_of_another_column(db_path):
+    history = results_store.score_history(file_name="b.csv", column="Robustness Score", db_path=db_path)
+    assert history["Robustness Score"].tolist()[0] == 0.5
+    assert results_store.score_history(since="9999", db_path=db_path).empty
+
+def test_score_trends(db_path):
+    trends = results_store.score_trends(db_path=db_path).set_index("file_name")
+    assert trends.loc["a.csv", "runs"] == 2
+    assert trends.loc["a.csv", "change"] == pytest.approx(-0.3)
+    assert trends.index[0] == "a.csv"  # most degraded first
+
+def test_run_results_and_reports(db_path):
+    latest = results_store.run_results(db_path=db_path)
+    assert latest["File Name"].tolist() == ["a.csv", "b.csv"]
+    assert results_store.run_results(run_id=1, db_path=db_path)["Final Compliance Score"].tolist() == [0.9, 0.5]
+    assert results_store.record_report("a.csv", {"summary": {}}, db_path=db_path) == 1
+
+def test_indexes_are_used(db_path):
+    connection = results_store.connect(db_path)
+    try:
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM results WHERE file_hash = ?", ("h1",)).fetchall()
+    finally:
+        connection.close()
+    assert "results_file_hash" in str(plan)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from robustness_calculator import linear_fgsm_correct, art_fgsm_correct
+
+EPS_VALUES = [0.05, 0.2, 0.5]
+
+def _fitted(n_classes):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5))
+    y = np.digitize(X @ rng.normal(size=5) + rng.normal(scale=0.5, size=600),
+                    np.quantile(X[:, 0], np.linspace(0, 1, n_classes + 1)[1:-1]))
+    model = LogisticRegression(max_iter=1000).fit(X[:400], y[:400])
+    return model, X[400:], y[400:]
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_linear_fgsm_matches_art(n_classes):
+    model, X, y = _fitted(n_classes)
+    closed_form = linear_fgsm_correct(model, X, y, EPS_VALUES)
+    art = art_fgsm_correct(model, X, y, EPS_VALUES)
+    assert closed_form.shape == art.shape == (len(EPS_VALUES), len(X))
+    np.testing.assert_array_equal(closed_form, art)
+    assert 0 < art.mean() < 1
+
+def test_linear_fgsm_accuracy_falls_with_eps():
+    model, X, y = _fitted(2)
+    accuracies = linear_fgsm_correct(model, X, y, EPS_VALUES).mean(axis=1)
+    assert np.all(np.diff(accuracies) <= 0)
+
+def test_closed_form_is_limited_to_sigmoid_and_softmax_models():
+    from sklearn.linear_model import SGDClassifier
+    from online_model import OnlineLogisticModel
+    from robustness_calculator import is_linear_classifier
+
+    binary, X, y = _fitted(2)
+    multinomial, X3, y3 = _fitted(3)
+    assert is_linear_classifier(binary)
+    assert is_linear_classifier(multinomial)
+    assert is_linear_classifier(OnlineLogisticModel([0, 1]).partial_fit(X, y))
+
+    one_vs_rest = [
+        LogisticRegression(solver="liblinear").fit(X3, y3),
+        SGDClassifier(loss="log_loss", random_state=0).fit(X3, y3),
+        OnlineLogisticModel(np.unique(y3)).partial_fit(X3, y3),
+    ]
+    assert not any(is_linear_classifier(model) for model in one_vs_rest)
+
+def test_one_vs_rest_models_take_the_generic_path():
+    import pandas as pd
+    from sklearn.linear_model import SGDClassifier
+    from evaluation_context import EvaluationContext
+    from robustness_calculator import evaluate_robustness
+
+    _, X, y = _fitted(3)
+    df = pd.DataFrame(np.column_stack([X, y]), columns=["a", "b", "c", "d", "e", "label"])
+    model = SGDClassifier(loss="log_loss", random_state=0).fit(X, y)
+    results = evaluate_robustness(df, EvaluationContext(df, model=model))
+    assert results["attack_engine"] != "closed_form"
+    assert 0 <= results["adversarial_accuracy"] <= results["initial_accuracy"]
@@ -0,0 +1,37 @@
+import os
+import time
+import threading
+
+from scheduler import run_in_process_pool
+
+def _square(value):
+    return value * value
+
+def _behave(action):
+    if action == "sleep":
+        time.sleep(30)
+    if action == "raise":
+        raise RuntimeError("broken dataset")
+    if action == "crash":
+        os._exit(3)
+    if action == "linger":
+        # The result is sent, but the process only exits once this thread ends.
+        threading.Thread(target=time.sleep, args=(30,)).start()
+    return action
+
+def test_results_by_key():
+    results = run_in_process_pool([(f"t{i}", i) for i in range(5)], _square, max_workers=2)
+    assert results == {f"t{i}": i * i for i in range(5)}
+
+def test_timeout_and_crashes_only_lose_their_own_result():
+    tasks = [("slow", "sleep"), ("error", "raise"), ("crash", "crash"), ("ok", "fine")]
+    start = time.monotonic()
+    results = run_in_process_pool(tasks, _behave, max_workers=4, timeout=1.0)
+    assert time.monotonic() - start < 15
+    assert results == {"slow": None, "error": None, "crash": None, "ok": "fine"}
+
+def test_result_sent_before_the_deadline_is_kept():
+    start = time.monotonic()
+    results = run_in_process_pool([("linger", "linger"), ("slow", "sleep")], _behave, max_workers=2, timeout=1.0)
+    assert time.monotonic() - start < 15
+    assert results == {"linger": "linger", "slow": None}
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+import pandas as pd
+import pytest
+
+import service
+
+DATASET = pd.DataFrame({
+    "sex": ["F", "M"] * 20,
+    "income": [float(i) for i in range(40)],
+    "approved": [1, 0, 0, 1] * 10,
+})
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    # The caches live under the working directory of the service and its workers.
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("service"))
+    httpd = service.make_server(port=0, workers=1, max_queue=1)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.RequestHandlerClass.service.shutdown()
+    os.chdir(cwd)
+
+def _post(url, body, content_type="text/csv"):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def _upload_dirs():
+    return {name for name in os.listdir(tempfile.gettempdir()) if name.startswith("bias_upload_")}
+
+def _assert_cleaned_up(before, timeout=5.0):
+    # The handler removes the upload after sending its response.
+    deadline = time.monotonic() + timeout
+    while _upload_dirs() != before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _upload_dirs() == before
+
+def test_parse_job_options():
+    assert service.parse_job_options({"explain_rows": 2, "indicators": ["fairness"]}) == {
+        "explain_rows": 2, "indicators": ["fairness"]}
+    for options in ({"model_path": "m.pkl"}, {"explain_rows": 0}, {"explain_rows": True},
+                    {"incremental": "yes"}, {"explanation_method": "shap"}, {"eps_values": [0, 0.1]},
+                    {"indicators": ["unknown"]}, {"privacy_seeds": None}, []):
+        with pytest.raises(ValueError):
+            service.parse_job_options(options)
+    assert service.parse_job_options({"incremental": True}) == {"incremental": True}
+    with pytest.raises(ValueError):
+        service.parse_job_options({"incremental": True}, upload=True)
+
+def test_upload_is_evaluated_then_served_from_the_cache(server):
+    before = _upload_dirs()
+    url = f"{server}/evaluate?name=data.csv&options={quote(json.dumps({'indicators': ['fairness']}))}"
+    status, payload = _post(url, DATASET.to_csv(index=False).encode())
+    assert status == 200
+    assert payload["row"]["File Name"] == "data.csv"
+    assert not payload["cached"]
+
+    status, payload = _post(url, DATASET.to_csv(index=False).encode())
+    assert status == 200
+    assert payload["cached"]
+    _assert_cleaned_up(before)
+
+@pytest.mark.parametrize("query", ["name=..", "name=.", "name=", "name=dir/",
+                                   "name=x.csv&options=" + quote(json.dumps({"incremental": True})),
+                                   "name=x.csv&options=" + quote(json.dumps({"explain_rows": -1}))])
+def test_bad_uploads_are_refused_without_leaking(server, query):
+    before = _upload_dirs()
+    status, payload = _post(f"{server}/evaluate?{query}", b"a,b\n1,0\n")
+    assert status == 400
+    assert "error" in payload
+    _assert_cleaned_up(before)
+
+def test_path_jobs(server, tmp_path):
+    status, _ = _post(f"{server}/evaluate", json.dumps({"path": str(tmp_path / "missing.csv")}).encode(),
+                      "application/json")
+    assert status == 400
+
+    path = tmp_path / "data.csv"
+    DATASET.to_csv(path, index=False)
+    status, payload = _post(f"{server}/evaluate", json.dumps(
+        {"path": str(path), "options": {"indicators": ["fairness"], "incremental": True}}).encode(),
+        "application/json")
+    assert status == 200
+    assert payload["row"]["File Name"] == "data.csv"
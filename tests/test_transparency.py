@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import transparency_calculator
+from evaluation_context import EvaluationContext
+
+def _frame(n_classes, n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    logits = X @ rng.normal(size=(4, n_classes))
+    return pd.DataFrame(np.column_stack([X, logits.argmax(axis=1)]), columns=["a", "b", "c", "d", "label"])
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_linear_weights_add_up_to_the_decision_function(n_classes):
+    context = EvaluationContext(_frame(n_classes))
+    model = context.baseline_model
+    rows = context.X_test[:20]
+    predicted = model.predict(rows)
+    weights = transparency_calculator._linear_weights(context, model, rows, predicted)
+
+    # Coefficient x deviation from the training mean, for the predicted class's decision value.
+    scores = model.decision_function(rows)
+    reference = model.decision_function(context.X_train.mean(axis=0, keepdims=True))
+    if n_classes == 2:
+        expected = scores - reference
+    else:
+        predicted_index = np.searchsorted(model.classes_, predicted)
+        expected = (scores - reference)[np.arange(len(rows)), predicted_index]
+    np.testing.assert_allclose(weights.sum(axis=1), expected)
+
+def test_linear_explanations_and_global_importance():
+    df = _frame(2)
+    df["noise"] = 0.0
+    df = df[["a", "b", "c", "d", "noise", "label"]]
+    results = transparency_calculator.evaluate_transparency(df, EvaluationContext(df), explain_rows=25)
+    assert results["explanation_method"] == "linear"
+    assert results["explained_rows"] == 25
+    assert results["model_accuracy"] > 0.8
+    assert len(results["correct_predictions"]) == 80
+
+    features = [feature for feature, _ in results["global_importance"]]
+    assert sorted(features) == ["a", "b", "c", "d", "noise"]
+    assert features[-1] == "noise"
+    assert dict(results["global_importance"])["noise"] == 0.0
+    assert len(results["lime_results"]["feature_importance"]) == 5
+
+def test_auto_picks_lime_without_coefficients():
+    from sklearn.tree import DecisionTreeClassifier
+    df = _frame(2, n=100)
+    context = EvaluationContext(df, model=DecisionTreeClassifier(random_state=0).fit(
+        df.iloc[:, :-1].to_numpy(), df["label"].to_numpy()))
+    results = transparency_calculator.evaluate_transparency(df, context, num_samples=200)
+    assert results["explanation_method"] == "lime"
+    assert results["explained_rows"] == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import triage
+from indicators import PRESENT_THRESHOLD
+
+def _frame(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "race": rng.choice(4, n, p=[0.7, 0.2, 0.09, 0.01]),
+        "sex": rng.choice(2, n),
+        "income": rng.normal(size=n),
+        "approved": (rng.random(n) < 0.05).astype(int),
+    })
+
+def test_split_by_cost_keeps_evaluation_order():
+    assert triage.split_by_cost(["fairness", "transparency", "accountability", "privacy"]) == (
+        ["fairness", "accountability"], ["transparency", "privacy"])
+
+def test_triage_sample_keeps_every_class_and_group():
+    df = _frame()
+    sample = triage.triage_sample(df, 1000)
+    assert len(sample) == pytest.approx(1000, abs=50)
+    assert sample.index.is_monotonic_increasing
+    assert set(sample["race"]) == set(df["race"])
+    assert set(sample["approved"]) == {0, 1}
+    # Proportional: the positive rate is preserved.
+    assert sample["approved"].mean() == pytest.approx(df["approved"].mean(), abs=0.01)
+
+def test_scores_far_from_the_threshold_are_decided_on_the_sample():
+    assert not triage.needs_full_data("fairness", 0.95, None)
+    assert not triage.needs_full_data("transparency", 0.2, None)
+
+@pytest.mark.parametrize("score", [None, PRESENT_THRESHOLD, PRESENT_THRESHOLD - 0.04, PRESENT_THRESHOLD + 0.049])
+def test_scores_near_the_threshold_are_escalated(score):
+    assert triage.needs_full_data("transparency", score, None)
+
+def test_privacy_scores_just_below_the_threshold_are_escalated():
+    assert triage.needs_full_data("privacy", PRESENT_THRESHOLD - 0.12, None)
+    assert not triage.needs_full_data("privacy", PRESENT_THRESHOLD - 0.2, None)
+    assert not triage.needs_full_data("transparency", PRESENT_THRESHOLD - 0.12, None)
+
+def test_wide_intervals_are_escalated():
+    # 0.8 accuracy on 20 test rows: the bootstrap interval reaches below the threshold.
+    few_rows = {"correct_predictions": np.array([True] * 16 + [False] * 4)}
+    assert triage.needs_full_data("transparency", 0.8, few_rows)
+    many_rows = {"correct_predictions": np.array([True] * 1600 + [False] * 400)}
+    assert not triage.needs_full_data("transparency", 0.8, many_rows)
+
+def test_process_file_triage_row(tmp_path, monkeypatch):
+    import main
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "data.csv")
+    df = _frame(4000)
+    df["approved"] = (df["income"] + df["sex"] > 0.5).astype(int)
+    df.to_csv(path, index=False)
+
+    row = main.process_file(path, indicators=["fairness", "transparency"], triage_sample_rows=500)
+    full = main.process_file(path, indicators=["fairness", "transparency"])
+    assert row["Fairness Score"] == full["Fairness Score"]
+    assert row["Triage"].endswith("sampled rows; none escalated")
+    assert (row["Transparency Score"] >= PRESENT_THRESHOLD) == (full["Transparency Score"] >= PRESENT_THRESHOLD)
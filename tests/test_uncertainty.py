@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import uncertainty
+
+def _fairness_results(sizes, rates):
+    groups = {f"g{i}": {"count": size, "selection_rate": rate} for i, (size, rate) in enumerate(zip(sizes, rates))}
+    return {"protected_attribute": "sex", "attributes": {"sex": {"groups": groups}}}
+
+def test_resample_cells_keeps_the_row_count():
+    rng = np.random.default_rng(0)
+    counts = np.array([[30, 10], [5, 55]])
+    cells = uncertainty.resample_cells(counts, 5000, rng)
+    assert cells.shape == (5000, 2, 2)
+    assert (cells.sum(axis=(1, 2)) == 100).all()
+    np.testing.assert_allclose(cells.mean(axis=0), counts, rtol=0.05)
+    assert not uncertainty.resample_cells(np.zeros(3), 4, rng).any()
+
+def test_accuracy_interval_matches_a_row_bootstrap():
+    rng = np.random.default_rng(1)
+    correct = rng.random(400) < 0.8
+    columns = uncertainty.score_intervals({"transparency": {"correct_predictions": correct}},
+                                          {"transparency": correct.mean()}, n_resamples=4000)
+
+    resamples = rng.integers(0, len(correct), size=(4000, len(correct)))
+    expected_low, expected_high = np.quantile(correct[resamples].mean(axis=1), [0.025, 0.975])
+    assert columns["Transparency Score CI Low"] == pytest.approx(expected_low, abs=0.01)
+    assert columns["Transparency Score CI High"] == pytest.approx(expected_high, abs=0.01)
+
+def test_test_rows_are_resampled_jointly():
+    correct = np.tile([True, True, False, True], 50)
+    columns = uncertainty.score_intervals(
+        {"transparency": {"correct_predictions": correct}, "robustness": {"adversarial_correct": correct}},
+        {"transparency": 0.75, "robustness": 0.75})
+    assert columns["Transparency Score CI Low"] == columns["Robustness Score CI Low"]
+    assert columns["Transparency Score CI High"] == columns["Robustness Score CI High"]
+
+def test_fairness_interval_narrows_with_more_rows():
+    widths = []
+    for size in (50, 5000):
+        columns = uncertainty.score_intervals({"fairness": _fairness_results([size, size], [0.4, 0.5])},
+                                              {"fairness": 0.9})
+        low, high = columns["Fairness Score CI Low"], columns["Fairness Score CI High"]
+        assert low <= 0.9 <= high
+        widths.append(high - low)
+    assert widths[1] < widths[0] / 5
+
+def test_final_interval_uses_point_scores_of_other_indicators():
+    columns = uncertainty.score_intervals({"fairness": _fairness_results([200, 200], [0.3, 0.6])},
+                                          {"fairness": 0.7, "privacy": 0.9, "accountability": None})
+    assert columns["Final Compliance Score CI Low"] == pytest.approx(
+        (columns["Fairness Score CI Low"] + 0.9) / 2)
+    assert "Privacy Score CI Low" not in columns
+    assert uncertainty.score_intervals({}, {"privacy": None}) == {}
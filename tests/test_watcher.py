@@ -0,0 +1,88 @@
+import os
+import asyncio
+from functools import partial
+
+import pandas as pd
+
+import watcher
+
+def _row(file_path):
+    return {"File Name": os.path.basename(file_path), "Rows": len(pd.read_csv(file_path))}
+
+def _crash_once(file_path, marker_dir):
+    # The first evaluation of every file kills its worker process.
+    marker = os.path.join(marker_dir, os.path.basename(file_path))
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return _row(file_path)
+
+def _watch_until(data_folder, evaluate_file, output_path, done, workers=1, timeout=30.0):
+    async def run():
+        stop = asyncio.Event()
+
+        async def stop_when_done():
+            deadline = asyncio.get_running_loop().time() + timeout
+            while not done() and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.05)
+            stop.set()
+
+        await asyncio.gather(
+            watcher.watch_folder(data_folder, evaluate_file, output_path=output_path, interval=0.05,
+                                 settle_seconds=0.0, workers=workers, stop=stop),
+            stop_when_done(),
+        )
+    asyncio.run(run())
+
+def _results(output_path):
+    if not os.path.exists(output_path):
+        return {}
+    return dict(pd.read_csv(output_path).set_index("File Name")["Rows"])
+
+def test_write_row_replaces_and_sorts(tmp_path):
+    output_path = str(tmp_path / "results.csv")
+    watcher.write_row({"File Name": "b.csv", "Rows": 1}, output_path)
+    watcher.write_row({"File Name": "a.csv", "Rows": 2}, output_path)
+    watcher.write_row({"File Name": "b.csv", "Rows": 3}, output_path)
+    results = pd.read_csv(output_path)
+    assert results["File Name"].tolist() == ["a.csv", "b.csv"]
+    assert results["Rows"].tolist() == [2, 3]
+
+def test_new_files_are_evaluated(tmp_path):
+    data_folder = tmp_path / "data"
+    data_folder.mkdir()
+    pd.DataFrame({"x": [1, 2]}).to_csv(data_folder / "a.csv", index=False)
+    pd.DataFrame({"x": [1, 2, 3]}).to_csv(data_folder / "b.csv", index=False)
+    output_path = str(tmp_path / "results.csv")
+    _watch_until(str(data_folder), _row, output_path, lambda: len(_results(output_path)) == 2)
+    assert _results(output_path) == {"a.csv": 2, "b.csv": 3}
+
+def test_known_files_are_skipped(tmp_path):
+    data_folder = tmp_path / "data"
+    data_folder.mkdir()
+    pd.DataFrame({"x": [1]}).to_csv(data_folder / "a.csv", index=False)
+    output_path = str(tmp_path / "results.csv")
+    known = watcher.snapshot(str(data_folder))
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(watcher.watch_folder(str(data_folder), _row, output_path=output_path,
+                                                        interval=0.05, settle_seconds=0.0, known=known, stop=stop))
+        await asyncio.sleep(0.5)
+        stop.set()
+        await task
+    asyncio.run(run())
+    assert not os.path.exists(output_path)
+
+def test_crashed_workers_are_replaced_and_files_retried(tmp_path):
+    data_folder = tmp_path / "data"
+    data_folder.mkdir()
+    marker_dir = tmp_path / "markers"
+    marker_dir.mkdir()
+    for name, rows in (("a.csv", 1), ("b.csv", 2), ("c.csv", 3)):
+        pd.DataFrame({"x": range(rows)}).to_csv(data_folder / name, index=False)
+    output_path = str(tmp_path / "results.csv")
+    _watch_until(str(data_folder), partial(_crash_once, marker_dir=str(marker_dir)), output_path,
+                 lambda: len(_results(output_path)) == 3, workers=2)
+    # Every file, including those whose task died with another file's worker, gets its row.
+    assert _results(output_path) == {"a.csv": 1, "b.csv": 2, "c.csv": 3}